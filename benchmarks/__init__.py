@@ -0,0 +1,3 @@
+"""
+Scripts de mesure de performances (à lancer depuis la racine du dépôt)
+"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Détection des VSTi par sections (CprDocument) contre recherche dans tout
+le fichier (ancienne méthode de trouve_vsti)
+
+Avec des chemins de fichiers CPR en argument, compare les deux méthodes
+sur ces fichiers (à utiliser sur des projets réels). Sans argument, un
+CPR synthétique est généré : conteneur RIFF avec une section d'objets
+(pistes et plugins) suivie d'une grosse section de données embarquées,
+dans laquelle traîne un nom de plugin (faux positif de l'ancienne
+méthode).
+
+Chaque VSTi trouvé par sections doit aussi l'être par la recherche
+complète ; les VSTi en plus côté recherche complète sont listés (faux
+positifs venant des données embarquées, ou section non reconnue). Sur des
+projets réels, les deux ensembles doivent être identiques avant que la
+lecture par sections puisse remplacer la recherche complète dans
+analyse_cpr (qui n'utilise aujourd'hui que la recherche complète).
+
+Usage : python -m benchmarks.bench_cpr_document [fichier.cpr ...]
+"""
+
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from services.cpr_document import CprDocument
+from services.lectureCPR import detecte_vsti
+from services.vsti_detector import VstiDetector
+from services.vsti_manager import load_vsti_list
+
+EMBEDDED_MB = 100
+
+
+def string(text):
+    """Chaîne sérialisée : longueur (zéro compris, big-endian) + texte + zéro"""
+    data = text.encode('utf-8') + b'\x00'
+    return len(data).to_bytes(4, 'big') + data
+
+
+def chunk(chunk_id, payload):
+    """Section RIFF : identifiant + taille big-endian + données (alignées sur 2 octets)"""
+    return chunk_id + len(payload).to_bytes(4, 'big') + payload + b'\x00' * (len(payload) & 1)
+
+
+def write_synthetic_cpr(path, embedded_mb=EMBEDDED_MB):
+    """
+    CPR synthétique : pistes et plugins dans ARCH, données embarquées dans DATA
+
+    Args:
+        path (str): Fichier à créer
+        embedded_mb (int): Taille des données embarquées en MB
+    """
+    objects = [string("MAudioTrackEvent")]
+    for track, plugin in [("Serum 01", "Serum"), ("Kontakt 7 01", "Kontakt 7"),
+                          ("Basse", "Diva"), ("Voix lead", None), ("Pads", "Pigments")]:
+        objects += [string("MInstrumentTrackEvent"), string("Name"), string(track)]
+        if plugin:
+            objects += [string("Plugin Name"), b'\x00\x02', string(plugin)]
+    archive = chunk(b'ARCH', b''.join(objects))
+    root = chunk(b'ROOT', string("GDocument") + string("Version") + string("Cubase 13")
+                 + b'RehearsalTempo\x00\x00\x03' + struct.pack('>d', 124.5)
+                 + b'SignatureNumerator\x00' + (7).to_bytes(4, 'big')
+                 + b'SignatureDenominator\x00' + (8).to_bytes(4, 'big')
+                 + b'SampleRate\x00\x00\x03' + struct.pack('>d', 48000.0))
+
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        body_size = len(root) + len(archive) + 8 + embedded_mb * len(block)
+        f.write(b'RIFF' + (body_size + 4).to_bytes(4, 'big') + b'NUND')
+        f.write(root)
+        f.write(archive)
+        f.write(b'DATA' + (embedded_mb * len(block)).to_bytes(4, 'big'))
+        for i in range(embedded_mb):
+            # Un nom de plugin au milieu de données binaires : faux positif
+            f.write(block if i != embedded_mb // 2 else block[:100] + b'\x00Omnisphere\x00' + block[112:])
+
+
+def compare(path, vsti_list, identical=False):
+    """
+    Comparaison des deux méthodes sur un fichier
+
+    Returns:
+        bool: True si la détection par sections est incluse dans la recherche complète
+            (et lui est identique si identical est vrai)
+    """
+    start = time.perf_counter()
+    full = detecte_vsti(path, vsti_list, use_cache=False, structured=False)
+    full_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with CprDocument(path) as document:
+        structured = document.is_structured
+        sections = VstiDetector.for_list(vsti_list).detect(document.detection_text()) if structured else set()
+        sections_time = time.perf_counter() - start
+        features = document.features
+        scanned = document.bytes_decoded
+        size = document.size
+
+    print(f"{os.path.basename(path)} ({size / 1e6:.1f} MB)")
+    if not structured:
+        print("  Conteneur non reconnu : recherche dans tout le fichier")
+    else:
+        print(f"  Caractéristiques : {features}")
+        print(f"  Sections d'objets parcourues : {scanned / 1e3:.1f} kB ({100 * scanned / max(size, 1):.4f} %)")
+    print(f"  Fichier complet : {full_time:7.3f} s, {sorted(full)}")
+    print(f"  Par sections    : {sections_time:7.3f} s, {sorted(sections)}")
+    if full - sections:
+        print(f"  Uniquement dans le fichier complet : {sorted(full - sections)}")
+    missing = sections - full
+    if missing:
+        print(f"  ERREUR, uniquement par sections : {sorted(missing)}")
+    if identical and full - sections:
+        print("  ERREUR, ensembles différents")
+        return False
+    return not missing
+
+
+def main():
+    vsti_list = load_vsti_list()
+    paths = sys.argv[1:]
+    with tempfile.TemporaryDirectory() as tmp:
+        if not paths:
+            paths = [os.path.join(tmp, "projet_synthetique.cpr")]
+            write_synthetic_cpr(paths[0])
+        # Projets réels : la lecture par sections doit trouver exactement les mêmes VSTi
+        results = [compare(path, vsti_list, identical=bool(sys.argv[1:])) for path in paths]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
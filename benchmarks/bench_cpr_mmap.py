@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mémoire utilisée par l'analyse VSTi d'un gros fichier CPR : lecture
+complète (f.read) contre projection mmap (cpr_buffer)
+
+Un CPR synthétique (données embarquées + noms de VSTi) est écrit dans un
+dossier temporaire. Le pic d'allocations Python (tracemalloc) est relevé
+pendant chaque analyse : avec mmap il doit rester indépendant de la
+taille du fichier, le script échoue si une copie complète est faite.
+
+Usage : python -m benchmarks.bench_cpr_mmap [taille_en_MB]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_vsti import synthetic_cpr
+from services.lectureCPR import trouve_vsti
+from services.vsti_detector import VstiDetector
+from services.vsti_manager import load_vsti_list
+
+CHUNK = 8 * 1024 * 1024
+
+# Pic toléré avec mmap, en fraction de la taille du fichier
+MAX_PEAK_RATIO = 0.05
+
+
+def write_cpr(path, size_mb):
+    """
+    Écriture d'un CPR synthétique par blocs (sans le garder en mémoire)
+
+    Args:
+        path (str): Fichier à créer
+        size_mb (float): Taille en MB
+    """
+    rng = random.Random(0)
+    vsti_list = load_vsti_list()
+    remaining = int(size_mb * 1024 * 1024)
+    with open(path, "wb") as f:
+        while remaining > 0:
+            # Données audio embarquées : longues plages binaires sans texte
+            chunk = synthetic_cpr(min(CHUNK, remaining), vsti_list, rng, density=200_000)
+            f.write(chunk)
+            remaining -= len(chunk)
+
+
+def read_detect(path):
+    """Ancienne lecture : tout le fichier en mémoire puis analyse"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return VstiDetector.for_list(load_vsti_list()).detect(data)
+
+
+def mmap_detect(path):
+    """Analyse sur le fichier projeté (chemin de trouve_vsti)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return trouve_vsti(path)
+
+
+def measure(func, path):
+    """
+    Durée et pic d'allocations Python d'une analyse
+
+    Returns:
+        tuple: (résultat, secondes, pic en octets)
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "gros_projet.cpr")
+        write_cpr(path, size_mb)
+        size = os.path.getsize(path)
+        print(f"CPR synthétique de {size / 1e6:.0f} MB")
+
+        expected, before, peak_read = measure(read_detect, path)
+        found, after, peak_mmap = measure(mmap_detect, path)
+
+        assert found == expected, "Résultats différents"
+        print(f"f.read() : {before:6.2f} s, pic {peak_read / 1e6:8.1f} MB")
+        print(f"mmap     : {after:6.2f} s, pic {peak_mmap / 1e6:8.1f} MB")
+        assert peak_mmap < MAX_PEAK_RATIO * size, "Copie complète du fichier détectée"
+        print(f"Pas de copie du fichier (pic < {MAX_PEAK_RATIO:.0%} de la taille)")
+
+
+if __name__ == "__main__":
+    main()
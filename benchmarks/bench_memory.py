@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Mémoire occupée par les fichiers d'un scan : dictionnaires + datetime
+(ancien format) contre FileRecord
+
+Les enregistrements sont générés en mémoire comme le ferait un scan d'une
+arborescence synthétique (projets de 50 fichiers répartis entre le
+dossier projet et son dossier Audio), sans créer les fichiers sur disque.
+
+Usage : python -m benchmarks.bench_memory [nb_fichiers]
+"""
+
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+from models.file_record import FileRecord
+
+SOURCE = "/mnt/nas/archives/Cubase"
+FILES_PER_PROJECT = 50
+
+
+def synthetic_entries(n_files):
+    """
+    Entrées (dossier, nom, taille, mtime, ctime) d'une arborescence synthétique
+    
+    Args:
+        n_files (int): Nombre de fichiers
+        
+    Yields:
+        tuple: Entrée de fichier
+    """
+    for i in range(n_files):
+        project = i // FILES_PER_PROJECT
+        parent = os.path.join(SOURCE, f"Projet {project:06d}")
+        if i % 2:
+            parent = os.path.join(parent, "Audio")
+        yield parent, f"prise_{i:07d}.wav", 1024 * i, 1.7e9 + i, 1.7e9 + i
+
+
+def build_dicts(n_files):
+    """Ancien format : un dict et deux datetime par fichier"""
+    return [
+        {
+            'path': os.path.join(parent, name),
+            'size': size,
+            'modified': datetime.fromtimestamp(mtime),
+            'created': datetime.fromtimestamp(ctime),
+            'source': str(SOURCE)
+        }
+        for parent, name, size, mtime, ctime in synthetic_entries(n_files)
+    ]
+
+
+def build_records(n_files):
+    """Nouveau format : FileRecord à slots"""
+    return [
+        FileRecord(parent, name, size, mtime, ctime, SOURCE)
+        for parent, name, size, mtime, ctime in synthetic_entries(n_files)
+    ]
+
+
+def measure(builder, n_files):
+    """
+    Mémoire retenue par la structure construite
+    
+    Returns:
+        int: Octets alloués et encore vivants après construction
+    """
+    tracemalloc.start()
+    data = builder(n_files)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    print(f"{n_files} fichiers synthétiques")
+    before = measure(build_dicts, n_files)
+    after = measure(build_records, n_files)
+    print(f"dict + datetime : {before / 1e6:8.1f} MB ({before / n_files:.0f} octets/fichier)")
+    print(f"FileRecord      : {after / 1e6:8.1f} MB ({after / n_files:.0f} octets/fichier)")
+    print(f"Gain            : {100 * (1 - after / before):.0f} %")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recherche dans la table des projets : index inversé contre filtre texte
+du proxy
+
+Mesure, sur des projets synthétiques (tags, notes et notes en étoiles
+dans un index de métadonnées temporaire) :
+- la construction de l'index de recherche (ProjectSearchIndex.build) ;
+- des requêtes typiques (mot libre, tag:, plugin:, rating>=, combinaisons),
+  frappe par frappe comme dans le champ de filtre ;
+- le filtrage de la table : setFilterFixedString (texte de chaque ligne
+  relu à chaque frappe) contre l'ensemble de noms donné au proxy.
+
+Usage : python -m benchmarks.bench_project_search [nb_projets]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import QSortFilterProxyModel
+
+from benchmarks.bench_project_table import build_scanner
+from models.project_model import ProjectTableModel
+
+TAGS = ["techno", "house", "ambient", "dnb", "mix final", "à refaire", "voix", "live"]
+QUERIES = ["projet 0123", "tag:techno", "tag:techno rating>=4", "prise", "notes:basse -tag:live",
+           "rating:5 tag:voix"]
+
+
+def timed(label, func, *args):
+    """
+    Exécution chronométrée
+    
+    Returns:
+        object: Résultat de la fonction
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<46}: {(time.perf_counter() - start) * 1000:9.2f} ms")
+    return result
+
+
+def keystrokes(query):
+    """Préfixes successifs d'une requête (saisie caractère par caractère)"""
+    return [query[:i] for i in range(1, len(query) + 1)]
+
+
+def main():
+    n_projects = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    print(f"{n_projects} projets synthétiques")
+    scanner = build_scanner(n_projects)
+    df_projects = scanner._create_dataframe()
+    
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        # Import après le changement de HOME : index et caches dans le dossier temporaire
+        from services.metadata_index import MetadataIndex
+        from services.project_search import ProjectSearchIndex
+        
+        metadata_index = MetadataIndex.default()
+        for i, project_dir in enumerate(df_projects['project_dir']):
+            if i % 3 == 0:
+                metadata_index.update(project_dir, {
+                    'tags': [TAGS[i % len(TAGS)], TAGS[(i // 7) % len(TAGS)]],
+                    'rating': (i // 3) % 6,
+                    'notes': f"Idée de basse {i}, refaire le mix"
+                })
+        
+        model = ProjectTableModel()
+        with contextlib.redirect_stdout(io.StringIO()):
+            model.update_data(df_projects)
+        
+        index = ProjectSearchIndex()
+        timed("Construction de l'index (fichiers compris)", index.build, model.projects_frame(), scanner.projects)
+        
+        for query in QUERIES:
+            result = timed(f"Requête {query!r}", index.search, query)
+            typing = time.perf_counter()
+            for text in keystrokes(query):
+                index.search(text)
+            per_key = (time.perf_counter() - typing) * 1000 / len(query)
+            print(f"{'':<4}{len(result)} projets, {per_key:.2f} ms par frappe")
+        
+        # Filtrage de la table : texte des lignes contre ensemble de noms
+        from gui.components.project_table import ProjectSortFilterProxyModel
+        text_proxy = QSortFilterProxyModel()
+        text_proxy.setSourceModel(model)
+        name_proxy = ProjectSortFilterProxyModel()
+        name_proxy.setSourceModel(model)
+        for text in ("projet 01", "projet 0123"):
+            timed(f"setFilterFixedString({text!r})", text_proxy.setFilterFixedString, text)
+            print(f"{'':<4}{text_proxy.rowCount()} lignes")
+            names = index.search(text)
+            timed(f"Filtre par ensemble de noms ({text!r})", name_proxy.set_accepted_names, names)
+            print(f"{'':<4}{name_proxy.rowCount()} lignes")
+        timed("Retrait du filtre (ensemble de noms)", name_proxy.set_accepted_names, None)
+        timed("Tri par date sans filtre (modèle)", model.sort, 1)
+
+
+if __name__ == "__main__":
+    main()
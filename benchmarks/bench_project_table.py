@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Rafraîchissement de la table des projets sur un grand nombre de projets
+
+Mesure, sur des projets synthétiques générés en mémoire :
+- la synthèse ligne par ligne (liste de dicts) contre la synthèse
+  colonnaire vectorisée de CubaseScanner._create_dataframe ;
+- le chargement de la table dans ProjectTableModel (formatage compris) ;
+- le tri d'une colonne par QSortFilterProxyModel (comparaisons Qt) contre
+  le tri vectorisé du modèle ;
+- le marquage du projet le plus récent de chaque dossier (mode "folder").
+
+Usage : python -m benchmarks.bench_project_table [nb_projets]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PyQt5.QtCore import Qt, QSortFilterProxyModel
+
+from models.file_record import FileRecord
+from models.project_model import ProjectTableModel
+from services.scanner import CubaseScanner
+
+SOURCES = ["/mnt/nas/archives/Cubase", "/mnt/nas/archives/Cubase 2019", "/home/user/Musique/Projets"]
+CPR_PER_PROJECT = 3
+WAV_PER_PROJECT = 12
+
+
+def build_scanner(n_projects):
+    """
+    Scanner rempli de projets synthétiques (sans fichiers sur disque)
+    
+    Args:
+        n_projects (int): Nombre de projets
+        
+    Returns:
+        CubaseScanner: Scanner dont projects est rempli
+    """
+    scanner = CubaseScanner()
+    for i in range(n_projects):
+        source = SOURCES[i % len(SOURCES)]
+        project_dir = os.path.join(source, f"Projet {i:06d}")
+        audio_dir = os.path.join(project_dir, "Audio")
+        project = scanner.projects[f"Projet {i:06d}"]
+        project['source'] = source
+        for j in range(CPR_PER_PROJECT):
+            mtime = 1.6e9 + (i * 7919 + j * 104729) % 10_000_000
+            project['cpr_files'].append(FileRecord(project_dir, f"Projet {i:06d}-{j:02d}.cpr", 200_000 + j, mtime, mtime, source))
+        project['bak_files'].append(FileRecord(project_dir, f"Projet {i:06d}.bak", 190_000, 1.6e9, 1.6e9, source))
+        for j in range(WAV_PER_PROJECT):
+            project['wav_files'].append(FileRecord(audio_dir, f"prise_{j:03d}.wav", 5_000_000 + i + j, 1.6e9, 1.6e9, source))
+    return scanner
+
+
+def quiet(func, *args):
+    """
+    Exécution sans les messages console (avertissements des métadonnées)
+    
+    Returns:
+        object: Résultat de la fonction
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def timed(label, func, *args):
+    """
+    Exécution chronométrée
+    
+    Returns:
+        object: Résultat de la fonction
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    print(f"{label:<42}: {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main():
+    n_projects = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"{n_projects} projets synthétiques")
+    scanner = build_scanner(n_projects)
+    
+    timed("Synthèse ligne par ligne (dicts)", lambda: [
+        CubaseScanner._summarize_project(name, data) for name, data in scanner.projects.items()
+    ])
+    df_projects = timed("Synthèse colonnaire (_create_dataframe)", scanner._create_dataframe)
+    
+    # Les notes sont lues dans un index de métadonnées vide (dossier temporaire)
+    model = ProjectTableModel()
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        timed("Chargement de la table (update_data)", quiet, model.update_data, df_projects)
+        timed("Chargement en mode dossier", quiet, model.update_data, df_projects, "folder")
+    
+    proxy = QSortFilterProxyModel()
+    proxy.setSourceModel(model)
+    timed("Tri par date via QSortFilterProxyModel", QSortFilterProxyModel.sort, proxy, 1, Qt.DescendingOrder)
+    proxy.setSourceModel(None)
+    timed("Tri par date vectorisé (modèle)", model.sort, 1, Qt.DescendingOrder)
+    timed("Tri par taille vectorisé (modèle)", model.sort, 2, Qt.AscendingOrder)
+    timed("Tri par nom vectorisé (modèle)", model.sort, 0, Qt.AscendingOrder)
+    timed("Marquage du plus récent par dossier", model._mark_latest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Comparaison du débit de scan (fichiers/seconde) entre l'ancien parcours
+Path.rglob et le moteur os.scandir de CubaseScanner
+
+Usage : python -m benchmarks.bench_scanner [nb_projets] [fichiers_par_projet]
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+
+from services.scanner import CubaseScanner
+
+
+def build_tree(root, n_projects, files_per_project):
+    """
+    Création d'une arborescence synthétique de projets Cubase
+    
+    Args:
+        root (Path): Dossier racine
+        n_projects (int): Nombre de dossiers projets
+        files_per_project (int): Nombre de fichiers par projet
+        
+    Returns:
+        int: Nombre de fichiers créés
+    """
+    extensions = ['.cpr', '.bak', '.wav', '.txt']
+    count = 0
+    for p in range(n_projects):
+        project_dir = root / f"Projet {p:05d}"
+        audio_dir = project_dir / "Audio"
+        audio_dir.mkdir(parents=True)
+        for i in range(files_per_project):
+            ext = extensions[i % len(extensions)]
+            target = audio_dir if ext == '.wav' else project_dir
+            (target / f"fichier_{i:04d}{ext}").write_bytes(b"x" * (i % 64))
+            count += 1
+    return count
+
+
+def scan_rglob(root_dir):
+    """
+    Reproduction de l'ancien parcours (rglob + trois stat par fichier)
+    
+    Args:
+        root_dir (str): Dossier racine
+        
+    Returns:
+        dict: Projets trouvés
+    """
+    projects = defaultdict(CubaseScanner._new_project)
+    root_path = Path(root_dir)
+    for path in root_path.rglob('*'):
+        if path.is_file():
+            ext = path.suffix.lower()
+            key = {'.cpr': 'cpr_files', '.bak': 'bak_files', '.wav': 'wav_files'}.get(ext, 'other_files')
+            projects[path.parent.name][key].append({
+                'path': str(path),
+                'size': path.stat().st_size,
+                'modified': datetime.fromtimestamp(path.stat().st_mtime),
+                'created': datetime.fromtimestamp(path.stat().st_ctime),
+                'source': str(root_path)
+            })
+        elif path.is_dir():
+            projects[path.parent.name]['directories'].append({
+                'path': str(path),
+                'name': path.name,
+                'source': str(root_path)
+            })
+    return projects
+
+
+def scan_scandir(root_dir):
+    """
+    Parcours avec le moteur os.scandir du scanner
+    
+    Args:
+        root_dir (str): Dossier racine
+        
+    Returns:
+        dict: Projets trouvés
+    """
+    scanner = CubaseScanner()
+    scanner.scan_directory(root_dir)
+    return scanner.projects
+
+
+def all_paths(projects):
+    """Ensemble des chemins de fichiers d'un dictionnaire de projets"""
+    return {
+        f['path'] if isinstance(f, dict) else f.path
+        for project in projects.values()
+        for key in ('cpr_files', 'bak_files', 'wav_files', 'other_files')
+        for f in project[key]
+    }
+
+
+def main():
+    n_projects = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    files_per_project = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        n_files = build_tree(Path(tmp), n_projects, files_per_project)
+        print(f"Arborescence synthétique : {n_projects} projets, {n_files} fichiers")
+        
+        results = {}
+        for name, func in [("rglob", scan_rglob), ("scandir", scan_scandir)]:
+            start = time.perf_counter()
+            projects = func(tmp)
+            elapsed = time.perf_counter() - start
+            results[name] = projects
+            print(f"{name:>8} : {elapsed:.3f} s, {n_files / elapsed:,.0f} fichiers/s")
+        
+        same = all_paths(results["rglob"]) == all_paths(results["scandir"])
+        print(f"Résultats identiques : {'oui' if same else 'NON'}")
+
+
+if __name__ == "__main__":
+    main()
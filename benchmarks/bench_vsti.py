@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Détection des VSTi dans un gros fichier CPR : ancienne analyse en trois
+phases (2 regex par VSTi puis boucle N x M) contre VstiDetector (une passe)
+
+Le contenu CPR est synthétique : octets binaires aléatoires parsemés de
+noms de VSTi (isolés, numérotés, collés à un mot, cités dans des entrées
+"Plugin Name"). Les deux moteurs doivent renvoyer exactement le même
+ensemble, vérifié aussi sur une série de petits contenus aléatoires.
+
+Usage : python -m benchmarks.bench_vsti [taille_en_MB]
+"""
+
+import random
+import re
+import sys
+import time
+
+from services.vsti_detector import VstiDetector
+from services.vsti_manager import load_vsti_list
+
+
+def reference_detect(data, vsti_connus):
+    """Ancienne analyse de trouve_vsti (référence)"""
+    trouvés = set()
+    for vsti in vsti_connus:
+        pattern = re.compile(f"{vsti}\\s+\\d{{2}}".encode('utf-8'))
+        for match in pattern.findall(data):
+            trouvés.add(match.decode('utf-8', errors='ignore'))
+    for vsti in vsti_connus:
+        pattern = re.compile(rb'(?<!\w)' + vsti.encode('utf-8') + rb'(?!\w)')
+        if pattern.findall(data):
+            if not any(vsti in déjà_trouvé for déjà_trouvé in trouvés):
+                trouvés.add(vsti)
+    plugin_pattern = re.compile(rb'Plugin\s+Nam[^\n\r]{2,40}')
+    for match in plugin_pattern.findall(data):
+        texte = match.decode('utf-8', errors='ignore')
+        for vsti in vsti_connus:
+            if vsti in texte and vsti not in trouvés and not any(vsti in déjà_trouvé for déjà_trouvé in trouvés):
+                trouvés.add(vsti)
+    return trouvés
+
+
+def synthetic_cpr(size, vsti_list, rng, density=2000):
+    """
+    Contenu CPR synthétique
+
+    Args:
+        size (int): Taille approximative en octets
+        vsti_list (list): Noms de VSTi à semer
+        rng (random.Random): Générateur
+        density (int): Nombre moyen d'octets binaires entre deux insertions
+
+    Returns:
+        bytes: Contenu
+    """
+    chunks = []
+    total = 0
+    while total < size:
+        filler = rng.randbytes(rng.randint(1, 2 * density))
+        name = rng.choice(vsti_list).encode('utf-8')
+        kind = rng.randrange(6)
+        if kind == 0:
+            insert = name + rng.choice([b' ', b'  ', b'\t', b' \n']) + b'%02d' % rng.randrange(100)
+        elif kind == 1:
+            insert = b'Plugin Name\x00' + name + rng.randbytes(rng.randint(0, 20))
+        elif kind == 2:
+            insert = b'x' + name + b'y'
+        elif kind == 3:
+            insert = name.upper()
+        else:
+            insert = b'\x00' + name + b'\x00'
+        chunks += [filler, insert]
+        total += len(filler) + len(insert)
+    return b''.join(chunks)
+
+
+def check_equivalence(vsti_list, rounds=300):
+    """Comparaison sur de petits contenus aléatoires (cas limites)"""
+    rng = random.Random(1)
+    detector = VstiDetector(vsti_list)
+    for _ in range(rounds):
+        subset = rng.sample(vsti_list, rng.randint(1, len(vsti_list)))
+        data = synthetic_cpr(rng.randint(10, 4000), subset, rng, density=20)
+        expected = reference_detect(data, vsti_list)
+        found = detector.detect(data)
+        if found != expected:
+            raise AssertionError(f"Résultats différents : {sorted(found ^ expected)}")
+    print(f"Équivalence vérifiée sur {rounds} contenus aléatoires")
+
+
+def main():
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    vsti_list = load_vsti_list()
+    check_equivalence(vsti_list)
+
+    data = synthetic_cpr(int(size_mb * 1024 * 1024), vsti_list, random.Random(0))
+    print(f"CPR synthétique de {len(data) / 1e6:.1f} MB, {len(vsti_list)} VSTi connus")
+
+    start = time.perf_counter()
+    expected = reference_detect(data, vsti_list)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detector = VstiDetector.for_list(vsti_list)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    found = detector.detect(data)
+    after = time.perf_counter() - start
+
+    assert found == expected, "Résultats différents"
+    print(f"Trois phases (2 regex/VSTi) : {before:8.3f} s")
+    print(f"VstiDetector (une passe)    : {after:8.3f} s (+ {compile_time * 1000:.1f} ms de compilation)")
+    print(f"Accélération                : x{before / after:.1f} ({len(found)} VSTi trouvés)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Chargement de la forme d'onde d'un fichier WAV : lecture complète contre
+fichier de crêtes
+
+Mesure, sur un WAV stéréo 16 bits synthétique (10 minutes par défaut) :
+- l'ancien chargement (wavfile.read, moyenne des canaux, conversion en
+  flottants, décimation data[::step]) ;
+- le calcul des crêtes en un passage (PeakCache.load, fichier absent) ;
+- la réouverture depuis le fichier de crêtes (PeakCache.get) ;
+avec la mémoire maximale allouée par numpy (tracemalloc) ;
+- le dessin de la forme d'onde : ancienne boucle Python (deux drawLine
+  et un QPen par point, à chaque rafraîchissement) contre le rendu en
+  cache de WaveformWidget, et une seconde de lecture (10 positions) ;
+- le redessin après un zoom ou un défilement, du fichier entier jusqu'au
+  niveau de l'échantillon (objectif : moins de 16 ms).
+
+Usage : python -m benchmarks.bench_waveform [minutes]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QColor, QImage, QPainter, QPen, QRegion
+from PyQt5.QtWidgets import QApplication
+from scipy.io import wavfile
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+OVERVIEW_POINTS = 1500
+WIDTH, HEIGHT = 1200, 160
+
+
+def write_wav(path, minutes):
+    """
+    WAV synthétique : bruit modulé, écrit par tranches d'une minute
+    
+    Args:
+        path (str): Chemin du fichier
+        minutes (int): Durée
+    """
+    frames = SAMPLE_RATE * 60
+    rng = np.random.default_rng(0)
+    data = np.empty((frames * minutes, CHANNELS), dtype=np.int16)
+    for minute in range(minutes):
+        envelope = np.abs(np.sin(np.linspace(0, 40 * np.pi, frames)))[:, None]
+        noise = rng.standard_normal((frames, CHANNELS)) * 8000 * envelope
+        data[minute * frames:(minute + 1) * frames] = noise.astype(np.int16)
+    wavfile.write(path, SAMPLE_RATE, data)
+
+
+def old_load(path):
+    """Chargement de la forme d'onde avant les fichiers de crêtes"""
+    sample_rate, data = wavfile.read(path)
+    if len(data.shape) > 1:
+        data = np.mean(data, axis=1)
+    if data.dtype != np.float32:
+        data = data.astype(np.float32) / (2**15 if data.dtype == np.int16 else 2**31)
+    step = max(1, len(data) // min(OVERVIEW_POINTS, len(data)))
+    return data[::step]
+
+
+def old_paint(data, progress):
+    """Dessin de la forme d'onde avant le rendu en cache (boucle par point)"""
+    image = QImage(WIDTH, HEIGHT, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    center_y = HEIGHT / 2
+    progress_x = int(WIDTH * progress)
+    dx = WIDTH / len(data)
+    max_amp = max(abs(data.min()), abs(data.max()))
+    scale = (HEIGHT * 0.8) / (max_amp * 2)
+    for i in range(len(data) - 1):
+        x1, x2 = i * dx, (i + 1) * dx
+        amp1, amp2 = data[i] * scale, data[i + 1] * scale
+        color = QColor(255, 120, 0) if x1 <= progress_x else QColor(241, 184, 140)
+        painter.setPen(QPen(color, 2))
+        painter.drawLine(int(x1), int(center_y - amp1), int(x2), int(center_y - amp2))
+        painter.drawLine(int(x1), int(center_y + amp1), int(x2), int(center_y + amp2))
+    painter.end()
+
+
+def render(widget, rect=None):
+    """Dessin du widget (zone entière ou bande) dans une image, comme un rafraîchissement"""
+    image = QImage(WIDTH, HEIGHT, QImage.Format_ARGB32_Premultiplied)
+    painter = QPainter(image)
+    widget.render(painter, sourceRegion=QRegion(rect)) if rect is not None else widget.render(painter)
+    painter.end()
+
+
+def playback(widget):
+    """Une seconde de lecture : dix positions, seules les bandes modifiées sont redessinées"""
+    for step in range(10):
+        old_x = int(WIDTH * widget.progress)
+        widget.set_progress(0.3 + step * 0.0005)
+        new_x = int(WIDTH * widget.progress)
+        if old_x != new_x:
+            render(widget, QRect(min(old_x, new_x) - 1, 0, abs(new_x - old_x) + 2, HEIGHT))
+
+
+def measured(label, func, *args):
+    """
+    Exécution chronométrée, avec la mémoire maximale allouée
+    
+    Returns:
+        object: Résultat de la fonction
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<44}: {elapsed * 1000:9.1f} ms, {peak / 1e6:8.1f} Mo max")
+    return result
+
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as home:
+        os.environ["HOME"] = home
+        # Import après le changement de HOME : fichiers de crêtes dans le dossier temporaire
+        from services.peak_cache import PeakCache, EnvelopeStore
+        
+        path = os.path.join(home, "stem.wav")
+        write_wav(path, minutes)
+        # Fichier ancien : les crêtes peuvent être enregistrées tout de suite
+        os.utime(path, (time.time() - 60, time.time() - 60))
+        print(f"WAV stéréo 16 bits de {minutes} min ({os.path.getsize(path) / 1e6:.0f} Mo)")
+        
+        measured("Ancien chargement (wavfile.read complet)", old_load, path)
+        cache = PeakCache()
+        peaks = measured("Calcul des crêtes (un passage, enregistrées)", cache.load, path)
+        measured("Réouverture depuis le fichier de crêtes", cache.get, path)
+        measured("Vue d'ensemble depuis les crêtes", peaks.window, 0, peaks.frames, OVERVIEW_POINTS)
+        print(f"Fichier de crêtes : {os.path.getsize(cache.peak_path(path)) / 1e6:.1f} Mo, "
+              f"{len(peaks.levels)} niveaux")
+        
+        app = QApplication.instance() or QApplication(sys.argv)
+        from gui.components.waveform_viewer import WaveformWidget
+        mins, maxs, rms = peaks.window(0, peaks.frames, OVERVIEW_POINTS)
+        measured("Dessin ancien (boucle Python)", old_paint, np.maximum(maxs, -mins), 0.3)
+        measured("Dessin ancien, 10 positions (1 s de lecture)",
+                 lambda: [old_paint(np.maximum(maxs, -mins), 0.3) for _ in range(10)])
+        widget = WaveformWidget()
+        widget.resize(WIDTH, HEIGHT)
+        store = EnvelopeStore(path, peaks)
+        widget.set_source(store, peaks.frames, reset_view=True)
+        widget.set_duration(peaks.duration)
+        measured("Premier dessin (rendus mis en cache)", render, widget)
+        measured("Dessin suivant (copie des rendus)", render, widget)
+        measured("1 s de lecture (bandes modifiées)", playback, widget)
+        
+        middle = peaks.frames / 2
+        for label, seconds in (("fichier entier", minutes * 60), ("1 min", 60), ("1 s", 1),
+                               ("10 ms (échantillons)", 0.01)):
+            length = seconds * SAMPLE_RATE
+            widget.set_view(middle - length / 2, middle + length / 2)
+            measured(f"Redessin après zoom : {label}", render, widget)
+            widget.scroll(length / 10)
+            measured(f"Redessin après défilement : {label}", render, widget)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
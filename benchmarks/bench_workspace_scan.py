@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vérification que le scan d'un espace de travail est linéaire en taille
+d'arborescence
+
+L'ancien worker appelait scan_directory pour chaque dossier renvoyé par
+os.walk : un fichier à la profondeur d était scanné d fois. Le script
+mesure l'ancien et le nouveau parcours sur des arborescences de taille
+croissante et échoue si le temps du nouveau parcours croît plus vite que
+la taille.
+
+Usage : python -m benchmarks.bench_workspace_scan [nb_dossiers_de_base]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+from services.scanner import CubaseScanner
+
+# Rapport de temps toléré pour une taille multipliée par SCALE
+SCALE = 4
+MAX_RATIO = SCALE * 1.6
+
+
+def build_tree(root, n_folders, depth=6, files_per_folder=5):
+    """
+    Création d'une arborescence de dossiers imbriqués
+    
+    Args:
+        root (Path): Dossier racine
+        n_folders (int): Nombre total de dossiers
+        depth (int): Profondeur des chaînes de dossiers
+        files_per_folder (int): Nombre de fichiers par dossier
+        
+    Returns:
+        int: Nombre de fichiers créés
+    """
+    count = 0
+    for chain in range(n_folders // depth):
+        current = root / f"Groupe {chain:04d}"
+        for level in range(depth):
+            current = current / f"Niveau {level}"
+            current.mkdir(parents=True)
+            for i in range(files_per_folder):
+                ext = '.cpr' if i == 0 else '.wav'
+                (current / f"prise_{i}{ext}").write_bytes(b"x")
+                count += 1
+    return count
+
+
+def scan_per_walk_root(directory):
+    """Ancien algorithme du worker : un scan récursif par dossier de os.walk"""
+    scanner = CubaseScanner()
+    for root, dirs, files in os.walk(directory):
+        scanner.scan_directory(root)
+    return scanner
+
+
+def scan_single_pass(directory):
+    """Nouvel algorithme : un seul parcours avec progression"""
+    scanner = CubaseScanner()
+    scanner.scan_tree(directory, progress_callback=lambda files, size: None)
+    return scanner
+
+
+def measure(func, directory):
+    """Durée d'exécution de func(directory) en secondes"""
+    start = time.perf_counter()
+    func(directory)
+    return time.perf_counter() - start
+
+
+def main():
+    base = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    timings = {}
+    for n_folders in (base, base * SCALE):
+        with tempfile.TemporaryDirectory() as tmp:
+            n_files = build_tree(Path(tmp), n_folders)
+            old = measure(scan_per_walk_root, tmp)
+            new = measure(scan_single_pass, tmp)
+            timings[n_folders] = new
+            print(f"{n_folders:>6} dossiers, {n_files:>7} fichiers : "
+                  f"ancien {old:.3f} s, nouveau {new:.3f} s")
+    
+    ratio = timings[base * SCALE] / timings[base]
+    print(f"Taille x{SCALE} -> temps x{ratio:.2f} (limite x{MAX_RATIO:.1f})")
+    if ratio > MAX_RATIO:
+        print("ÉCHEC : le scan n'est plus linéaire en taille d'arborescence")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
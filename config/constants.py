@@ -20,6 +20,10 @@ DEFAULT_PREFS_DIR = "~/.trie_morceaux"
 DEFAULT_PREFS_FILE = "preferences.json"
 DEFAULT_METADATA_FILE = "metadata.json"
 DEFAULT_NOTES_FILE = "notes.txt"
+DEFAULT_SCAN_INDEX_FILE = "scan_index.sqlite"
+DEFAULT_VSTI_CACHE_FILE = "vsti_cache.sqlite"
+DEFAULT_METADATA_INDEX_FILE = "metadata_index.sqlite"
+DEFAULT_PEAKS_DIR = "peaks"
 
 # Configuration de l'interface
 UI_WINDOW_TITLE = "Tri Morceaux Cubase"
@@ -34,7 +38,8 @@ PROJECT_COLUMNS = [
     "Fichiers CPR",
     "Fichiers BAK",
     "Fichiers WAV",
-    "Source"
+    "Source",
+    "BPM"
 ]
 
 # Colonnes de l'arborescence des fichiers
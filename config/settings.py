@@ -22,6 +22,12 @@ class Settings:
         self.cubase_path = ""
         self.last_workspace = ""
         self.last_mode = "workspace"  # Mode par défaut (workspace ou tri)
+        self.parallel_scan = True  # Scan simultané des sources en mode Tri
+        self.inventory_workers = 0  # Processus de l'inventaire des plugins (0 : un par cœur)
+        self.inventory_chunksize = 8  # Projets envoyés à la fois à chaque processus
+        self.analysis_workers = 2  # Threads des analyses en arrière-plan (VSTi, audio)
+        self.prefetch_radius = 3  # Projets voisins préchargés de chaque côté de la sélection (0 : désactivé)
+        self.prefetch_memory_mb = 8  # Mémoire maximale des données préchargées
         self.prefs_dir = Path(os.path.expanduser(DEFAULT_PREFS_DIR))
         self.prefs_file = self.prefs_dir / DEFAULT_PREFS_FILE
     
@@ -38,7 +44,13 @@ class Settings:
             'last_notes': self.last_notes,
             'cubase_path': self.cubase_path,
             'last_workspace': self.last_workspace,
-            'last_mode': self.last_mode
+            'last_mode': self.last_mode,
+            'parallel_scan': self.parallel_scan,
+            'inventory_workers': self.inventory_workers,
+            'inventory_chunksize': self.inventory_chunksize,
+            'analysis_workers': self.analysis_workers,
+            'prefetch_radius': self.prefetch_radius,
+            'prefetch_memory_mb': self.prefetch_memory_mb
         }
         
         # Sauvegarde dans le fichier JSON
@@ -62,6 +74,12 @@ class Settings:
             self.cubase_path = prefs.get('cubase_path', "")
             self.last_workspace = prefs.get('last_workspace', "")
             self.last_mode = prefs.get('last_mode', "workspace")
+            self.parallel_scan = prefs.get('parallel_scan', True)
+            self.inventory_workers = prefs.get('inventory_workers', 0)
+            self.inventory_chunksize = prefs.get('inventory_chunksize', 8)
+            self.analysis_workers = prefs.get('analysis_workers', 2)
+            self.prefetch_radius = prefs.get('prefetch_radius', 3)
+            self.prefetch_memory_mb = prefs.get('prefetch_memory_mb', 8)
         except Exception as e:
             print(f"Erreur lors du chargement des préférences: {e}")
     
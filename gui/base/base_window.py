@@ -12,7 +12,7 @@ from PyQt5.QtWidgets import (
     QToolBar, QAction, QStatusBar, QLabel, QSplitter,
     QApplication, QMessageBox
 )
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
 from PyQt5.QtGui import QIcon
 
 from config.constants import UI_WINDOW_TITLE, UI_MIN_WIDTH, UI_MIN_HEIGHT
@@ -21,6 +21,9 @@ from config.settings import settings
 class BaseWindow(QMainWindow):
     """Classe de base pour les fenêtres principales de l'application"""
     
+    # Échec d'une écriture différée de métadonnées (chemin, message), reçu dans le thread de l'interface
+    metadata_save_failed = pyqtSignal(str, str)
+    
     def __init__(self):
         """Initialisation de la fenêtre de base"""
         super().__init__()
@@ -123,6 +126,53 @@ class BaseWindow(QMainWindow):
         # Accepter l'événement de fermeture
         event.accept()
     
+    def watch_metadata_errors(self, metadata_service):
+        """
+        Affichage des échecs d'écriture différée des métadonnées
+        
+        Args:
+            metadata_service (MetadataService): Service dont les écritures sont suivies
+        """
+        self._watched_metadata_service = metadata_service
+        self._reported_metadata_errors = set()
+        self.metadata_save_failed.connect(self.on_metadata_save_failed)
+        metadata_service.add_error_callback(self._emit_metadata_error)
+    
+    def _emit_metadata_error(self, path, error):
+        """Relais d'un échec d'écriture (thread d'écriture) vers le thread de l'interface"""
+        self.metadata_save_failed.emit(str(path), str(error))
+    
+    def on_metadata_save_failed(self, path, message):
+        """
+        Échec d'une écriture de métadonnées : avertissement au premier échec
+        d'un fichier, puis barre de statut (l'écriture est retentée)
+        
+        Args:
+            path (str): Fichier de métadonnées
+            message (str): Erreur
+        """
+        self.statusBar.showMessage(f"Erreur lors de la sauvegarde des métadonnées ({path}): {message}, nouvel essai prévu")
+        if path not in self._reported_metadata_errors:
+            self._reported_metadata_errors.add(path)
+            self.show_warning("Erreur", f"Erreur lors de la sauvegarde des métadonnées:\n{path}\n{message}\n\n"
+                              "La modification est conservée et l'écriture sera retentée.")
+    
+    def flush_metadata(self):
+        """
+        Écriture des métadonnées en attente avant la fermeture, avec un
+        avertissement si certaines n'ont pas pu être écrites
+        
+        Returns:
+            bool: True si tout a été écrit
+        """
+        metadata_service = self._watched_metadata_service
+        metadata_service.remove_error_callback(self._emit_metadata_error)
+        if metadata_service.flush():
+            return True
+        self.show_warning("Erreur", "Certaines métadonnées n'ont pas pu être enregistrées "
+                          "(voir la console). Vérifiez les droits d'écriture des dossiers concernés.")
+        return False
+    
     def switch_mode(self):
         """Basculer entre les modes Tri et Espace de Travail"""
         try:
@@ -90,6 +90,23 @@ class FileTree(QTreeView):
             # Masquer les dossiers parents (..) dans le modèle
             self.fs_model.setFilter(self.fs_model.filter() | QDir.NoDotAndDotDot)
     
+    def prefetch(self, paths):
+        """
+        Chargement anticipé de dossiers dans le modèle (sans changer la racine)
+        
+        Le contenu est lu par le thread de QFileSystemModel ; un dossier
+        déjà chargé s'affiche immédiatement quand il devient la racine.
+        
+        Args:
+            paths (list): Chemins des dossiers
+        """
+        for path in paths:
+            if not path or not os.path.isdir(path):
+                continue
+            index = self.fs_model.index(path)
+            if index.isValid() and self.fs_model.canFetchMore(index):
+                self.fs_model.fetchMore(index)
+    
     def get_selected_path(self):
         """
         Récupération du chemin de l'élément sélectionné
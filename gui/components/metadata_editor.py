@@ -166,8 +166,9 @@ class MetadataEditor(QWidget):
         Args:
             tags (list): Liste de tous les tags
         """
-        self.all_tags = tags
-        self.tag_completer.setModel(self.tag_completer.model())
+        self.all_tags = list(tags)
+        # Modèle créé par QCompleter à partir de la liste initiale
+        self.tag_completer.model().setStringList(self.all_tags)
     
     def set_metadata(self, metadata):
         """
@@ -5,18 +5,78 @@
 Composant de table des projets pour l'application
 """
 
+import threading
+
 from PyQt5.QtWidgets import (
     QTableView, QHeaderView, QAbstractItemView
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QSortFilterProxyModel
 
 from models.project_model import ProjectTableModel
+from services.project_search import ProjectSearchIndex, name_matches, parse_query
+
+class ProjectSortFilterProxyModel(QSortFilterProxyModel):
+    """
+    Proxy de filtrage dont le tri est délégué au modèle source (tri vectorisé)
+    
+    Le filtre est un ensemble de noms de projets (résultat de
+    ProjectSearchIndex.search) : une ligne est gardée si son projet en fait
+    partie, sans relire le texte des colonnes.
+    """
+    
+    def __init__(self, parent=None):
+        """
+        Initialisation du proxy (aucun filtre)
+        
+        Args:
+            parent (QObject): Objet parent
+        """
+        super().__init__(parent)
+        self._accepted = None
+    
+    def set_accepted_names(self, names):
+        """
+        Définition des projets affichés
+        
+        Args:
+            names (set): Noms des projets gardés, None pour tout afficher
+        """
+        if names is None and self._accepted is None:
+            return
+        self._accepted = names
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        """
+        Args:
+            source_row (int): Ligne du modèle source
+            source_parent (QModelIndex): Parent (table : invalide)
+        
+        Returns:
+            bool: True si le projet de la ligne fait partie du résultat de la recherche
+        """
+        accepted = self._accepted
+        if accepted is None:
+            return True
+        return self.sourceModel().project_names()[source_row] in accepted
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Tri des projets par le modèle source
+        
+        Args:
+            column (int): Indice de la colonne
+            order (Qt.SortOrder): Ordre de tri
+        """
+        self.sourceModel().sort(column, order)
 
 class ProjectTable(QTableView):
     """Composant de table des projets basé sur QTableView"""
     
     # Signaux personnalisés
     project_selected = pyqtSignal(dict)
+    # Index de recherche construit en arrière-plan (génération, index)
+    search_index_ready = pyqtSignal(int, object)
     
     def __init__(self, parent=None):
         """
@@ -31,9 +91,17 @@ class ProjectTable(QTableView):
         self.project_model = ProjectTableModel()
         
         # Modèle de proxy pour le tri et le filtrage
-        self.proxy_model = QSortFilterProxyModel()
+        self.proxy_model = ProjectSortFilterProxyModel()
         self.proxy_model.setSourceModel(self.project_model)
-        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        
+        # Index de recherche (construit en fin de scan) et requête courante
+        self.search_index = ProjectSearchIndex()
+        self._search_generation = 0
+        self._query = ""
+        self.search_index_ready.connect(self._on_search_index_ready)
+        
+        # Vrai si le dernier clic a porté sur la ligne déjà courante
+        self._reclicked = False
         
         # Configuration de la vue
         self.setModel(self.proxy_model)
@@ -43,8 +111,10 @@ class ProjectTable(QTableView):
         self.setSortingEnabled(True)
         
         # Connexion des signaux
-        self.clicked.connect(self._on_project_clicked)
-        self.doubleClicked.connect(self._on_project_double_clicked)
+        # La ligne courante suit aussi bien la souris que les flèches du clavier
+        self.selectionModel().currentRowChanged.connect(self._on_current_row_changed)
+        # Un clic sur la ligne courante ne la change pas : le projet est émis à nouveau
+        self.clicked.connect(self._on_clicked)
     
     def update_data(self, projects, view_mode=None):
         """
@@ -56,14 +126,114 @@ class ProjectTable(QTableView):
         """
         self.project_model.update_data(projects, view_mode)
     
+    def append_projects(self, projects):
+        """
+        Ajout progressif de projets pendant un scan
+        
+        Args:
+            projects (list): Lignes de synthèse des projets
+        """
+        self.project_model.append_projects(projects)
+    
+    def merge_data(self, projects):
+        """
+        Intégration des résultats définitifs d'un scan sans réinitialiser la table
+        
+        Args:
+            projects (list): Liste complète des projets
+        """
+        self.project_model.merge_data(projects)
+    
     def set_filter(self, text):
         """
         Définition du filtre de recherche
         
         Args:
-            text (str): Texte de recherche
+            text (str): Requête (voir parse_query : mots, tag:, plugin:, rating>=...)
+        """
+        self._query = text
+        self._apply_filter()
+    
+    def _apply_filter(self):
+        """Application de la requête courante au proxy"""
+        if not self._query.strip():
+            self.proxy_model.set_accepted_names(None)
+        elif len(self.search_index) == 0:
+            # Index pas encore construit (scan en cours) : seuls le texte libre et
+            # name: sont vérifiables, sur les noms affichés ; sans eux, pas de filtre
+            terms = [term for term in parse_query(self._query) if term.field in (None, 'name')]
+            self.proxy_model.set_accepted_names(
+                {name for name in self.project_model.project_names() if name_matches(name, terms)}
+                if terms else None)
+        else:
+            self.proxy_model.set_accepted_names(self.search_index.search(self._query))
+    
+    def build_search_index(self, projects=None):
+        """
+        Construction de l'index de recherche à partir des projets affichés
+        
+        L'index est construit dans un thread (noms de fichiers de tous les
+        projets) puis installé dans le thread de l'interface ; en attendant,
+        le filtre porte sur les noms des projets.
+        
+        Args:
+            projects (dict): Projets détaillés du scanner, pour les noms de fichiers (facultatif)
+        """
+        self._search_generation += 1
+        generation = self._search_generation
+        frame = self.project_model.projects_frame().copy()
+        
+        def build():
+            index = ProjectSearchIndex()
+            try:
+                index.build(frame, projects)
+            except Exception as e:
+                print(f"Erreur lors de la construction de l'index de recherche : {e}")
+                return
+            try:
+                self.search_index_ready.emit(generation, index)
+            except RuntimeError:
+                # Table détruite pendant la construction
+                pass
+        
+        threading.Thread(target=build, name="index-recherche", daemon=True).start()
+    
+    def _on_search_index_ready(self, generation, index):
+        """
+        Installation d'un index de recherche construit en arrière-plan
+        
+        Args:
+            generation (int): Numéro de la construction (les plus anciennes sont ignorées)
+            index (ProjectSearchIndex): Index construit
+        """
+        if generation != self._search_generation:
+            return
+        self.search_index = index
+        self._apply_filter()
+    
+    def update_search_metadata(self, project_name, metadata):
+        """
+        Mise à jour de la recherche après l'enregistrement des métadonnées d'un projet
+        
+        Args:
+            project_name (str): Nom du projet
+            metadata (dict): Métadonnées enregistrées
+        """
+        if project_name in self.search_index:
+            self.search_index.update_metadata(project_name, metadata)
+            self._apply_filter()
+    
+    def update_search_plugins(self, project_name, plugins):
+        """
+        Mise à jour de la recherche après l'analyse des plugins d'un projet
+        
+        Args:
+            project_name (str): Nom du projet
+            plugins (set): Plugins détectés
         """
-        self.proxy_model.setFilterFixedString(text)
+        if project_name in self.search_index:
+            self.search_index.update_plugins(project_name, plugins)
+            self._apply_filter()
     
     def set_sort_column(self, column, order=Qt.AscendingOrder):
         """
@@ -95,26 +265,69 @@ class ProjectTable(QTableView):
         # Récupération du projet dans le modèle source
         return self.project_model.get_project(source_row)
     
-    def _on_project_clicked(self, index):
+    def neighbour_projects(self, radius):
         """
-        Gestion du clic sur un projet
+        Projets voisins de la ligne courante, dans l'ordre affiché (tri et filtre)
         
         Args:
-            index (QModelIndex): Index du projet cliqué
+            radius (int): Nombre de lignes de chaque côté
+        
+        Returns:
+            list: Projets, du plus proche au plus lointain (ligne suivante avant la précédente)
         """
-        project = self.get_selected_project()
-        if project:
-            self.project_selected.emit(project)
+        current = self.currentIndex()
+        if not current.isValid() or radius <= 0:
+            return []
+        row_count = self.proxy_model.rowCount()
+        projects = []
+        for distance in range(1, radius + 1):
+            for row in (current.row() + distance, current.row() - distance):
+                if 0 <= row < row_count:
+                    source_row = self.proxy_model.mapToSource(self.proxy_model.index(row, 0)).row()
+                    projects.append(self.project_model.get_project(source_row))
+        return projects
+    
+    def _on_current_row_changed(self, current, previous):
+        """
+        Gestion du changement de ligne courante (clic ou clavier)
+        
+        Args:
+            current (QModelIndex): Nouvelle ligne courante
+            previous (QModelIndex): Ligne courante précédente
+        """
+        if current.isValid():
+            self._emit_project(current.row())
+    
+    def mousePressEvent(self, event):
+        """Relevé de la ligne cliquée avant que le clic ne change la ligne courante"""
+        index = self.indexAt(event.pos())
+        self._reclicked = index.isValid() and index.row() == self.currentIndex().row()
+        super(ProjectTable, self).mousePressEvent(event)
+    
+    def _on_clicked(self, index):
+        """
+        Nouveau clic sur la ligne courante : le projet est émis à nouveau
+        (un clic sur une autre ligne passe par _on_current_row_changed)
+        
+        Args:
+            index (QModelIndex): Index cliqué
+        """
+        if self._reclicked:
+            # Une seule émission par clic, même en cas de double-clic
+            self._reclicked = False
+            self._emit_project(index.row())
     
-    def _on_project_double_clicked(self, index):
+    def _emit_project(self, proxy_row):
         """
-        Gestion du double-clic sur un projet
+        Émission de project_selected pour une ligne affichée
         
         Args:
-            index (QModelIndex): Index du projet double-cliqué
+            proxy_row (int): Ligne dans le modèle de proxy
         """
-        # Même comportement que le clic simple pour l'instant
-        self._on_project_clicked(index)
+        source_row = self.proxy_model.mapToSource(self.proxy_model.index(proxy_row, 0)).row()
+        project = self.project_model.get_project(source_row)
+        if project:
+            self.project_selected.emit(project)
     
     def set_dark_mode(self, enabled):
         """
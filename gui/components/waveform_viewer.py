@@ -1,21 +1,51 @@
+import os
 import numpy as np
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPainter, QColor, QPen, QLinearGradient, QBrush
-from scipy.io import wavfile
+from PyQt5.QtCore import Qt, QRectF, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QPixmap, QImage
+
+from services.analysis_scheduler import AnalysisScheduler, PRIORITY_SELECTED
+from services.peak_cache import PeakCache, Peaks, EnvelopeStore
+
+# Plus petite partie du fichier affichable (images) : zoom au niveau de l'échantillon
+MIN_VIEW_FRAMES = 32
+
+# Grossissement par cran de molette, et défilement (part de la vue) par cran avec Maj
+ZOOM_STEP = 1.25
+SCROLL_STEP = 0.1
 
 class ModernWaveformPlayer(QWidget):
-    def __init__(self, parent=None):
+    # Réponses du chargement en arrière-plan, reçues dans le thread de l'interface
+    _waveform_partial = pyqtSignal(object, object, int)
+    _waveform_finished = pyqtSignal(object)
+    
+    def __init__(self, parent=None, scheduler=None):
+        """
+        Args:
+            parent (QWidget): Widget parent
+            scheduler (AnalysisScheduler): Ordonnanceur des chargements (défaut : un thread dédié,
+                que les analyses longues des projets ne retardent pas)
+        """
         super().__init__(parent)
         self.setMinimumHeight(100)
         self.setMinimumWidth(400)
         
         # Variables pour les données audio
-        self.waveform_data = None
+        self.peaks = None
+        self._store = None
         self.sample_rate = None
         self.duration = 0
         self.current_position = 0
         
+        # Chargement des crêtes en arrière-plan : une tâche par fichier, la précédente annulée
+        self._owns_scheduler = scheduler is None
+        self.scheduler = scheduler or AnalysisScheduler(max_workers=1)
+        self._waveform_job_key = None
+        self._waveform_path = None
+        self._waveform_loads = 0
+        self._waveform_partial.connect(self._on_waveform_partial)
+        self._waveform_finished.connect(self._on_waveform_finished)
+        
         # Interface
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -48,58 +78,149 @@ class ModernWaveformPlayer(QWidget):
         # Connexion des signaux de position/durée
         self.audio_player.player.positionChanged.connect(self.on_audio_position_changed)
         self.audio_player.player.durationChanged.connect(self.on_audio_duration_changed)
-
+    
     def on_audio_position_changed(self, position_ms):
         if self.duration > 0:
             progress = position_ms / (self.duration * 1000)
             self.waveform_widget.set_progress(progress)
             self.current_time_label.setText(self.format_time(position_ms / 1000))
-
+    
     def on_audio_duration_changed(self, duration_ms):
         self.duration = duration_ms / 1000
         self.duration_label.setText(self.format_time(self.duration))
         self.waveform_widget.set_duration(self.duration)
-
+    
     def load_file(self, file_path):
-        """Charge un fichier audio et prépare la visualisation"""
+        """
+        Charge un fichier audio et prépare la visualisation
+        
+        Les crêtes sont chargées en arrière-plan (fichier de crêtes s'il
+        est à jour, sinon lecture du fichier par blocs) : la fenêtre reste
+        utilisable. Un texte d'attente est affiché jusqu'à l'arrivée des
+        premières crêtes ; le chargement du fichier précédent est annulé.
+        
+        Args:
+            file_path (str): Chemin du fichier WAV
+        
+        Returns:
+            bool: True si le chargement est lancé
+        """
+        self.cancel_loading()
+        if not os.path.isfile(file_path):
+            print(f"Erreur lors du chargement du fichier audio: fichier introuvable {file_path}")
+            return False
+        
+        self.peaks = None
+        self._close_store()
+        self.waveform_widget.set_placeholder("Chargement de la forme d'onde...")
+        
+        # Clé propre à chaque demande : les réponses d'une demande annulée sont reconnues
+        self._waveform_loads += 1
+        job_key = ('waveform', os.path.normcase(os.path.abspath(file_path)), self._waveform_loads)
+        self._waveform_job_key = job_key
+        self._waveform_path = file_path
+        
+        def load_peaks(token, progress_callback):
+            return PeakCache.default().load(
+                file_path, cancel_token=token,
+                partial_callback=lambda peaks, total_frames: self._waveform_partial.emit(job_key, peaks, total_frames)
+            )
+        
         try:
-            # Charger les données audio
-            sample_rate, data = wavfile.read(file_path)
-            
-            # Conversion mono si stéréo
-            if len(data.shape) > 1:
-                data = np.mean(data, axis=1)
-            
-            # Normaliser les données
-            if data.dtype != np.float32:
-                data = data.astype(np.float32) / (2**15 if data.dtype == np.int16 else 2**31)
-            
-            # Sous-échantillonner pour l'affichage
-            # Pour un affichage fluide, réduire à ~1000-2000 points
-            n_points = min(1500, len(data))
-            step = max(1, len(data) // n_points)
-            waveform_data = data[::step]
-            
-            # Stocker les données
-            self.waveform_data = waveform_data
-            self.sample_rate = sample_rate
-            self.duration = len(data) / sample_rate
-            self.current_position = 0
-            
-            # Mettre à jour les labels
-            self.duration_label.setText(self.format_time(self.duration))
-            self.current_time_label.setText(self.format_time(0))
-            
-            # Mettre à jour le widget de forme d'onde
-            self.waveform_widget.set_waveform_data(waveform_data)
-            self.waveform_widget.set_duration(self.duration)
-            
-            return True
-        except Exception as e:
+            self.scheduler.submit(job_key, load_peaks, PRIORITY_SELECTED, callback=self._waveform_finished.emit)
+        except RuntimeError as e:
+            # Ordonnanceur arrêté (fermeture de la fenêtre)
             print(f"Erreur lors du chargement du fichier audio: {e}")
-            import traceback
-            traceback.print_exc()
             return False
+        return True
+    
+    def cancel_loading(self):
+        """Annulation du chargement en cours (le résultat éventuel sera ignoré)"""
+        job_key, self._waveform_job_key = self._waveform_job_key, None
+        if job_key is not None:
+            self.scheduler.cancel(job_key)
+    
+    def shutdown(self):
+        """Arrêt des chargements (fermeture de la fenêtre)"""
+        self.cancel_loading()
+        self._close_store()
+        if self._owns_scheduler:
+            self.scheduler.shutdown(wait=False)
+    
+    def _on_waveform_partial(self, job_key, peaks, total_frames):
+        """
+        Crêtes partielles d'un fichier en cours de lecture (thread de l'interface)
+        
+        Args:
+            job_key (tuple): Tâche de chargement
+            peaks (Peaks): Crêtes du début du fichier
+            total_frames (int): Nombre d'images du fichier entier
+        """
+        if job_key != self._waveform_job_key:
+            # Fichier qui n'est plus sélectionné
+            return
+        if self.sample_rate != peaks.sample_rate or self.waveform_widget.placeholder:
+            self.sample_rate = peaks.sample_rate
+            self._set_duration(total_frames / peaks.sample_rate if peaks.sample_rate else 0)
+            self.waveform_widget.set_source(peaks, total_frames, reset_view=True)
+        else:
+            self.waveform_widget.set_source(peaks, total_frames)
+    
+    def _on_waveform_finished(self, job):
+        """
+        Fin du chargement des crêtes (thread de l'interface)
+        
+        Args:
+            job (AnalysisJob): Tâche terminée ou annulée
+        """
+        if job.key != self._waveform_job_key or job.cancelled:
+            return
+        self._waveform_job_key = None
+        if job.error is not None:
+            print(f"Erreur lors du chargement du fichier audio: {job.error}")
+            self.waveform_widget.set_placeholder("Forme d'onde indisponible")
+            return
+        peaks = job.result
+        first = self.waveform_widget.placeholder is not None
+        if first:
+            # Crêtes lues depuis leur fichier : pas de réponse partielle avant
+            self.sample_rate = peaks.sample_rate
+            self._set_duration(peaks.duration)
+        self._show_peaks(self._waveform_path, peaks, peaks.frames, reset_view=first)
+    
+    def _close_store(self):
+        """Fermeture du fichier audio ouvert pour les zooms forts"""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+    
+    def _set_duration(self, duration):
+        """Durée du fichier ouvert (labels remis à zéro)"""
+        self.duration = duration
+        self.current_position = 0
+        self.duration_label.setText(self.format_time(self.duration))
+        self.current_time_label.setText(self.format_time(0))
+        self.waveform_widget.set_duration(self.duration)
+    
+    def _show_peaks(self, file_path, peaks, total_frames, reset_view=False):
+        """
+        Affichage des crêtes
+        
+        Args:
+            file_path (str): Chemin du fichier WAV
+            peaks (Peaks): Crêtes complètes ou partielles (début du fichier)
+            total_frames (int): Nombre d'images du fichier entier
+            reset_view (bool): Afficher le fichier entier (nouveau fichier)
+        """
+        self._close_store()
+        if peaks.frames >= total_frames:
+            # Crêtes complètes : zoom jusqu'à l'échantillon (lu dans le fichier)
+            self.peaks = peaks
+            self._store = EnvelopeStore(file_path, peaks)
+            self.waveform_widget.set_source(self._store, total_frames, reset_view)
+        else:
+            self.peaks = None
+            self.waveform_widget.set_source(peaks, total_frames, reset_view)
     
     def play_pause(self):
         """Démarre ou met en pause la lecture"""
@@ -130,115 +251,348 @@ class ModernWaveformPlayer(QWidget):
         return f"{minutes}:{seconds:02d}"
 
 
+def _coverage(top, bottom, height):
+    """
+    Part de chaque pixel couverte par une bande verticale par colonne
+    (anticrénelage des bords)
+    
+    Args:
+        top (ndarray): Haut de la bande de chaque colonne (pixels)
+        bottom (ndarray): Bas de la bande
+        height (int): Hauteur de l'image
+    
+    Returns:
+        ndarray: Couverture (hauteur x colonnes) entre 0 et 1
+    """
+    rows = np.arange(height, dtype=np.float32)[:, None]
+    return np.clip(np.minimum(rows + 1, bottom) - np.maximum(rows, top), 0, 1)
+
+
 class WaveformWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumHeight(80)
         
         # Données pour le rendu
-        self.waveform_data = None
         self.progress = 0  # 0 à 1
         self.duration = 0  # Durée en secondes
         
+        # Source de l'enveloppe (Peaks ou EnvelopeStore), nombre d'images du fichier entier
+        # et amplitude maximale (même échelle à tous les zooms)
+        self._source = None
+        self._total_frames = 0
+        self._max_amp = 1.0
+        
+        # Texte affiché sans enveloppe (chargement en cours, fichier illisible)
+        self.placeholder = None
+        
+        # Partie visible du fichier (images)
+        self.view_start = 0
+        self.view_end = 0
+        
+        # Rendu en cache : forme d'onde jouée et restante, pour une taille, une vue et un contenu donnés
+        self._layers = None
+        self._layers_key = None
+        
         # Couleurs
         self.played_color = QColor(255, 120, 0)  # Orange pour la partie jouée
         self.remaining_color = QColor(241, 184, 140)  # Blanc pour la partie restante
         self.background_color = QColor(30, 30, 30, 0)  # Fond presque noir
-
-    def set_duration(self, duration):
-        self.duration = duration
-        self.update()
-
+    
     def format_time(self, seconds):
         seconds = int(seconds)
         minutes = seconds // 60
         seconds = seconds % 60
         return f"{minutes}:{seconds:02d}"
+    
+    def set_source(self, source, total_frames, reset_view=False):
+        """
+        Définit l'enveloppe à afficher
         
-    def set_waveform_data(self, data):
-        """Définit les données de forme d'onde à afficher"""
-        self.waveform_data = data
+        Args:
+            source (Peaks|EnvelopeStore): Enveloppe du fichier, éventuellement partielle
+                (début du fichier pendant le calcul des crêtes)
+            total_frames (int): Nombre d'images du fichier entier
+            reset_view (bool): Afficher le fichier entier (nouveau fichier)
+        """
+        self._source = source
+        self.placeholder = None
+        if reset_view or total_frames != self._total_frames:
+            self.view_start, self.view_end = 0, total_frames
+        self._total_frames = total_frames
+        max_amp = source.amplitude() if source is not None else 0.0
+        # Silence, ou début du fichier pas encore lu
+        self._max_amp = max_amp if max_amp > 0 else 1.0
+        self._layers = None
         self.update()
-
+    
+    def set_placeholder(self, text):
+        """
+        Retire l'enveloppe et affiche un texte à sa place
+        
+        Args:
+            text (str): Texte affiché au centre du widget
+        """
+        self._source = None
+        self._total_frames = 0
+        self.view_start = self.view_end = 0
+        self._layers = None
+        self.placeholder = text
+        self.update()
+    
+    def set_envelope(self, mins, maxs, rms=None):
+        """
+        Définit directement l'enveloppe à afficher (sans zoom au-delà de ses points)
+        
+        Args:
+            mins (ndarray): Minimum de chaque point (dans [-1, 1])
+            maxs (ndarray): Maximum de chaque point
+            rms (ndarray): Valeur efficace de chaque point (défaut : enveloppe pleine)
+        """
+        maxs = np.asarray(maxs, dtype=np.float32)
+        level = np.stack([np.asarray(mins, dtype=np.float32), maxs,
+                          maxs if rms is None else np.asarray(rms, dtype=np.float32)], axis=1)
+        self.set_source(Peaks(1, len(level), 1, [(1, level)]), len(level), reset_view=True)
+    
+    def set_waveform_data(self, data):
+        """Définit les données de forme d'onde à afficher (amplitude crête de chaque point)"""
+        data = np.asarray(data, dtype=np.float32)
+        self.set_envelope(-data, data)
+    
     def set_duration(self, duration):
         self.duration = duration
+        self._layers = None
         self.update()
-
-    def mousePressEvent(self, event):
-        if self.waveform_data is None or not hasattr(self.parent(), 'on_waveform_seek'):
+    
+    def set_view(self, start, end):
+        """
+        Affichage d'une partie du fichier
+        
+        Args:
+            start (float): Première image visible
+            end (float): Image de fin visible (exclue)
+        """
+        total = self._total_frames
+        length = min(total, max(end - start, MIN_VIEW_FRAMES))
+        start = min(max(0, start), total - length)
+        view = (int(round(start)), int(round(start + length)))
+        if view != (self.view_start, self.view_end):
+            self.view_start, self.view_end = view
+            self.update()
+    
+    def reset_view(self):
+        """Affichage du fichier entier"""
+        self.set_view(0, self._total_frames)
+    
+    def zoom(self, factor, anchor_x=None):
+        """
+        Zoom autour d'une position de l'écran
+        
+        Args:
+            factor (float): Facteur de grossissement (> 1 : zoom avant)
+            anchor_x (float): Abscisse qui reste en place (défaut : centre)
+        """
+        if self._total_frames <= 0 or self.width() <= 0:
             return
-        x = event.x()
-        percent = x / self.width()
-        self.parent().on_waveform_seek(percent)
-
+        if anchor_x is None:
+            anchor_x = self.width() / 2
+        fraction = anchor_x / self.width()
+        length = self.view_end - self.view_start
+        anchor = self.view_start + fraction * length
+        new_length = min(self._total_frames, max(length / factor, MIN_VIEW_FRAMES))
+        self.set_view(anchor - fraction * new_length, anchor - fraction * new_length + new_length)
+    
+    def scroll(self, frames):
+        """
+        Défilement de la vue
         
+        Args:
+            frames (float): Déplacement en images (> 0 : vers la fin du fichier)
+        """
+        self.set_view(self.view_start + frames, self.view_end + frames)
+    
+    def _frame_at(self, x):
+        """Image affichée à une abscisse"""
+        return self.view_start + x / max(1, self.width()) * (self.view_end - self.view_start)
+    
+    def _x_at(self, frame):
+        """Abscisse d'une image (hors de l'écran si elle n'est pas visible)"""
+        length = self.view_end - self.view_start
+        return (frame - self.view_start) / length * self.width() if length > 0 else 0
+    
+    def mousePressEvent(self, event):
+        if self._source is None or self._total_frames <= 0 or not hasattr(self.parent(), 'on_waveform_seek'):
+            return
+        percent = self._frame_at(event.x()) / self._total_frames
+        self.parent().on_waveform_seek(max(0, min(1, percent)))
+    
+    def mouseDoubleClickEvent(self, event):
+        """Double-clic : retour au fichier entier"""
+        self.reset_view()
+    
+    def wheelEvent(self, event):
+        """
+        Molette : zoom autour du pointeur ; Maj + molette ou molette
+        horizontale : défilement
+        """
+        if self._source is None or self._total_frames <= 0:
+            event.ignore()
+            return
+        delta = event.angleDelta()
+        length = self.view_end - self.view_start
+        if event.modifiers() & Qt.ShiftModifier or abs(delta.x()) > abs(delta.y()):
+            steps = (delta.x() or delta.y()) / 120
+            self.scroll(-steps * SCROLL_STEP * length)
+        else:
+            self.zoom(ZOOM_STEP ** (delta.y() / 120), event.x())
+        event.accept()
+    
     def set_progress(self, progress):
-        """Définit la progression de la lecture (0-1)"""
-        self.progress = max(0, min(1, progress))
-        self.update()
+        """
+        Définit la progression de la lecture (0-1)
         
-    def paintEvent(self, event):
-        """Dessine la forme d'onde"""
-        if self.waveform_data is None:
-            return
-            
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        Seule la bande entre l'ancienne et la nouvelle position est
+        redessinée, et seulement si la position a changé d'au moins un pixel
+        (ou rien si elle reste hors de la vue).
+        """
+        progress = max(0, min(1, progress))
+        old_x = int(self._x_at(self.progress * self._total_frames))
+        new_x = int(self._x_at(progress * self._total_frames))
+        self.progress = progress
+        old_x, new_x = (max(-1, min(self.width() + 1, x)) for x in (old_x, new_x))
+        if old_x != new_x:
+            self.update(min(old_x, new_x) - 1, 0, abs(new_x - old_x) + 2, self.height())
+    
+    def resizeEvent(self, event):
+        self._layers = None
+        super().resizeEvent(event)
+    
+    def _view_envelope(self, columns):
+        """
+        Enveloppe de la partie visible, un point par colonne
         
-        # Fond
-        painter.fillRect(self.rect(), self.background_color)
+        Seul l'intervalle visible est lu, au niveau de détail adapté. La
+        partie pas encore calculée (chargement en cours) reste plate.
         
-        # Dimensions
-        width = self.width()
-        height = self.height()
-        center_y = height / 2
+        Args:
+            columns (int): Nombre de colonnes de pixels
         
-        # Position de progression
-        progress_x = int(width * self.progress)
+        Returns:
+            tuple: Tableaux (min, max, rms) de columns valeurs
+        """
+        envelope = np.zeros((3, columns), dtype=np.float32)
+        start, end = self.view_start, self.view_end
+        available = min(end, self._source.frames)
+        if available > start and end > start:
+            loaded = min(columns, int(round(columns * (available - start) / (end - start))))
+            if loaded:
+                window = self._source.window(start, start + loaded * (end - start) / columns, loaded)
+                envelope[:, :len(window[0])] = window
+        return envelope
+    
+    def _render_layers(self, width, height):
+        """
+        Rendu de la partie visible dans les deux couleurs (jouée et restante)
         
-        # Dessin de la forme d'onde
-        if len(self.waveform_data) > 0:
-            # Distance entre chaque point
-            dx = width / len(self.waveform_data)
-            
-            # Amplitude maximale pour la mise à l'échelle
-            max_amp = max(abs(self.waveform_data.min()), abs(self.waveform_data.max()))
-            scale = (height * 0.8) / (max_amp * 2)
+        Enveloppe min/max en couleur atténuée et bande RMS en couleur
+        pleine, une colonne par pixel de l'écran : la couverture de chaque
+        pixel est calculée une fois par numpy, sans boucle ni tracé Qt,
+        puis colorée deux fois.
+        
+        Args:
+            width (int): Largeur en pixels logiques
+            height (int): Hauteur en pixels logiques
+        
+        Returns:
+            tuple: Rendus (QPixmap) joué et restant, à la résolution de l'écran
+        """
+        ratio = self.devicePixelRatioF()
+        columns, rows = max(1, int(width * ratio)), max(1, int(height * ratio))
+        mins, maxs, rms = self._view_envelope(columns)
+        center_y = rows / 2
+        scale = (rows * 0.8) / (self._max_amp * 2)
+        # Au moins un pixel d'épaisseur : le silence reste visible
+        top = np.minimum(center_y - maxs * scale, center_y - 0.5 * ratio).astype(np.float32)
+        bottom = np.maximum(center_y - mins * scale, center_y + 0.5 * ratio).astype(np.float32)
+        band = rms * scale
+        alpha = _coverage(top, bottom, rows) * 150
+        alpha += _coverage(np.maximum(center_y - band, top), np.minimum(center_y + band, bottom), rows) * 105
+        alpha = alpha.astype(np.uint8)
+        
+        # Repères de temps : début et fin de la partie visible (au millième de seconde en zoom fort)
+        rate = self._total_frames / self.duration if self.duration > 0 else 0
+        labels = ["0:00", self.format_time(self.duration)]
+        if rate and (self.view_start, self.view_end) != (0, self._total_frames):
+            precise = (self.view_end - self.view_start) / rate < 10
+            labels = [self._format_position(frame / rate, precise) for frame in (self.view_start, self.view_end)]
+        
+        layers = []
+        for color in (self.played_color, self.remaining_color):
+            # ARGB prémultiplié, par table de correspondance (une valeur par opacité)
+            opacity = np.arange(256, dtype=np.uint32)
+            palette = (opacity << 24) | ((opacity * color.red() // 255) << 16) \
+                | ((opacity * color.green() // 255) << 8) | (opacity * color.blue() // 255)
+            pixels = palette[alpha]
+            image = QImage(pixels.data, columns, rows, columns * 4, QImage.Format_ARGB32_Premultiplied)
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(ratio)
             
-            # Dessin de chaque segment de la forme d'onde
-            for i in range(len(self.waveform_data) - 1):
-                x1 = i * dx
-                x2 = (i + 1) * dx
-                
-                amp1 = self.waveform_data[i] * scale
-                amp2 = self.waveform_data[i + 1] * scale
-                
-                y1 = center_y - amp1
-                y2 = center_y - amp2
-                
-                # Choisir la couleur selon la position
-                if x1 <= progress_x:
-                    pen = QPen(self.played_color, 2)
-                else:
-                    pen = QPen(self.remaining_color, 2)
-                
-                painter.setPen(pen)
-                painter.drawLine(int(x1), int(y1), int(x2), int(y2))
-                
-                # Dessiner aussi la partie inférieure de la forme d'onde
-                y1_bottom = center_y + amp1
-                y2_bottom = center_y + amp2
-                painter.drawLine(int(x1), int(y1_bottom), int(x2), int(y2_bottom))
-        
-        # Dessiner les indicateurs de temps
-        time_font = painter.font()
-        time_font.setPointSize(8)
-        painter.setFont(time_font)
-        
-        # Début (toujours orange)
-        painter.setPen(self.played_color)
-        painter.drawText(5, height - 5, "0:00")
-        
-        # Fin (toujours blanc)
-        painter.setPen(self.remaining_color)
-        painter.drawText(width - 40, height - 5, self.format_time(self.duration))
\ No newline at end of file
+            painter = QPainter(pixmap)
+            time_font = painter.font()
+            time_font.setPointSize(8)
+            painter.setFont(time_font)
+            # Début (toujours orange)
+            painter.setPen(self.played_color)
+            painter.drawText(5, height - 5, labels[0])
+            # Fin (toujours blanc)
+            painter.setPen(self.remaining_color)
+            end_width = painter.fontMetrics().horizontalAdvance(labels[1])
+            painter.drawText(width - max(40, end_width + 5), height - 5, labels[1])
+            painter.end()
+            layers.append(pixmap)
+        return tuple(layers)
+    
+    def _format_position(self, seconds, precise):
+        """Position dans le fichier (minutes:secondes, avec les millièmes si precise)"""
+        if not precise:
+            return self.format_time(seconds)
+        minutes = int(seconds) // 60
+        return f"{minutes}:{seconds - minutes * 60:06.3f}"
+    
+    def _ensure_layers(self):
+        """Rendus en cache à jour pour la taille et la vue courantes (recalculés après un changement)"""
+        key = (self.width(), self.height(), self.devicePixelRatioF(), self.view_start, self.view_end)
+        if self._layers is None or self._layers_key != key:
+            self._layers = self._render_layers(self.width(), self.height())
+            self._layers_key = key
+    
+    def paintEvent(self, event):
+        """
+        Dessine la forme d'onde
+        
+        Les deux rendus en cache sont copiés de part et d'autre de la
+        position de lecture, sur la zone à repeindre seulement.
+        """
+        if self._source is None or self._total_frames <= 0:
+            if self.placeholder:
+                painter = QPainter(self)
+                painter.setPen(self.remaining_color)
+                painter.drawText(self.rect(), Qt.AlignCenter, self.placeholder)
+                painter.end()
+            return
+        self._ensure_layers()
+        played_layer, remaining_layer = self._layers
+        
+        painter = QPainter(self)
+        area = QRectF(event.rect())
+        ratio = played_layer.devicePixelRatio()
+        progress_x = max(0.0, min(float(self.width()), self._x_at(self.progress * self._total_frames)))
+        
+        for layer, part in ((played_layer, QRectF(0, 0, progress_x, self.height())),
+                            (remaining_layer, QRectF(progress_x, 0, self.width() - progress_x, self.height()))):
+            target = part.intersected(area)
+            if target.isEmpty():
+                continue
+            source = QRectF(target.x() * ratio, target.y() * ratio, target.width() * ratio, target.height() * ratio)
+            painter.drawPixmap(target, layer, source)
+        painter.end()
@@ -26,6 +26,8 @@ from gui.components.metadata_editor import MetadataEditor
 from gui.components.project_table import ProjectTable
 
 from services.scanner import CubaseScanner
+from services.scan_index import ScanIndex
+from services.metadata_index import MetadataIndex
 from services.metadata_service import MetadataService
 from services.file_service import FileService
 from services.audio_service import AudioService
@@ -34,9 +36,13 @@ from services.cubase_service import CubaseService
 from config.constants import FILE_TREE_COLUMNS
 from config.settings import settings
 
+# Premier scan (total inconnu) : nombre de fichiers pour lequel la progression atteint 50 %
+FIRST_SCAN_FILES = 20000
+
 class ScanThread(QThread):
     """Thread pour le scan des dossiers"""
     scan_progress = pyqtSignal(int)
+    scan_batch = pyqtSignal(list)  # Projets trouvés, transmis par lots pendant le scan
     scan_complete = pyqtSignal(dict)
     
     def __init__(self, directories):
@@ -48,27 +54,68 @@ class ScanThread(QThread):
         """
         super().__init__()
         self.directories = directories
-        self.scanner = CubaseScanner()
+        # Index persistant : seuls les dossiers modifiés depuis le dernier scan sont relus
+        self.scanner = CubaseScanner(index=ScanIndex(), metadata_index=MetadataIndex.default())
         self.running = True
     
     def run(self):
         """Exécution du thread"""
         print(f"Démarrage du scan de {len(self.directories)} dossiers")
         total_dirs = len(self.directories)
-        for i, directory in enumerate(self.directories):
-            if not self.running:
-                break
-            print(f"Scan du dossier: {directory}")
-            self.scanner.scan_directory(directory)
-            self.scan_progress.emit(int((i + 1) / total_dirs * 100))
+        # Total estimé d'après le scan précédent (0 au premier scan)
+        expected_files = sum(self.scanner.index.file_count(str(Path(directory))) for directory in self.directories)
+        last_percent = [-1]
+        
+        def on_progress(roots_done, file_count, total_bytes):
+            percent = self._progress_percent(roots_done, total_dirs, file_count, expected_files)
+            if percent != last_percent[0]:
+                last_percent[0] = percent
+                self.scan_progress.emit(percent)
+        
+        # En parallèle, une source par thread ; progression agrégée sur toutes les sources
+        self.scanner.scan_multiple_directories(self.directories, parallel=settings.parallel_scan and total_dirs > 1,
+                                               progress_callback=on_progress,
+                                               batch_callback=self.scan_batch.emit,
+                                               should_stop=lambda: not self.running)
         
         if self.running:
             # Préparer les données pour le modèle
             self.scanner._create_dataframe()
             
+            index = self.scanner.index
+            print(f"Index de scan : {index.reused} dossiers réutilisés, {index.rescanned} relus")
             print(f"Scan terminé, {len(self.scanner.projects)} projets trouvés")
+            on_progress(total_dirs, 0, 0)
             self.scan_complete.emit(self.scanner.projects)
     
+    @staticmethod
+    def _progress_percent(roots_done, total_dirs, file_count, expected_files):
+        """
+        Pourcentage d'avancement du scan
+        
+        Le nombre de fichiers parcourus est rapporté au total connu du scan
+        précédent ; sans scan précédent, la progression tend vers 100 %
+        au fil des fichiers. Elle ne descend jamais sous la part des
+        racines terminées et reste sous 100 % jusqu'à la fin.
+        
+        Args:
+            roots_done (int): Nombre de racines terminées
+            total_dirs (int): Nombre de racines à scanner
+            file_count (int): Fichiers parcourus, toutes racines confondues
+            expected_files (int): Fichiers connus à l'issue du scan précédent
+        
+        Returns:
+            int: Pourcentage (0-100)
+        """
+        if roots_done >= total_dirs:
+            return 100
+        if expected_files:
+            fraction = file_count / expected_files
+        else:
+            fraction = file_count / (file_count + FIRST_SCAN_FILES)
+        fraction = max(fraction, roots_done / total_dirs)
+        return min(99, int(fraction * 100))
+    
     def stop(self):
         """Arrêt du thread"""
         self.running = False
@@ -82,6 +129,7 @@ class SortWindow(BaseWindow):
         # Initialisation des services
         self.scanner = CubaseScanner()
         self.metadata_service = MetadataService(mode='local')
+        self.watch_metadata_errors(self.metadata_service)
         self.file_service = FileService()
         self.audio_service = AudioService()
         self.cubase_service = CubaseService()
@@ -121,6 +169,9 @@ class SortWindow(BaseWindow):
         else:
             print("Aucun thread de scan à arrêter")
         
+        # Écriture des métadonnées encore en attente
+        self.flush_metadata()
+        
         # S'assurer que tous les threads sont arrêtés avant de fermer
         print("Attente de la fin de tous les threads...")
         QThread.msleep(500)  # Pause pour laisser le temps aux threads de se terminer
@@ -183,13 +234,13 @@ class SortWindow(BaseWindow):
         # Filtre par nom
         self.lbl_filter = QLabel("Filtrer par nom:")
         self.txt_filter = QLineEdit()
-        self.txt_filter.setPlaceholderText("Entrez un nom de projet...")
+        self.txt_filter.setPlaceholderText("Nom, tag:techno, plugin:serum, rating>=4...")
         self.txt_filter.textChanged.connect(self.filter_projects)
         
         # Tri par colonne
         self.lbl_sort = QLabel("Trier par:")
         self.cmb_sort = QComboBox()
-        self.cmb_sort.addItems(["Nom du projet", "Date de modification", "Taille"])
+        self.cmb_sort.addItems(["Nom du projet", "Date de modification", "Taille", "BPM"])
         self.cmb_sort.currentIndexChanged.connect(self.sort_projects)
         
         # Ordre de tri
@@ -251,6 +302,8 @@ class SortWindow(BaseWindow):
         # Éditeur de métadonnées
         self.metadata_editor = MetadataEditor()
         self.metadata_editor.save_requested.connect(self.save_project_metadata)
+        # Auto-complétion : tags connus de l'index global (scans précédents)
+        self.metadata_editor.set_all_tags(self.metadata_service.get_all_tags())
         
         metadata_layout.addWidget(self.metadata_editor)
         
@@ -365,13 +418,6 @@ class SortWindow(BaseWindow):
         """
         if not project:
             return
-        # Recherche la version corrigée dans self.all_projects_data
-        if hasattr(self, 'all_projects_data') and isinstance(self.all_projects_data, list):
-            project_name = project.get('project_name', '')
-            for p in self.all_projects_data:
-                if p.get('project_name', '') == project_name:
-                    project = p
-                    break
         # Mise à jour du projet sélectionné
         self.selected_project = project
         
@@ -449,6 +495,9 @@ class SortWindow(BaseWindow):
         print("Création d'un nouveau thread de scan")
         self.scan_thread = ScanThread(self.selected_directories)
         self.scan_thread.scan_progress.connect(self.update_scan_progress)
+        # Affichage progressif : la table se remplit au fil du scan
+        self.project_table.update_data([])
+        self.scan_thread.scan_batch.connect(self.project_table.append_projects)
         self.scan_thread.scan_complete.connect(self.on_scan_complete)
         self.scan_thread.start()
         print(f"Thread de scan démarré: {self.scan_thread}, en cours d'exécution: {self.scan_thread.isRunning()}")
@@ -551,11 +600,16 @@ class SortWindow(BaseWindow):
         
         print(f"Nombre de projets à afficher: {len(self.all_projects_data)}")
         
-        # Mise à jour de la table des projets
-        self.project_table.update_data(self.all_projects_data)
+        # Mise à jour de la table des projets (déjà remplie progressivement pendant le scan)
+        self.project_table.merge_data(self.all_projects_data)
+        # Recherche : noms, tags, notes, plugins en cache et fichiers du scan
+        self.project_table.build_search_index(projects)
         # Connexion du signal pour sélectionner le projet depuis la table
         self.project_table.project_selected.connect(self.on_project_selected)
         
+        # Tags des metadata.json rencontrés pendant le scan
+        self.metadata_editor.set_all_tags(self.metadata_service.get_all_tags())
+        
         # Message de statut
         self.statusBar.showMessage(f"{len(self.all_projects_data)} projets trouvés")
         
@@ -565,6 +619,7 @@ class SortWindow(BaseWindow):
             # Déconnecter les signaux pour éviter les fuites mémoire
             try:
                 self.scan_thread.scan_progress.disconnect()
+                self.scan_thread.scan_batch.disconnect()
                 self.scan_thread.scan_complete.disconnect()
             except TypeError:
                 # Ignorer les erreurs si les signaux sont déjà déconnectés
@@ -578,7 +633,7 @@ class SortWindow(BaseWindow):
             print("Thread de scan nettoyé")
     
     def filter_projects(self):
-        """Filtrage des projets par nom"""
+        """Filtrage des projets (nom, tags, notes, plugins, fichiers)"""
         filter_text = self.txt_filter.text().strip()
         self.project_table.set_filter(filter_text)
     
@@ -591,8 +646,9 @@ class SortWindow(BaseWindow):
         # Correspondance entre l'index du combobox et la colonne du modèle
         column_mapping = {
             0: 0,  # Nom du projet
-            1: 2,  # Date de modification
-            2: 6   # Taille
+            1: 1,  # Date de modification
+            2: 2,  # Taille
+            3: 7   # BPM
         }
         
         if column_index in column_mapping:
@@ -650,18 +706,18 @@ class SortWindow(BaseWindow):
         # Trouver le fichier CPR le plus récent
         latest_cpr = None
         if project_details['cpr_files']:
-            latest_cpr = max(project_details['cpr_files'], key=lambda x: x['modified'])
+            latest_cpr = max(project_details['cpr_files'], key=lambda x: x.mtime)
         
         # Création des éléments pour les fichiers CPR
         cpr_parent = QTreeWidgetItem(self.file_tree, ["Fichiers CPR"])
         for file_info in project_details['cpr_files']:
-            path = Path(file_info['path'])
+            path = Path(file_info.path)
             # Indiquer si c'est le fichier le plus récent
-            is_latest = latest_cpr and file_info['path'] == latest_cpr['path']
+            is_latest = latest_cpr and file_info is latest_cpr
             display_name = f"{path.name} {'(PLUS RÉCENT)' if is_latest else ''}"
             
             # Ajouter la source du fichier
-            source = file_info.get('source', '')
+            source = file_info.source
             if source:
                 source_name = Path(source).name
             else:
@@ -672,15 +728,15 @@ class SortWindow(BaseWindow):
             
             item = QTreeWidgetItem(cpr_parent, [
                 display_name,
-                f"{file_info['size'] / (1024 * 1024):.2f} MB",
-                file_info['modified'].strftime("%d/%m/%Y %H:%M"),
+                f"{file_info.size / (1024 * 1024):.2f} MB",
+                file_info.modified.strftime("%d/%m/%Y %H:%M"),
                 source_display
             ])
             # Ajouter la source complète comme tooltip
             item.setToolTip(0, f"Source: {source}")
             item.setToolTip(3, f"Chemin complet: {source}")
             
-            item.setData(0, Qt.UserRole, file_info['path'])
+            item.setData(0, Qt.UserRole, file_info.path)
             item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
             # Cocher par défaut le fichier le plus récent, décocher les autres
             item.setCheckState(0, Qt.Checked if is_latest else Qt.Unchecked)
@@ -688,18 +744,18 @@ class SortWindow(BaseWindow):
         # Trouver le fichier BAK le plus récent
         latest_bak = None
         if project_details['bak_files']:
-            latest_bak = max(project_details['bak_files'], key=lambda x: x['modified'])
+            latest_bak = max(project_details['bak_files'], key=lambda x: x.mtime)
         
         # Création des éléments pour les fichiers BAK
         bak_parent = QTreeWidgetItem(self.file_tree, ["Fichiers BAK"])
         for file_info in project_details['bak_files']:
-            path = Path(file_info['path'])
+            path = Path(file_info.path)
             # Indiquer si c'est le fichier le plus récent
-            is_latest = latest_bak and file_info['path'] == latest_bak['path']
+            is_latest = latest_bak and file_info is latest_bak
             display_name = f"{path.name} {'(PLUS RÉCENT)' if is_latest else ''}"
             
             # Ajouter la source du fichier
-            source = file_info.get('source', '')
+            source = file_info.source
             if source:
                 source_name = Path(source).name
             else:
@@ -710,15 +766,15 @@ class SortWindow(BaseWindow):
             
             item = QTreeWidgetItem(bak_parent, [
                 display_name,
-                f"{file_info['size'] / (1024 * 1024):.2f} MB",
-                file_info['modified'].strftime("%d/%m/%Y %H:%M"),
+                f"{file_info.size / (1024 * 1024):.2f} MB",
+                file_info.modified.strftime("%d/%m/%Y %H:%M"),
                 source_display
             ])
             # Ajouter la source complète comme tooltip
             item.setToolTip(0, f"Source: {source}")
             item.setToolTip(3, f"Chemin complet: {source}")
             
-            item.setData(0, Qt.UserRole, file_info['path'])
+            item.setData(0, Qt.UserRole, file_info.path)
             item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
             # Cocher par défaut le fichier le plus récent si l'option est activée, décocher les autres
             should_check = self.chk_keep_bak.isChecked() and is_latest
@@ -727,12 +783,12 @@ class SortWindow(BaseWindow):
         # Création des éléments pour les fichiers WAV
         wav_parent = QTreeWidgetItem(self.file_tree, ["Fichiers WAV"])
         for file_info in project_details['wav_files']:
-            path = Path(file_info['path'])
+            path = Path(file_info.path)
             # Vérifier si c'est un fichier ._ et si l'option de suppression est activée
             is_dotunderscore = path.name.startswith('._')
             
             # Ajouter la source du fichier
-            source = file_info.get('source', '')
+            source = file_info.source
             if source:
                 source_name = Path(source).name
             else:
@@ -743,15 +799,15 @@ class SortWindow(BaseWindow):
             
             item = QTreeWidgetItem(wav_parent, [
                 path.name,
-                f"{file_info['size'] / (1024 * 1024):.2f} MB",
-                file_info['modified'].strftime("%d/%m/%Y %H:%M"),
+                f"{file_info.size / (1024 * 1024):.2f} MB",
+                file_info.modified.strftime("%d/%m/%Y %H:%M"),
                 source_display
             ])
             # Ajouter la source complète comme tooltip
             item.setToolTip(0, f"Source: {source}")
             item.setToolTip(3, f"Chemin complet: {source}")
             
-            item.setData(0, Qt.UserRole, file_info['path'])
+            item.setData(0, Qt.UserRole, file_info.path)
             item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
             # Par défaut, les fichiers WAV sont sélectionnés sauf s'ils commencent par ._ et que l'option est activée
             should_check = not (is_dotunderscore and self.chk_remove_dotunderscore.isChecked())
@@ -760,12 +816,12 @@ class SortWindow(BaseWindow):
         # Création des éléments pour les autres fichiers
         other_parent = QTreeWidgetItem(self.file_tree, ["Autres fichiers"])
         for file_info in project_details['other_files']:
-            path = Path(file_info['path'])
+            path = Path(file_info.path)
             # Vérifier si c'est un fichier ._ et si l'option de suppression est activée
             is_dotunderscore = path.name.startswith('._')
             
             # Ajouter la source du fichier
-            source = file_info.get('source', '')
+            source = file_info.source
             if source:
                 source_name = Path(source).name
             else:
@@ -776,15 +832,15 @@ class SortWindow(BaseWindow):
             
             item = QTreeWidgetItem(other_parent, [
                 path.name,
-                f"{file_info['size'] / (1024 * 1024):.2f} MB",
-                file_info['modified'].strftime("%d/%m/%Y %H:%M"),
+                f"{file_info.size / (1024 * 1024):.2f} MB",
+                file_info.modified.strftime("%d/%m/%Y %H:%M"),
                 source_display
             ])
             # Ajouter la source complète comme tooltip
             item.setToolTip(0, f"Source: {source}")
             item.setToolTip(3, f"Chemin complet: {source}")
             
-            item.setData(0, Qt.UserRole, file_info['path'])
+            item.setData(0, Qt.UserRole, file_info.path)
             item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
             # Par défaut, les autres fichiers sont sélectionnés sauf s'ils commencent par ._ et que l'option est activée
             should_check = not (is_dotunderscore and self.chk_remove_dotunderscore.isChecked())
@@ -1091,7 +1147,7 @@ class SortWindow(BaseWindow):
             if project_details and project_details.get('cpr_files'):
                 # Utiliser le dossier du premier fichier CPR trouvé
                 first_cpr = project_details['cpr_files'][0]
-                project_dir = str(Path(first_cpr['path']).parent)
+                project_dir = first_cpr.parent
                 print(f"Dossier du projet détecté: {project_dir}")
             
             # Sauvegarder les métadonnées
@@ -1103,6 +1159,8 @@ class SortWindow(BaseWindow):
             if success:
                 # Afficher uniquement un message dans la barre d'état, pas de boîte de dialogue
                 self.statusBar.showMessage(f"Métadonnées du projet '{project_name}' sauvegardées")
+                self.metadata_editor.set_all_tags(self.metadata_service.get_all_tags())
+                self.project_table.update_search_metadata(project_name, metadata)
                 
                 # Mettre à jour l'affichage du projet en passant le projet actuel
                 self.on_project_selected(project)
@@ -19,7 +19,7 @@ from PyQt5.QtWidgets import (
     QComboBox, QAction, QLineEdit, QMenu, QTextEdit, QTabWidget,
     QInputDialog, QToolBar, QShortcut, QFrame, QToolButton
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize, QDir
+from PyQt5.QtCore import Qt, QThread, QObject, QTimer, pyqtSignal, QSize, QDir
 from PyQt5.QtGui import QIcon, QKeySequence
 
 from gui.base.base_window import BaseWindow
@@ -31,14 +31,24 @@ from gui.components.waveform_viewer import ModernWaveformPlayer
 
 from services.scanner import CubaseScanner
 from services.metadata_service import MetadataService
+from services.metadata_index import MetadataIndex
 from services.file_service import FileService
 from services.audio_service import AudioService
 from services.cubase_service import CubaseService
 from services.lectureCPR import trouve_vsti
+from services.analysis_scheduler import AnalysisScheduler, PRIORITY_SELECTED, PRIORITY_PREFETCH
+from services.project_prefetcher import ProjectPrefetcher, find_project_cpr
+from services.vsti_cache import VstiCache
+from services.vsti_manager import load_vsti_list, save_vsti_list
 
 from config.constants import FILE_TREE_COLUMNS
 from config.settings import settings
 
+class AnalysisSignals(QObject):
+    """Relais des rappels de l'ordonnanceur d'analyses vers le thread de l'interface"""
+    finished = pyqtSignal(object)
+    progress = pyqtSignal(object, int)
+
 class WorkspaceWindow(BaseWindow):
     """Fenêtre principale du mode Espace de Travail (unique)"""
     
@@ -47,8 +57,10 @@ class WorkspaceWindow(BaseWindow):
         super().__init__()
         
         # Services
-        self.scanner = CubaseScanner()
+        # Les tags des metadata.json rencontrés alimentent l'index global
+        self.scanner = CubaseScanner(metadata_index=MetadataIndex.default())
         self.metadata_service = MetadataService(mode='local')
+        self.watch_metadata_errors(self.metadata_service)
         self.file_service = FileService()
         self.audio_service = AudioService()
         self.cubase_service = CubaseService()
@@ -60,6 +72,21 @@ class WorkspaceWindow(BaseWindow):
         # Thread de scan
         self.scan_thread = None
         
+        # Analyses en arrière-plan (VSTi...) : les signaux sont reçus dans le thread de l'interface
+        self.analysis_scheduler = AnalysisScheduler(settings.analysis_workers)
+        self._analysis_signals = AnalysisSignals()
+        self._analysis_signals.finished.connect(self.on_analysis_finished)
+        self._analysis_signals.progress.connect(self.on_analysis_progress)
+        self._vsti_job_key = None
+        self._vsti_job_project = None
+        
+        # Liste des VSTi connus et son empreinte : relues seulement quand la liste est enregistrée
+        self._vsti_list = None
+        self._vsti_list_key = None
+        
+        # Préchargement des projets voisins de la sélection
+        self.prefetcher = ProjectPrefetcher(self.analysis_scheduler, settings.prefetch_memory_mb * 1024 * 1024)
+        
         # Configuration de l'interface
         self.setup_ui()
         
@@ -89,6 +116,13 @@ class WorkspaceWindow(BaseWindow):
         else:
             print("Aucun thread de scan à arrêter")
         
+        # Annulation des analyses en arrière-plan (arrêt au prochain point de contrôle)
+        self.analysis_scheduler.shutdown(wait=False)
+        self.waveform_viewer.shutdown()
+        
+        # Écriture des métadonnées encore en attente
+        self.flush_metadata()
+        
         # S'assurer que tous les threads sont arrêtés avant de fermer
         print("Attente de la fin de tous les threads...")
         QThread.msleep(500)  # Pause pour laisser le temps aux threads de se terminer
@@ -140,9 +174,32 @@ class WorkspaceWindow(BaseWindow):
         self.action_open_in_cubase.setShortcut(QKeySequence("Ctrl+P"))
         self.toolbar.addAction(self.action_open_in_cubase)
     
+    def vsti_list_key(self):
+        """
+        Empreinte de la liste des VSTi connus (clé du cache des analyses)
+        
+        Returns:
+            str: Empreinte, calculée au premier appel puis après chaque enregistrement de la liste
+        """
+        if self._vsti_list_key is None:
+            self._vsti_list = load_vsti_list()
+            self._vsti_list_key = VstiCache.list_key(self._vsti_list)
+        return self._vsti_list_key
+    
+    def save_vsti_list(self, vsti_list):
+        """
+        Enregistrement de la liste des VSTi connus
+        
+        Args:
+            vsti_list (list): Nouvelle liste
+        """
+        save_vsti_list(vsti_list)
+        self._vsti_list = list(vsti_list)
+        self._vsti_list_key = VstiCache.list_key(self._vsti_list)
+    
     def open_vsti_manager_dialog(self):
         from PyQt5.QtWidgets import QDialog, QVBoxLayout, QListWidget, QPushButton, QHBoxLayout, QInputDialog, QMessageBox
-        from services.vsti_manager import load_vsti_list, save_vsti_list
+        window = self
         class VstiManagerDialog(QDialog):
             def __init__(self, parent=None):
                 super().__init__(parent)
@@ -170,7 +227,7 @@ class WorkspaceWindow(BaseWindow):
                 self.vsti_list.sort(key=lambda x: x.lower())
                 self.list_widget.addItems(self.vsti_list)
             def save_and_refresh(self):
-                save_vsti_list(self.vsti_list)
+                window.save_vsti_list(self.vsti_list)
                 self.refresh_list()
             def add_vsti(self):
                 name, ok = QInputDialog.getText(self, "Ajouter un VSTi", "Nom du VSTi :")
@@ -200,11 +257,11 @@ class WorkspaceWindow(BaseWindow):
                     self.vsti_list.remove(name)
                     self.save_and_refresh()
             def accept(self):
-                save_vsti_list(self.vsti_list)
+                window.save_vsti_list(self.vsti_list)
                 super().accept()
         dlg = VstiManagerDialog(self)
         dlg.exec_()
-
+    
     def setup_ui(self):
         """Configuration de l'interface utilisateur"""
         # Widget central déjà créé dans BaseWindow
@@ -227,13 +284,13 @@ class WorkspaceWindow(BaseWindow):
         # Filtre par nom
         self.lbl_filter = QLabel("Filtrer par nom:")
         self.txt_filter = QLineEdit()
-        self.txt_filter.setPlaceholderText("Entrez un nom de projet...")
+        self.txt_filter.setPlaceholderText("Nom, tag:techno, plugin:serum, rating>=4...")
         self.txt_filter.textChanged.connect(self.filter_projects)
         
         # Tri par colonne
         self.lbl_sort = QLabel("Trier par:")
         self.cmb_sort = QComboBox()
-        self.cmb_sort.addItems(["Nom du projet", "Date de modification", "Taille"])
+        self.cmb_sort.addItems(["Nom du projet", "Date de modification", "Taille", "BPM"])
         self.cmb_sort.currentIndexChanged.connect(self.sort_projects)
         
         # Ordre de tri
@@ -367,17 +424,17 @@ class WorkspaceWindow(BaseWindow):
         # Lecteur audio pour les fichiers WAV
         self.audio_player = AudioPlayer()
         self.audio_player.setVisible(False)  # Masqué par défaut
-
+        
         # Visualisation de la forme d'onde (nouvelle version)
         self.waveform_viewer = ModernWaveformPlayer(self)
         self.waveform_viewer.link_audio_player(self.audio_player)
         self.waveform_viewer.setVisible(False)
         # Suppression du slider d'avancement : aucune création de QSlider ni ajout dans le layout
         # Le minuteur moderne sera affiché dans ModernWaveformPlayer
-
+        
         # Initialisation du service audio
         self.audio_service.initialize_player(self.audio_player)
-
+        
         files_layout.addWidget(self.audio_player)
         files_layout.addWidget(self.waveform_viewer)
         
@@ -388,8 +445,10 @@ class WorkspaceWindow(BaseWindow):
         # Éditeur de métadonnées
         self.metadata_editor = MetadataEditor()
         self.metadata_editor.save_requested.connect(self.save_project_metadata)
+        # Auto-complétion : tags connus de l'index global (scans précédents)
+        self.metadata_editor.set_all_tags(self.metadata_service.get_all_tags())
         metadata_layout.addWidget(self.metadata_editor)
-
+        
         # Zone d'affichage des VSTi
         self.vsti_text = QTextEdit()
         self.vsti_text.setReadOnly(True)
@@ -419,7 +478,7 @@ class WorkspaceWindow(BaseWindow):
         self.vsti_progress.setTextVisible(True)
         self.main_layout.insertWidget(1, self.vsti_progress)  # Juste après le menu/label workspace
         print('[DEBUG] Barre de progression VSTi ajoutée au layout principal')
-
+        
         # Ajout des onglets
         self.details_tabs.addTab(files_tab, "Lecteur Audio")
         self.details_tabs.addTab(metadata_tab, "Tags & Notes / VSTi")
@@ -477,7 +536,7 @@ class WorkspaceWindow(BaseWindow):
         self.file_tree_left.setCurrentIndex(self.file_tree_left.fs_model.index(directory))
         self.file_tree_left.scrollTo(self.file_tree_left.fs_model.index(directory))
         self.file_tree_left.expand(self.file_tree_left.fs_model.index(directory))
-
+        
         # Afficher la barre de progression en mode indéterminé (marquee)
         self.vsti_progress.setVisible(True)
         self.vsti_progress.setMinimum(0)
@@ -485,31 +544,26 @@ class WorkspaceWindow(BaseWindow):
         self.vsti_progress.setFormat("Scan des projets en cours...")
         from PyQt5.QtWidgets import QApplication
         QApplication.processEvents()  # Forcer le rafraîchissement de l'UI pour afficher la barre
-
+        
         # Thread et worker pour le scan
         from PyQt5.QtCore import QObject, pyqtSignal
         class WorkspaceScanWorker(QObject):
-            progressChanged = pyqtSignal(int)
+            # Nombre de fichiers et d'octets découverts (total inconnu à l'avance)
+            progressChanged = pyqtSignal(int, object)
+            # Projets trouvés, transmis par lots pendant le scan
+            batchReady = pyqtSignal(list)
             finished = pyqtSignal(object)
             def __init__(self, scanner, directory):
                 super().__init__()
                 self.scanner = scanner
                 self.directory = directory
             def run(self):
-                import os
                 self.scanner.clear()
-                # Compter ET scanner dans le worker pour ne rien bloquer
-                total = 0
-                for _ in os.walk(self.directory):
-                    total += 1
-                current = 0
-                for root, dirs, files in os.walk(self.directory):
-                    self.scanner.scan_directory(root)
-                    current += 1
-                    percent = int((current / total) * 100) if total > 0 else 100
-                    self.progressChanged.emit(percent)
+                # Un seul parcours de l'arborescence, progression au fil de l'eau
+                self.scanner.scan_tree(self.directory, progress_callback=self.progressChanged.emit,
+                                       batch_callback=self.batchReady.emit)
                 self.finished.emit(self.scanner)
-
+        
         # Arrêter un éventuel thread précédent
         if hasattr(self, 'scan_thread') and self.scan_thread is not None:
             if self.scan_thread.isRunning():
@@ -519,27 +573,35 @@ class WorkspaceWindow(BaseWindow):
         self.scan_worker = WorkspaceScanWorker(self.scanner, directory)
         self.scan_worker.moveToThread(self.scan_thread)
         self.scan_thread.started.connect(self.scan_worker.run)
-        self.scan_worker.progressChanged.connect(self.vsti_progress.setValue)
-
+        
+        def on_scan_progress(file_count, total_bytes):
+            self.vsti_progress.setFormat(
+                f"Scan des projets en cours... {file_count} fichiers ({total_bytes / (1024 * 1024):.0f} MB)"
+            )
+        self.scan_worker.progressChanged.connect(on_scan_progress)
+        # Affichage progressif : la table se remplit au fil du scan
+        self.project_table.update_data([])
+        self.scan_worker.batchReady.connect(self.project_table.append_projects)
+        
         def on_scan_finished(scanner):
             for project_name, project_data in scanner.projects.items():
                 project_dir = project_data.get('project_dir', '')
                 if not project_dir or not os.path.exists(project_dir):
                     if project_data.get('cpr_files') and len(project_data['cpr_files']) > 0:
                         first_cpr = project_data['cpr_files'][0]
-                        project_dir = os.path.dirname(first_cpr['path'])
+                        project_dir = first_cpr.parent
                         project_data['project_dir'] = project_dir
                     elif project_data.get('wav_files') and len(project_data['wav_files']) > 0:
                         first_wav = project_data['wav_files'][0]
-                        project_dir = os.path.dirname(first_wav['path'])
+                        project_dir = first_wav.parent
                         project_data['project_dir'] = project_dir
                     elif project_data.get('bak_files') and len(project_data['bak_files']) > 0:
                         first_bak = project_data['bak_files'][0]
-                        project_dir = os.path.dirname(first_bak['path'])
+                        project_dir = first_bak.parent
                         project_data['project_dir'] = project_dir
                     elif project_data.get('other_files') and len(project_data['other_files']) > 0:
                         first_other = project_data['other_files'][0]
-                        project_dir = os.path.dirname(first_other['path'])
+                        project_dir = first_other.parent
                         project_data['project_dir'] = project_dir
                     else:
                         project_dir = os.path.join(directory, project_name)
@@ -549,16 +611,19 @@ class WorkspaceWindow(BaseWindow):
                             project_data['project_dir'] = directory
             scanner._create_dataframe()
             self.all_projects_data = scanner.df_projects
-            self.project_table.update_data(self.all_projects_data)
+            self.project_table.merge_data(self.all_projects_data)
+            # Recherche : noms, tags, notes, plugins en cache et fichiers du scan
+            self.project_table.build_search_index(scanner.projects)
             self.vsti_progress.setMaximum(100)
             self.vsti_progress.setValue(100)
             self.vsti_progress.setVisible(False)
+            self.metadata_editor.set_all_tags(self.metadata_service.get_all_tags())
             self.statusBar.showMessage(f"{len(self.all_projects_data)} projets trouvés dans le dossier de travail")
             self.scan_thread.quit()
             self.scan_thread.wait()
         self.scan_worker.finished.connect(on_scan_finished)
         self.scan_thread.start()
-
+    
     
     def reset_workspace(self):
         """Réinitialisation du workspace"""
@@ -611,7 +676,7 @@ class WorkspaceWindow(BaseWindow):
         QMessageBox.warning(self, "Erreur", "Aucun projet Cubase sélectionné.")
     
     def filter_projects(self):
-        """Filtrage des projets par nom"""
+        """Filtrage des projets (nom, tags, notes, plugins, fichiers)"""
         filter_text = self.txt_filter.text().strip()
         self.project_table.set_filter(filter_text)
     
@@ -624,8 +689,9 @@ class WorkspaceWindow(BaseWindow):
         # Correspondance entre l'index du combobox et la colonne du modèle
         column_mapping = {
             0: 0,  # Nom du projet
-            1: 2,  # Date de modification
-            2: 6   # Taille
+            1: 1,  # Date de modification
+            2: 2,  # Taille
+            3: 7   # BPM
         }
         
         if column_index in column_mapping:
@@ -674,7 +740,7 @@ class WorkspaceWindow(BaseWindow):
         # Cela évite que les métadonnées d'un projet précédent ne persistent
         self.metadata_editor.set_metadata({'tags': [], 'rating': 0, 'notes': ''})
         
-        # Récupération des métadonnées du projet
+        # Récupération des métadonnées du projet (en mémoire si le fichier n'a pas changé)
         try:
             metadata = self.metadata_service.get_project_metadata(project_name, project_folder)
             if metadata:
@@ -685,17 +751,43 @@ class WorkspaceWindow(BaseWindow):
                 print(f"Aucune métadonnée trouvée pour {project_name}")
         except Exception as e:
             print(f"Erreur lors de la récupération des métadonnées: {e}")
-
-        # Arrêt propre du thread VSTi précédent s'il existe
-        if hasattr(self, '_vsti_thread') and self._vsti_thread is not None:
-            print('[DEBUG] Arrêt du thread VSTi précédent...')
-            self._vsti_thread.quit()
-            self._vsti_thread.wait(1000)
-            self._vsti_thread = None
-            self._vsti_worker = None
-        
-        # 1. Configurez la barre de progression et rendez-la DÉFINITIVEMENT visible 
-        # avant de démarrer le thread
+        
+        # Recherche du CPR principal
+        cpr_path = None
+        prefetched = self.prefetcher.get(project_folder) if project_folder else None
+        if prefetched is not None:
+            cpr_path = prefetched['cpr_path']
+        elif project_folder and os.path.exists(project_folder):
+            cpr_path = find_project_cpr(project_folder, os.listdir(project_folder))
+        
+        previous_job_key = self._vsti_job_key
+        self._vsti_job_key = ('vsti', cpr_path) if cpr_path else None
+        self._vsti_job_project = project_name
+        
+        self.statusBar.showMessage(f"Projet sélectionné: {project_name}")
+        
+        if not cpr_path:
+            self.vsti_progress.setVisible(False)
+            self.vsti_text.setEnabled(True)
+            self.vsti_text.setPlainText("Aucun fichier CPR trouvé dans le dossier du projet.")
+            self.update_prefetch(previous_job_key)
+            return
+        
+        # Résultat en cache : affichage immédiat, sans analyse
+        try:
+            cached_vsti = VstiCache.default().get(VstiCache.key_for(cpr_path, list_key=self.vsti_list_key()))
+        except Exception as e:
+            print(f"Erreur lors de la lecture du cache VSTi : {e}")
+            cached_vsti = None
+        if cached_vsti is not None:
+            self._vsti_job_key = None
+            self.vsti_progress.setVisible(False)
+            self.show_vsti_result(cached_vsti)
+            self.project_table.update_search_plugins(project_name, cached_vsti)
+            self.update_prefetch(previous_job_key)
+            return
+        
+        # Barre de progression visible avant le démarrage de l'analyse
         self.vsti_progress.setMinimum(0)
         self.vsti_progress.setMaximum(0)  # Mode indéterminé
         self.vsti_progress.setValue(0)
@@ -704,104 +796,104 @@ class WorkspaceWindow(BaseWindow):
         self.vsti_progress.setStyleSheet("QProgressBar { text-align: center; color: white; } QProgressBar::chunk { background-color: #007ACC; }")
         self.vsti_progress.setVisible(True)
         
-        # 2. CRUCIAL: Forcer le rafraîchissement de l'interface utilisateur
-        # pour garantir que la barre s'affiche immédiatement
-        from PyQt5.QtWidgets import QApplication
-        QApplication.processEvents()
-        
         # Désactiver le texte pendant le chargement
         self.vsti_text.setPlainText("Analyse des VSTi en cours, veuillez patienter...")
         self.vsti_text.setEnabled(False)
         
-        # Créer un thread pour l'analyse des VSTi
-        from PyQt5.QtCore import QThread, pyqtSignal, QObject
-        import traceback
+        # Analyse prioritaire dans l'ordonnanceur (partagée si elle est déjà en cours)
+        def run_analysis(token, progress_callback):
+            return trouve_vsti(cpr_path, progress_callback=progress_callback, cancel_token=token)
+        
+        vsti_job_key = self._vsti_job_key
+        self.analysis_scheduler.submit(
+            vsti_job_key, run_analysis, PRIORITY_SELECTED,
+            callback=self._analysis_signals.finished.emit,
+            progress_callback=lambda percent: self._analysis_signals.progress.emit(vsti_job_key, percent)
+        )
+        self.update_prefetch(previous_job_key)
+    
+    def update_prefetch(self, previous_job_key):
+        """
+        Préchargement des voisins du projet sélectionné (navigation au clavier)
         
-        class VstiWorker(QObject):
-            finished = pyqtSignal(set, str)
-            progressChanged = pyqtSignal(int)
-            
-            def __init__(self, cpr_path):
-                super().__init__()
-                self.cpr_path = cpr_path
-                
-            def run(self):
-                try:
-                    from services.lectureCPR import trouve_vsti
-                    import os
-                    found = set()
-                    if self.cpr_path and os.path.exists(self.cpr_path):
-                        def progress_callback(percent):
-                            self.progressChanged.emit(percent)
-                        found = trouve_vsti(self.cpr_path, progress_callback=progress_callback)
-                        self.finished.emit(found, "")
-                    else:
-                        self.finished.emit(set(), "Aucun fichier CPR trouvé dans le dossier du projet.")
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    self.finished.emit(set(), f"Erreur lors de l'analyse du fichier CPR : {e}\n{tb}")
+        Appelé une fois l'analyse du projet sélectionné soumise : une tâche
+        de préchargement déjà lancée pour ce projet a alors été relevée et
+        n'est pas annulée avec l'ancien voisinage.
         
-        # Recherche du CPR principal
-        cpr_path = None
-        if project_folder and os.path.exists(project_folder):
-            for file in os.listdir(project_folder):
-                if file.lower().endswith('.cpr'):
-                    cpr_path = os.path.join(project_folder, file)
-                    break
-        
-        # Créer et configurer le thread
-        self._vsti_thread = QThread()
-        self._vsti_worker = VstiWorker(cpr_path)
-        self._vsti_worker.moveToThread(self._vsti_thread)
-        self._vsti_thread.started.connect(self._vsti_worker.run)
-        
-        # 3. Améliorer la gestion de la fin de l'analyse
-        def on_vsti_finished(vsti_set, error):
-            # Assurer un temps d'affichage minimum (1 seconde)
-            from PyQt5.QtCore import QTimer
-            
-            def hide_progress_later():
-                self.vsti_progress.setVisible(False)
-                print('[DEBUG] Barre de progression VSTi masquée après délai')
-            
-            # Activer le texte et afficher les résultats
+        Args:
+            previous_job_key (tuple): Analyse VSTi du projet sélectionné précédemment, ou None
+        """
+        if settings.prefetch_radius > 0:
+            neighbours = self.project_table.neighbour_projects(settings.prefetch_radius)
+            self.prefetcher.prefetch(neighbours)
+            self.file_tree_right.prefetch([neighbour.get('project_dir') for neighbour in neighbours])
+        
+        # L'analyse du projet précédemment sélectionné n'est plus prioritaire
+        if previous_job_key is None or previous_job_key == self._vsti_job_key:
+            return
+        if self.prefetcher.covers(os.path.dirname(previous_job_key[1])):
+            # Projet resté dans le voisinage : analyse gardée comme préchargement
+            self.analysis_scheduler.set_priority(previous_job_key, PRIORITY_PREFETCH)
+            self.prefetcher.adopt(previous_job_key)
+        else:
+            self.analysis_scheduler.cancel(previous_job_key)
+    
+    def on_analysis_finished(self, job):
+        """
+        Fin d'une analyse de l'ordonnanceur (thread de l'interface)
+        
+        Args:
+            job (AnalysisJob): Tâche terminée ou annulée
+        """
+        if job.key != self._vsti_job_key or job.cancelled:
+            # Projet qui n'est plus sélectionné
+            return
+        self._vsti_job_key = None
+        
+        # Activer le texte et afficher les résultats
+        if job.error is not None:
             self.vsti_text.setEnabled(True)
-            
-            if error:
-                self.vsti_text.setPlainText(error)
-            elif vsti_set:
-                self.vsti_text.setPlainText("\n".join(sorted(vsti_set)))
-            else:
-                self.vsti_text.setPlainText("Aucun VSTi détecté dans ce projet.")
-            
-            # Masquer la barre APRÈS un délai de 1 seconde
-            # Cela garantit que l'utilisateur voit que l'analyse est terminée
-            QTimer.singleShot(1000, hide_progress_later)
-            
-            # Nettoyer le thread
-            self._vsti_thread.quit()
-            self._vsti_thread.wait()
-            self._vsti_thread = None
-            self._vsti_worker = None
-        
-        # 4. Gérer les mises à jour de progression
-        def on_vsti_progress(percent):
-            # Si vous souhaitez afficher la progression réelle
-            # au lieu d'une barre indéterminée, décommentez ces lignes:
-            self.vsti_progress.setMaximum(100)
-            self.vsti_progress.setValue(percent)
-            self.vsti_progress.setFormat(f"Analyse en cours... {percent}%")
-            pass
+            self.vsti_text.setPlainText(f"Erreur lors de l'analyse du fichier CPR : {job.error}\n{job.traceback}")
+        else:
+            # Le tempo du projet analysé est maintenant dans le cache
+            self.project_table.project_model.reload_features()
+            self.show_vsti_result(job.result)
+            self.project_table.update_search_plugins(self._vsti_job_project, job.result)
+        
+        # Masquer la barre APRÈS un délai de 1 seconde
+        # Cela garantit que l'utilisateur voit que l'analyse est terminée
+        def hide_progress_later():
+            if self._vsti_job_key is None:
+                self.vsti_progress.setVisible(False)
+        
+        QTimer.singleShot(1000, hide_progress_later)
+    
+    def on_analysis_progress(self, key, percent):
+        """
+        Progression d'une analyse de l'ordonnanceur (thread de l'interface)
         
-        # Connecter les signaux aux slots
-        self._vsti_worker.finished.connect(on_vsti_finished)
-        self._vsti_worker.progressChanged.connect(on_vsti_progress)
+        Args:
+            key (tuple): Clé de la tâche
+            percent (int): Pourcentage d'avancement
+        """
+        if key != self._vsti_job_key:
+            return
+        self.vsti_progress.setMaximum(100)
+        self.vsti_progress.setValue(percent)
+        self.vsti_progress.setFormat(f"Analyse en cours... {percent}%")
+    
+    def show_vsti_result(self, vsti_set):
+        """
+        Affichage des VSTi d'un projet
         
-        # Démarrer le thread
-        self._vsti_thread.start()
-
-        # Message de statut
-        self.statusBar.showMessage(f"Projet sélectionné: {project_name}")
+        Args:
+            vsti_set (set): VSTi trouvés
+        """
+        self.vsti_text.setEnabled(True)
+        if vsti_set:
+            self.vsti_text.setPlainText("\n".join(sorted(vsti_set)))
+        else:
+            self.vsti_text.setPlainText("Aucun VSTi détecté dans ce projet.")
     
     def on_file_tree_left_selected(self, path):
         """
@@ -870,7 +962,7 @@ class WorkspaceWindow(BaseWindow):
                 # Lecture du fichier WAV
                 self.audio_service.load_file(path)
                 self.audio_player.setVisible(True)
-                # Affichage de la forme d'onde (nouvelle version)
+                # Affichage de la forme d'onde (chargée en arrière-plan)
                 if self.waveform_viewer.load_file(path):
                     self.waveform_viewer.setVisible(True)
                 else:
@@ -1338,6 +1430,8 @@ class WorkspaceWindow(BaseWindow):
                 # Afficher uniquement un message dans la barre d'état
                 self.statusBar.showMessage(f"Métadonnées du projet '{project_name}' sauvegardées")
                 print(f"Métadonnées sauvegardées pour {project_name} dans {project_folder}")
+                self.metadata_editor.set_all_tags(self.metadata_service.get_all_tags())
+                self.project_table.update_search_metadata(project_name, metadata)
             else:
                 self.show_warning("Erreur", f"Erreur lors de la sauvegarde des métadonnées du projet '{project_name}'")
         except Exception as e:
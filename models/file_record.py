@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Enregistrement compact d'un fichier trouvé lors du scan
+"""
+
+import os
+import sys
+from datetime import datetime
+
+class FileRecord:
+    """
+    Fichier d'un projet (CPR, BAK, WAV ou autre)
+    
+    Remplace les dictionnaires {'path', 'size', 'modified', 'created',
+    'source'} : les dates sont stockées en timestamps et converties en
+    datetime à la demande, le dossier parent et la source sont internés
+    (partagés par tous les fichiers d'un même dossier / d'une même source).
+    """
+    
+    __slots__ = ('parent', 'name', 'size', 'mtime', 'ctime', 'source')
+    
+    def __init__(self, parent, name, size, mtime, ctime, source):
+        """
+        Initialisation de l'enregistrement
+        
+        Args:
+            parent (str): Dossier contenant le fichier
+            name (str): Nom du fichier
+            size (int): Taille en octets
+            mtime (float): Date de modification (timestamp)
+            ctime (float): Date de création (timestamp)
+            source (str): Dossier racine scanné
+        """
+        self.parent = sys.intern(parent)
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.ctime = ctime
+        self.source = sys.intern(source)
+    
+    @property
+    def path(self):
+        """Chemin complet du fichier"""
+        return os.path.join(self.parent, self.name)
+    
+    @property
+    def modified(self):
+        """Date de modification"""
+        return datetime.fromtimestamp(self.mtime)
+    
+    @property
+    def created(self):
+        """Date de création"""
+        return datetime.fromtimestamp(self.ctime)
+    
+    def __eq__(self, other):
+        if not isinstance(other, FileRecord):
+            return NotImplemented
+        return (self.parent, self.name, self.size, self.mtime, self.ctime, self.source) == \
+               (other.parent, other.name, other.size, other.mtime, other.ctime, other.source)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"FileRecord({self.path!r}, size={self.size})"
@@ -5,28 +5,57 @@
 Modèle de données pour l'affichage des projets
 """
 
+import threading
 from pathlib import Path
-from datetime import datetime
-from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant, pyqtSignal
 from PyQt5.QtGui import QColor, QBrush
 
 from config.constants import PROJECT_COLUMNS
+from services.scanner import CubaseScanner
+from services.vsti_cache import VstiCache
+from services.metadata_cache import MetadataCache
+from services.metadata_index import MetadataIndex
+
+# Nombre de projets lus en arrière-plan entre deux mises à jour des notes
+RATING_BATCH = 200
+
+# Au-delà de ce nombre de plages de lignes à retirer, le modèle est réinitialisé en une fois
+MAX_REMOVE_RANGES = 16
 
 class ProjectTableModel(QAbstractTableModel):
     """Modèle de données pour l'affichage des projets dans un tableau"""
     dark_mode = False  # Mode sombre activé ou non
     
+    # Notes lues en arrière-plan (génération, nom du projet -> note)
+    ratings_loaded = pyqtSignal(int, object)
+    
     def __init__(self, parent=None):
         """Initialisation du modèle"""
         super().__init__(parent)
         
-        # Données
-        self._data = []
+        # Données (table colonnaire, une ligne par projet)
+        self._data = CubaseScanner.empty_dataframe()
+        # Index des lignes par nom de projet (mises à jour incrémentales)
+        self._rows_by_name = {}
+        # Textes affichés, précalculés par colonne (un tableau par colonne)
+        self._display = []
+        self._sources = np.empty(0, dtype=object)
+        self._names = np.empty(0, dtype=object)
+        
+        # Génération des données : les notes lues pour une table remplacée depuis sont ignorées
+        self._generation = 0
+        self.ratings_loaded.connect(self._on_ratings_loaded)
+        
+        # Tri courant (-1 : ordre d'insertion)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
         
         # En-têtes et colonnes du tableau
         self._headers = PROJECT_COLUMNS
         # Ordre des colonnes corrigé pour correspondre aux en-têtes
-        # PROJECT_COLUMNS = ["Nom du projet", "Date de modification", "Taille", "Fichiers CPR", "Fichiers BAK", "Fichiers WAV", "Source"]
+        # PROJECT_COLUMNS = ["Nom du projet", "Date de modification", "Taille", "Fichiers CPR", "Fichiers BAK", "Fichiers WAV", "Source", "BPM"]
         self._columns = [
             'project_name',      # Nom du projet
             'latest_cpr_date',   # Date de modification
@@ -34,7 +63,8 @@ class ProjectTableModel(QAbstractTableModel):
             'cpr_count',         # Fichiers CPR
             'bak_count',         # Fichiers BAK
             'wav_count',         # Fichiers WAV
-            'source'             # Source
+            'source',            # Source
+            'bpm'                # BPM (cache des analyses CPR)
         ]
         
         # Couleurs pour différencier les sources
@@ -55,6 +85,8 @@ class ProjectTableModel(QAbstractTableModel):
         
         # Mode d'affichage (par projet ou par dossier)
         self._view_mode = "project"  # "project" ou "folder"
+        
+        self._refresh_display()
     
     def rowCount(self, parent=QModelIndex()):
         """Nombre de lignes dans le modèle"""
@@ -78,26 +110,11 @@ class ProjectTableModel(QAbstractTableModel):
         row = index.row()
         col = index.column()
         
-        if row >= len(self._data) or self._columns[col] not in self._data[row]:
+        if row >= len(self._data) or col >= len(self._display):
             return QVariant()
         
         if role == Qt.DisplayRole:
-            value = self._data[row][self._columns[col]]
-            
-            # Formatage des dates
-            if isinstance(value, datetime):
-                return value.strftime("%d/%m/%Y %H:%M")
-            
-            # Formatage des chemins de fichiers (afficher seulement le nom)
-            if isinstance(value, str) and '\\' in value:
-                return value.split('\\')[-1]
-            
-            # Formatage des notes en étoiles
-            if self._columns[col] == "rating":
-                rating = int(value) if isinstance(value, (int, float)) else 0
-                return "★" * rating + "☆" * (5 - rating)
-            
-            return str(value)
+            return self._display[col][row]
         
         # Coloration des lignes en fonction de la source
         elif role == Qt.BackgroundRole:
@@ -108,7 +125,7 @@ class ProjectTableModel(QAbstractTableModel):
                 else:
                     return QBrush(QColor("#2d2f31"))
             # Sinon, coloration par source (mode clair)
-            source = self._data[row].get('source', '')
+            source = self._sources[row]
             # Si c'est une source multiple, pas de coloration spécifique
             if source == "Plusieurs sources":
                 return QVariant()
@@ -127,7 +144,7 @@ class ProjectTableModel(QAbstractTableModel):
         Mise à jour des données du modèle
         
         Args:
-            data (list): Nouvelles données
+            data (DataFrame|list): Nouvelles données (table de synthèse ou lignes)
             view_mode (str): Mode d'affichage ("project" ou "folder")
         """
         # Mise à jour du mode de visualisation si spécifié
@@ -137,44 +154,432 @@ class ProjectTableModel(QAbstractTableModel):
         # Début de la mise à jour
         self.beginResetModel()
         
-        # Mise à jour des données
-        self._data = data if data is not None else []
+        # Mise à jour des données (copie : les ajouts incrémentaux ne modifient pas la table de l'appelant)
+        self._data = self._to_frame(data)
+        self._generation += 1
         
         # Réinitialiser les couleurs des sources
         self._source_to_color = {}
         
-        # Ajout des notes depuis le service de métadonnées
-        from services.metadata_service import MetadataService
-        metadata_service = MetadataService()
+        # Ajout des notes depuis l'index des métadonnées
+        unknown = self._load_ratings(self._data)
         
-        for project in self._data:
-            project_name = project['project_name']
-            try:
-                metadata = metadata_service.get_project_metadata(project_name)
-                project['rating'] = metadata.get('rating', 0)
-            except Exception as e:
-                print(f"Erreur lors de la récupération des métadonnées pour {project_name}: {e}")
-                project['rating'] = 0
+        # Tempo et caractéristiques depuis le cache des analyses
+        self._load_features(self._data)
         
         # Marquer les projets les plus récents dans chaque dossier
-        if self._view_mode == "folder" and self._data:
-            # Grouper par dossier et trouver le plus récent dans chaque groupe
-            folders = {}
-            for project in self._data:
-                folder = Path(project.get('source', '')).name
-                if folder not in folders:
-                    folders[folder] = []
-                folders[folder].append(project)
-            
-            # Marquer le plus récent dans chaque dossier
-            for folder, projects in folders.items():
-                if projects:
-                    # Trouver le projet le plus récent dans ce dossier
-                    latest = max(projects, key=lambda x: x.get('latest_cpr_date', datetime.min) 
-                                if x.get('latest_cpr_date') else datetime.min)
-                    latest['is_latest'] = True
+        self._mark_latest()
+        
+        # Réappliquer le tri courant
+        if self._sort_column >= 0 and len(self._data):
+            self._data = self._data.iloc[self._sort_permutation()].reset_index(drop=True)
         
+        self._refresh_display()
         self.endResetModel()
+        self._read_ratings_async(unknown)
+    
+    def append_projects(self, projects):
+        """
+        Ajout ou mise à jour incrémentale de projets (sans réinitialiser le modèle)
+        
+        Les projets déjà présents (même nom) sont remplacés sur place,
+        les nouveaux sont ajoutés en fin de table. Seules ces lignes sont
+        formatées : le coût d'un lot ne dépend pas de la taille de la
+        table. Le tri courant n'est pas réappliqué à chaque lot (appels
+        répétés pendant un scan) : il l'est une fois par merge_data.
+        
+        Args:
+            projects (DataFrame|list): Lignes de synthèse des projets
+        """
+        new = self._to_frame(projects)
+        if new.empty:
+            return
+        
+        unknown = self._load_ratings(new)
+        self._load_features(new)
+        
+        # Recherche ligne par ligne : Series.map(dict) convertirait tout l'index
+        rows = np.array([self._rows_by_name.get(name, -1) for name in new['project_name']],
+                        dtype=np.int64)
+        known = rows >= 0
+        
+        # Mise à jour sur place des lignes existantes, colonne par colonne
+        changed_rows = rows[known]
+        if len(changed_rows):
+            updates = new[known]
+            for column in updates.columns:
+                if column not in self._data.columns:
+                    self._data[column] = None
+                self._data.iloc[changed_rows, self._data.columns.get_loc(column)] = updates[column].to_numpy()
+            display, sources = self._format_rows(self._data.iloc[changed_rows])
+            for texts, changed_texts in zip(self._display, display):
+                texts[changed_rows] = changed_texts
+            self._sources[changed_rows] = sources
+        
+        added = new[~known].drop_duplicates('project_name', keep='last').reset_index(drop=True)
+        if len(added):
+            start = len(self._data)
+            self.beginInsertRows(QModelIndex(), start, start + len(added) - 1)
+            if self._data.empty:
+                self._data = added
+            else:
+                self._data = pd.concat([self._data, added], ignore_index=True)
+            display, sources = self._format_rows(added)
+            if len(self._display) == len(display):
+                self._display = [np.concatenate((texts, added_texts)) for texts, added_texts in zip(self._display, display)]
+            else:
+                self._display = display
+            self._sources = np.concatenate((self._sources, sources))
+            names = added['project_name'].to_numpy(dtype=object)
+            self._names = np.concatenate((self._names, names))
+            self._rows_by_name.update(zip(names, range(start, start + len(names))))
+            self.endInsertRows()
+        
+        if len(changed_rows):
+            self.dataChanged.emit(
+                self.index(int(changed_rows.min()), 0),
+                self.index(int(changed_rows.max()), self.columnCount() - 1)
+            )
+        self._read_ratings_async(unknown)
+    
+    def merge_data(self, data):
+        """
+        Intégration des résultats définitifs d'un scan affiché progressivement
+        
+        Les lignes existantes sont mises à jour, les manquantes ajoutées et
+        celles qui n'existent plus retirées, sans réinitialisation du modèle
+        (la sélection et la position de défilement sont conservées).
+        
+        Args:
+            data (DataFrame|list): Données définitives
+        """
+        final = self._to_frame(data)
+        
+        # Retrait des lignes absentes du résultat final
+        missing = ~self._data['project_name'].isin(final['project_name']).to_numpy()
+        if missing.any():
+            self._remove_rows(missing)
+        
+        self.append_projects(final)
+        
+        if self._mark_latest() and len(self._data):
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._data) - 1, self.columnCount() - 1))
+        
+        # Tri courant réappliqué une fois, sur la table complète
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+    
+    def _remove_rows(self, mask):
+        """
+        Retrait d'un ensemble de lignes
+        
+        Les lignes sont regroupées en plages contiguës : un signal de
+        retrait par plage (de la fin vers le début), chacune découpée dans
+        les textes déjà formatés sans les recalculer. Au-delà de
+        MAX_REMOVE_RANGES plages (projets éparpillés dans la table), le
+        modèle est réinitialisé une seule fois.
+        
+        Args:
+            mask (numpy.ndarray): Booléen par ligne, True pour les lignes à retirer
+        """
+        # Bornes des plages : débuts et fins (exclues) des suites de True
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+        ranges = edges.reshape(-1, 2)
+        
+        if len(ranges) > MAX_REMOVE_RANGES:
+            self.beginResetModel()
+            self._data = self._data[~mask].reset_index(drop=True)
+            self._refresh_display()
+            self.endResetModel()
+            return
+        
+        for first, end in ranges[::-1]:
+            first, end = int(first), int(end)
+            self.beginRemoveRows(QModelIndex(), first, end - 1)
+            kept = np.r_[0:first, end:len(self._data)]
+            self._data = self._data.iloc[kept].reset_index(drop=True)
+            self._display = [texts[kept] for texts in self._display]
+            self._sources = self._sources[kept]
+            self._names = self._names[kept]
+            self.endRemoveRows()
+        self._rows_by_name = dict(zip(self._names, range(len(self._names))))
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """
+        Tri vectorisé de la table (sans passer par les comparaisons du proxy)
+        
+        Args:
+            column (int): Indice de la colonne
+            order (Qt.SortOrder): Ordre de tri
+        """
+        self._sort_column = column
+        self._sort_order = order
+        if not 0 <= column < len(self._columns) or len(self._data) < 2:
+            return
+        
+        self.layoutAboutToBeChanged.emit()
+        permutation = self._sort_permutation()
+        self._data = self._data.iloc[permutation].reset_index(drop=True)
+        # Les textes déjà formatés sont simplement permutés
+        self._display = [texts[permutation] for texts in self._display]
+        self._sources = self._sources[permutation]
+        self._names = self._names[permutation]
+        self._rows_by_name = dict(zip(self._data['project_name'], range(len(self._data))))
+        
+        # Report des index persistants (sélection, ligne courante) sur les nouvelles positions
+        new_rows = np.empty(len(permutation), dtype=np.int64)
+        new_rows[permutation] = np.arange(len(permutation))
+        old_indexes = self.persistentIndexList()
+        self.changePersistentIndexList(
+            old_indexes,
+            [self.index(int(new_rows[index.row()]), index.column()) for index in old_indexes]
+        )
+        self.layoutChanged.emit()
+    
+    def _sort_permutation(self):
+        """
+        Calcul de l'ordre des lignes pour le tri courant
+        
+        Returns:
+            numpy.ndarray: Positions des lignes dans l'ordre trié
+        """
+        column = self._columns[self._sort_column]
+        if column not in self._data.columns:
+            return np.arange(len(self._data))
+        
+        values = self._data[column]
+        if not (pd.api.types.is_numeric_dtype(values) or pd.api.types.is_datetime64_any_dtype(values)):
+            values = values.astype(str).str.lower()
+        ordered = values.reset_index(drop=True).sort_values(
+            ascending=self._sort_order == Qt.AscendingOrder,
+            kind='mergesort',
+            na_position='last'
+        )
+        return ordered.index.to_numpy()
+    
+    def _to_frame(self, data):
+        """
+        Conversion des données reçues en table colonnaire
+        
+        Args:
+            data (DataFrame|list): Table de synthèse ou liste de lignes
+            
+        Returns:
+            DataFrame: Copie indexée de 0 à n-1
+        """
+        if data is None or len(data) == 0:
+            return CubaseScanner.empty_dataframe()
+        if isinstance(data, pd.DataFrame):
+            frame = data.reset_index(drop=True)
+        else:
+            frame = pd.DataFrame(list(data))
+        if 'latest_cpr_date' in frame.columns:
+            frame['latest_cpr_date'] = pd.to_datetime(frame['latest_cpr_date'])
+        return frame
+    
+    def _format_column(self, column, frame=None):
+        """
+        Formatage vectorisé d'une colonne pour l'affichage
+        
+        Args:
+            column (str): Nom de la colonne
+            frame (DataFrame): Lignes à formater (défaut : toute la table)
+            
+        Returns:
+            numpy.ndarray: Textes affichés
+        """
+        if frame is None:
+            frame = self._data
+        if column not in frame.columns:
+            return np.full(len(frame), '', dtype=object)
+        
+        values = frame[column]
+        missing = values.isna()
+        
+        # Formatage des dates
+        if pd.api.types.is_datetime64_any_dtype(values):
+            text = values.dt.strftime("%d/%m/%Y %H:%M")
+        # Formatage des notes en étoiles
+        elif column == "rating":
+            stars = pd.to_numeric(values, errors='coerce').fillna(0).astype(int).clip(0, 5)
+            text = stars.map(lambda rating: "★" * rating + "☆" * (5 - rating))
+            missing = np.zeros(len(values), dtype=bool)
+        else:
+            text = values.astype(str)
+            # Formatage des chemins de fichiers (afficher seulement le nom)
+            if not pd.api.types.is_numeric_dtype(values) and text.str.contains('\\', regex=False).any():
+                text = text.str.rsplit('\\', n=1).str[-1]
+        
+        return text.where(~missing, '').to_numpy(dtype=object)
+    
+    def _format_rows(self, frame):
+        """
+        Textes affichés et sources d'un ensemble de lignes
+        
+        Args:
+            frame (DataFrame): Lignes à formater
+        
+        Returns:
+            tuple: (textes par colonne, sources)
+        """
+        display = [self._format_column(column, frame) for column in self._columns]
+        if 'source' in frame.columns:
+            sources = frame['source'].fillna('').to_numpy(dtype=object)
+        else:
+            sources = np.full(len(frame), '', dtype=object)
+        return display, sources
+    
+    def _refresh_display(self):
+        """Recalcul des textes affichés et de l'index des lignes par nom"""
+        self._display, self._sources = self._format_rows(self._data)
+        self._names = self._data['project_name'].to_numpy(dtype=object)
+        self._rows_by_name = dict(zip(self._names, range(len(self._names))))
+    
+    def _load_ratings(self, projects):
+        """
+        Ajout des notes depuis l'index global des métadonnées
+        
+        Une seule consultation groupée de MetadataIndex (en mémoire). Les
+        projets dont l'index ne sait rien (metadata.json pas encore vu par
+        un scan) ont provisoirement 0 ; leur fichier est à lire en
+        arrière-plan (_read_ratings_async).
+        
+        Args:
+            projects (DataFrame): Projets à compléter (colonne "rating" ajoutée sur place)
+        
+        Returns:
+            list: Tuples (nom du projet, dossier) des projets à lire directement
+        """
+        if 'project_dir' not in projects.columns or projects.empty:
+            projects['rating'] = 0
+            return []
+        dirs = projects['project_dir']
+        index = MetadataIndex.default()
+        try:
+            known = index.get_many(dirs)
+            unknown = set(index.unknown(dirs))
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'index des métadonnées : {e}")
+            known, unknown = {}, set()
+        ratings = {project_dir: metadata['rating'] for project_dir, metadata in known.items()}
+        projects['rating'] = dirs.map(ratings).fillna(0).astype(int)
+        if not unknown:
+            return []
+        pending = projects.loc[dirs.isin(unknown), ['project_name', 'project_dir']]
+        return list(zip(pending['project_name'], pending['project_dir']))
+    
+    def _read_ratings_async(self, pending):
+        """
+        Lecture en arrière-plan des notes des projets absents de l'index,
+        reportées sur les lignes à l'arrivée (ratings_loaded)
+        
+        Args:
+            pending (list): Tuples (nom du projet, dossier du projet)
+        """
+        if pending:
+            threading.Thread(target=self._read_ratings, args=(self._generation, pending),
+                             name="notes-projets", daemon=True).start()
+    
+    def _read_ratings(self, generation, pending):
+        """
+        Lecture des notes des projets absents de l'index (thread d'arrière-plan)
+        
+        Args:
+            generation (int): Génération des données au moment de la demande
+            pending (list): Tuples (nom du projet, dossier du projet)
+        """
+        cache = MetadataCache.default()
+        found = {}
+        for project_name, project_dir in pending:
+            if generation != self._generation:
+                return
+            try:
+                metadata = cache.get(project_dir)
+            except Exception as e:
+                print(f"Erreur lors de la lecture des métadonnées de {project_name}: {e}")
+                continue
+            rating = metadata.get('rating') if metadata else None
+            if isinstance(rating, int) and rating:
+                found[project_name] = rating
+            if len(found) >= RATING_BATCH:
+                self.ratings_loaded.emit(generation, found)
+                found = {}
+        if found:
+            self.ratings_loaded.emit(generation, found)
+    
+    def _on_ratings_loaded(self, generation, ratings):
+        """
+        Report des notes lues en arrière-plan sur les lignes (thread de l'interface)
+        
+        Args:
+            generation (int): Génération des données au moment de la demande
+            ratings (dict): Nom du projet -> note
+        """
+        if generation != self._generation or 'rating' not in self._data.columns:
+            return
+        rows = [(self._rows_by_name[name], rating) for name, rating in ratings.items() if name in self._rows_by_name]
+        if not rows:
+            return
+        positions = np.fromiter((row for row, _ in rows), dtype=np.int64, count=len(rows))
+        self._data.iloc[positions, self._data.columns.get_loc('rating')] = [rating for _, rating in rows]
+        if 'rating' in self._columns:
+            self._refresh_display()
+        self.dataChanged.emit(self.index(int(positions.min()), 0),
+                              self.index(int(positions.max()), self.columnCount() - 1))
+    
+    def _load_features(self, projects):
+        """
+        Ajout du tempo et des caractéristiques depuis le cache des analyses CPR
+        
+        Aucun fichier n'est ouvert : seuls les CPR déjà analysés (sélection
+        ou inventaire des plugins) et inchangés depuis ont une valeur.
+        
+        Args:
+            projects (DataFrame): Projets à compléter (colonnes ajoutées sur place)
+        """
+        keys = ('latest_cpr', 'latest_cpr_size', 'latest_cpr_mtime')
+        features = {}
+        if len(projects) and all(key in projects.columns for key in keys):
+            try:
+                features = VstiCache.default().features_for(zip(*(projects[key] for key in keys)))
+            except Exception as e:
+                print(f"Erreur lors de la lecture du cache des analyses : {e}")
+        paths = projects['latest_cpr'] if 'latest_cpr' in projects.columns else [None] * len(projects)
+        for feature, column in (('tempo', 'bpm'), ('time_signature', 'time_signature'),
+                                ('track_count', 'track_count'), ('sample_rate', 'sample_rate')):
+            projects[column] = [features.get(path, {}).get(feature) for path in paths]
+        projects['bpm'] = pd.to_numeric(projects['bpm'], errors='coerce').round(2)
+    
+    def reload_features(self):
+        """Relecture du cache des analyses (après l'analyse d'un projet)"""
+        if self._data.empty:
+            return
+        self._load_features(self._data)
+        self._refresh_display()
+        column = self._columns.index('bpm')
+        self.dataChanged.emit(self.index(0, column), self.index(len(self._data) - 1, column))
+    
+    def _mark_latest(self):
+        """
+        Marquage du projet le plus récent de chaque dossier (mode "folder")
+        
+        Returns:
+            bool: True si des projets ont été marqués
+        """
+        if self._view_mode != "folder" or self._data.empty:
+            return False
+        
+        # Nom du dossier de chaque source (calculé une fois par source distincte)
+        sources = self._data['source'].fillna('')
+        folder_names = {source: Path(source).name for source in sources.unique()}
+        folders = sources.map(folder_names)
+        
+        # Le plus récent de chaque dossier (les projets sans date passent en dernier)
+        dates = self._data['latest_cpr_date']
+        dates = dates.fillna(dates.min() if dates.notna().any() else pd.Timestamp(0))
+        latest = dates.groupby(folders, sort=False).idxmax()
+        self._data['is_latest'] = self._data.index.isin(latest.to_numpy())
+        return True
     
     def get_project(self, row):
         """
@@ -187,9 +592,36 @@ class ProjectTableModel(QAbstractTableModel):
             dict: Données du projet
         """
         if 0 <= row < len(self._data):
-            return self._data[row]
+            project = {}
+            for key, value in self._data.iloc[row].items():
+                if isinstance(value, pd.Timestamp):
+                    value = value.to_pydatetime()
+                elif isinstance(value, np.generic):
+                    value = value.item()
+                elif value is not None and not isinstance(value, (list, tuple, dict)) and pd.isna(value):
+                    value = None
+                project[key] = value
+            return project
         return None
         
+    def project_names(self):
+        """
+        Noms des projets, dans l'ordre des lignes
+        
+        Returns:
+            numpy.ndarray: Nom du projet de chaque ligne
+        """
+        return self._names
+    
+    def projects_frame(self):
+        """
+        Table des projets affichés (notes et tempo compris), à ne pas modifier
+        
+        Returns:
+            DataFrame: Une ligne par projet, dans l'ordre des lignes
+        """
+        return self._data
+    
     def get_project_at_row(self, row):
         """
         Récupération du nom du projet à une ligne donnée
@@ -201,7 +633,7 @@ class ProjectTableModel(QAbstractTableModel):
             str: Nom du projet
         """
         if 0 <= row < len(self._data):
-            return self._data[row]['project_name']
+            return self._data['project_name'].iat[row]
         return None
         
     def get_source_color(self, source):
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ordonnanceur des analyses en arrière-plan (VSTi, formes d'onde, infos audio)
+"""
+
+import heapq
+import itertools
+import threading
+import traceback
+
+# Priorités des tâches (la plus petite valeur passe en premier)
+PRIORITY_SELECTED = 0
+PRIORITY_PREFETCH = 10
+PRIORITY_BACKGROUND = 20
+
+# États d'une tâche
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+
+class AnalysisCancelled(Exception):
+    """Analyse interrompue par son jeton d'annulation"""
+
+class CancellationToken:
+    """
+    Jeton d'annulation coopérative
+    
+    L'analyse le consulte entre deux blocs de travail (raise_if_cancelled)
+    et s'arrête d'elle-même : aucun thread n'est interrompu de force.
+    """
+    
+    __slots__ = ('_event',)
+    
+    def __init__(self):
+        """Initialisation du jeton (non annulé)"""
+        self._event = threading.Event()
+    
+    def cancel(self):
+        """Demande d'annulation"""
+        self._event.set()
+    
+    @property
+    def cancelled(self):
+        """True si l'annulation a été demandée"""
+        return self._event.is_set()
+    
+    def raise_if_cancelled(self):
+        """
+        Point d'arrêt de l'analyse
+        
+        Raises:
+            AnalysisCancelled: Si l'annulation a été demandée
+        """
+        if self._event.is_set():
+            raise AnalysisCancelled()
+
+class AnalysisJob:
+    """
+    Tâche d'analyse soumise à l'ordonnanceur
+    
+    Une même tâche (même clé) peut avoir plusieurs abonnés : chacun reçoit
+    la progression et le résultat.
+    """
+    
+    __slots__ = ('key', 'func', 'priority', 'token', 'state', 'result', 'error',
+                 'traceback', '_callbacks', '_progress_callbacks')
+    
+    def __init__(self, key, func, priority):
+        """
+        Initialisation de la tâche
+        
+        Args:
+            key (hashable): Clé de déduplication ("vsti", chemin du CPR)...
+            func (callable): Fonction appelée avec (jeton, fonction de progression)
+            priority (int): Priorité (PRIORITY_SELECTED, PRIORITY_PREFETCH...)
+        """
+        self.key = key
+        self.func = func
+        self.priority = priority
+        self.token = CancellationToken()
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.traceback = ""
+        self._callbacks = []
+        self._progress_callbacks = []
+    
+    @property
+    def cancelled(self):
+        """True si la tâche a été annulée"""
+        return self.token.cancelled
+    
+    def report_progress(self, percent):
+        """
+        Transmission de la progression aux abonnés
+        
+        Args:
+            percent (int): Pourcentage d'avancement
+        """
+        for callback in list(self._progress_callbacks):
+            callback(percent)
+    
+    def __repr__(self):
+        return f"AnalysisJob({self.key!r}, priority={self.priority}, state={self.state})"
+
+class AnalysisScheduler:
+    """
+    File d'attente prioritaire des analyses, exécutées par un nombre borné
+    de threads
+    
+    - Les tâches sont prises par ordre de priorité puis d'arrivée : le
+      projet sélectionné (PRIORITY_SELECTED) passe devant le préchargement
+      et les analyses de fond.
+    - Une tâche soumise alors qu'une tâche de même clé est en attente ou en
+      cours n'est pas dupliquée : l'appelant s'abonne à la tâche existante,
+      dont la priorité est relevée si besoin.
+    - cancel() annule une tâche : retirée de la file si elle attend, sinon
+      son jeton est levé et l'analyse s'arrête au prochain point de
+      contrôle. Les abonnés d'une tâche annulée sont prévenus
+      (job.cancelled).
+    
+    Les fonctions de rappel sont appelées depuis les threads de travail :
+    une interface graphique doit les relayer vers son thread (signal Qt).
+    """
+    
+    def __init__(self, max_workers=2):
+        """
+        Initialisation de l'ordonnanceur
+        
+        Args:
+            max_workers (int): Nombre maximal de threads d'analyse
+        """
+        self.max_workers = max(int(max_workers or 1), 1)
+        self._condition = threading.Condition()
+        self._queue = []
+        self._counter = itertools.count()
+        self._jobs = {}
+        self._workers = []
+        self._shutdown = False
+    
+    def submit(self, key, func, priority=PRIORITY_BACKGROUND, callback=None, progress_callback=None):
+        """
+        Soumission d'une tâche d'analyse
+        
+        Args:
+            key (hashable): Clé de la tâche (deux soumissions de même clé partagent la tâche)
+            func (callable): Fonction appelée avec (jeton d'annulation, fonction de progression)
+            priority (int): Priorité (la plus petite passe en premier)
+            callback (callable): Fonction appelée avec la tâche terminée (ou annulée)
+            progress_callback (callable): Fonction appelée avec le pourcentage d'avancement
+        
+        Returns:
+            AnalysisJob: Tâche (existante ou nouvelle)
+        """
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Ordonnanceur d'analyses arrêté")
+            job = self._jobs.get(key)
+            if job is None or job.cancelled:
+                job = AnalysisJob(key, func, priority)
+                self._jobs[key] = job
+                self._push(job)
+                self._start_worker()
+            elif priority < job.priority:
+                # Tâche déjà connue : relevée dans la file si elle attend encore
+                job.priority = priority
+                if job.state == QUEUED:
+                    self._push(job)
+            if callback:
+                job._callbacks.append(callback)
+            if progress_callback:
+                job._progress_callbacks.append(progress_callback)
+            return job
+    
+    def set_priority(self, key, priority):
+        """
+        Changement de priorité d'une tâche (relevée ou abaissée)
+        
+        Args:
+            key (hashable): Clé de la tâche
+            priority (int): Nouvelle priorité
+        
+        Returns:
+            bool: True si la tâche existe
+        """
+        with self._condition:
+            job = self._jobs.get(key)
+            if job is None or job.cancelled:
+                return False
+            if priority != job.priority:
+                job.priority = priority
+                if job.state == QUEUED:
+                    self._push(job)
+            return True
+    
+    def cancel(self, key, min_priority=None):
+        """
+        Annulation d'une tâche en attente ou en cours
+        
+        Args:
+            key (hashable): Clé de la tâche
+            min_priority (int): N'annuler que si la priorité de la tâche vaut au moins
+                cette valeur (une tâche relevée entre-temps par un autre abonné est gardée)
+        
+        Returns:
+            bool: True si une tâche a été annulée
+        """
+        with self._condition:
+            job = self._jobs.get(key)
+            if job is None or job.cancelled:
+                return False
+            if min_priority is not None and job.priority < min_priority:
+                return False
+            job.token.cancel()
+            if job.state != QUEUED:
+                # L'analyse en cours s'arrête d'elle-même au prochain point de contrôle
+                return True
+            # Tâche jamais démarrée : terminée tout de suite
+            self._jobs.pop(key)
+            job.state = DONE
+        self._notify(job)
+        return True
+    
+    def cancel_all(self):
+        """Annulation de toutes les tâches en attente ou en cours"""
+        with self._condition:
+            keys = list(self._jobs)
+        for key in keys:
+            self.cancel(key)
+    
+    def pending(self):
+        """
+        Tâches en attente ou en cours
+        
+        Returns:
+            list: Clés des tâches
+        """
+        with self._condition:
+            return list(self._jobs)
+    
+    def shutdown(self, wait=True):
+        """
+        Arrêt de l'ordonnanceur : tâches annulées, threads terminés
+        
+        Args:
+            wait (bool): Attendre la fin des analyses en cours
+        """
+        self.cancel_all()
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                worker.join()
+    
+    def _push(self, job):
+        """Ajout d'une entrée dans la file (appel sous verrou)"""
+        heapq.heappush(self._queue, (job.priority, next(self._counter), job))
+        self._condition.notify()
+    
+    def _start_worker(self):
+        """Démarrage d'un thread si la limite n'est pas atteinte (appel sous verrou)"""
+        if len(self._workers) >= self.max_workers:
+            return
+        worker = threading.Thread(target=self._work, name=f"analyse-{len(self._workers) + 1}", daemon=True)
+        self._workers.append(worker)
+        worker.start()
+    
+    def _next_job(self):
+        """
+        Prochaine tâche à exécuter, par priorité
+        
+        Une tâche relevée a plusieurs entrées dans la file : seule celle qui
+        correspond à sa priorité courante est retenue.
+        
+        Returns:
+            AnalysisJob: Tâche, ou None à l'arrêt de l'ordonnanceur
+        """
+        with self._condition:
+            while True:
+                while self._queue:
+                    priority, _, job = heapq.heappop(self._queue)
+                    if job.state == QUEUED and priority == job.priority and not job.cancelled:
+                        job.state = RUNNING
+                        return job
+                if self._shutdown:
+                    return None
+                self._condition.wait()
+    
+    def _work(self):
+        """Boucle d'un thread d'analyse"""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                job.result = job.func(job.token, job.report_progress)
+            except AnalysisCancelled:
+                pass
+            except Exception as e:
+                job.error = e
+                job.traceback = traceback.format_exc()
+                print(f"Erreur lors de l'analyse {job.key!r} : {e}")
+            with self._condition:
+                job.state = DONE
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            self._notify(job)
+    
+    def _notify(self, job):
+        """Appel des fonctions de rappel d'une tâche terminée"""
+        for callback in job._callbacks:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Erreur dans le rappel de l'analyse {job.key!r} : {e}")
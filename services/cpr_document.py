@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lecture structurée d'un fichier CPR (conteneur RIFF de Cubase)
+"""
+
+import os
+import re
+import mmap
+import struct
+from contextlib import contextmanager
+from functools import cached_property
+
+# En-tête du conteneur : "RIFF" + taille (big-endian) + type "NUND"
+RIFF_MAGIC = b'RIFF'
+FORM_TYPE = b'NUND'
+HEADER_SIZE = 12
+CHUNK_HEADER_SIZE = 8
+
+# Sections contenant les objets sérialisés du projet (pistes, plugins)
+ARCHIVE_CHUNKS = ('ROOT', 'ARCH')
+
+# Valeurs numériques relevées dans les sections d'objets : clé -> (champ, test de plausibilité)
+# Seules les fréquences standard sont acceptées : un octet de type ou de
+# drapeaux ne peut pas passer pour une valeur. Tempo et signature (clés
+# RehearsalTempo, SignatureNumerator/Denominator) ne sont pas relevés tant
+# que leur position et leur type n'ont pas été vérifiés sur des projets réels.
+SAMPLE_RATES = (22050, 32000, 44100, 48000, 88200, 96000, 176400, 192000, 384000)
+NUMERIC_FIELDS = {
+    b'SampleRate': ('sample_rate', lambda v: v in SAMPLE_RATES),
+}
+
+# Clés recherchées dans les sections d'objets, en une seule expression
+ARCHIVE_KEYS = re.compile(
+    rb'(?P<plugin>Plugin Name)'
+    rb'|(?P<track>\x00\x00\x00\x05Name\x00)'
+    rb'|(?P<field>' + b'|'.join(re.escape(key) for key in NUMERIC_FIELDS) + rb')\x00'
+)
+
+# Fenêtre lue après une clé "Plugin Name" (même portée que l'ancienne regex)
+PLUGIN_ENTRY = re.compile(rb'Plugin\s+Nam[^\n\r]{2,40}')
+VALUE_WINDOW = 16
+MAX_STRING_LENGTH = 256
+
+@contextmanager
+def cpr_buffer(fichier):
+    """
+    Contenu d'un fichier CPR projeté en mémoire (mmap, lecture seule)
+    
+    Le fichier n'est jamais copié : les pages sont lues à la demande par le
+    système et partagées entre les analyses qui tournent en parallèle.
+    
+    Args:
+        fichier (str): Chemin du fichier CPR
+    
+    Yields:
+        mmap|bytes: Contenu du fichier (b'' pour un fichier vide, non projetable)
+    """
+    with open(fichier, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+class CprChunk:
+    """Section du conteneur : identifiant, position et taille des données"""
+    
+    __slots__ = ('id', 'offset', 'size')
+    
+    def __init__(self, chunk_id, offset, size):
+        """
+        Initialisation de la section
+        
+        Args:
+            chunk_id (str): Identifiant sur 4 caractères ("ROOT", "ARCH"...)
+            offset (int): Position des données dans le fichier
+            size (int): Taille des données
+        """
+        self.id = chunk_id
+        self.offset = offset
+        self.size = size
+    
+    def __repr__(self):
+        return f"CprChunk({self.id!r}, offset={self.offset}, size={self.size})"
+
+class CprDocument:
+    """
+    Fichier CPR parcouru par sections, décodées à la demande
+    
+    Seuls les en-têtes de sections sont lus à l'ouverture ; les données
+    embarquées (audio, images...) ne sont jamais parcourues. Les noms de
+    plugins et de pistes sont décodés depuis les sections d'objets
+    (ARCHIVE_CHUNKS), où Cubase stocke ses chaînes sous la forme longueur
+    sur 4 octets (big-endian, zéro final compris) + texte + zéro.
+    
+    Un fichier qui n'a pas cet en-tête (ou aucune section d'objets) est
+    signalé par is_structured = False : l'appelant n'en tire alors aucune
+    caractéristique.
+    
+    S'utilise comme gestionnaire de contexte (le fichier est projeté en
+    mémoire pendant la lecture) :
+        
+        with CprDocument(chemin) as document:
+            document.plugin_names
+    """
+    
+    def __init__(self, fichier):
+        """
+        Initialisation du document
+        
+        Args:
+            fichier (str): Chemin du fichier CPR
+        """
+        self.path = fichier
+        self._context = None
+        self._data = None
+        # Octets des sections d'objets parcourus par les recherches de clés
+        self.bytes_decoded = 0
+    
+    def __enter__(self):
+        self._context = cpr_buffer(self.path)
+        self._data = self._context.__enter__()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._data = None
+        context, self._context = self._context, None
+        return context.__exit__(exc_type, exc_value, traceback)
+    
+    @property
+    def buffer(self):
+        """Contenu complet du fichier projeté (mmap, ou b'' si vide)"""
+        return self._data
+    
+    @property
+    def size(self):
+        """Taille du fichier"""
+        return len(self._data)
+    
+    @cached_property
+    def chunks(self):
+        """
+        Sections de premier niveau du conteneur (en-têtes seulement)
+        
+        Returns:
+            list: CprChunk dans l'ordre du fichier (vide si ce n'est pas un conteneur RIFF)
+        """
+        data = self._data
+        if len(data) < HEADER_SIZE or data[:4] != RIFF_MAGIC or data[8:12] != FORM_TYPE:
+            return []
+        chunks = []
+        pos = HEADER_SIZE
+        end = len(data)
+        while pos + CHUNK_HEADER_SIZE <= end:
+            chunk_id = data[pos:pos + 4].decode('latin-1')
+            size = int.from_bytes(data[pos + 4:pos + 8], 'big')
+            offset = pos + CHUNK_HEADER_SIZE
+            # Fichier tronqué : dernière section limitée à la fin du fichier
+            size = min(size, end - offset)
+            chunks.append(CprChunk(chunk_id, offset, size))
+            pos = offset + size + (size & 1)
+        return chunks
+    
+    @property
+    def archive_chunks(self):
+        """Sections d'objets (pistes, plugins)"""
+        return [chunk for chunk in self.chunks if chunk.id in ARCHIVE_CHUNKS]
+    
+    @property
+    def is_structured(self):
+        """True si le fichier a été reconnu comme conteneur avec des sections d'objets"""
+        return bool(self.archive_chunks)
+    
+    def section(self, chunk):
+        """
+        Données d'une section, sans copie
+        
+        Args:
+            chunk (CprChunk): Section
+        
+        Returns:
+            memoryview: Vue sur les données
+        """
+        return memoryview(self._data)[chunk.offset:chunk.offset + chunk.size]
+    
+    @cached_property
+    def _archive(self):
+        """
+        Parcours unique des sections d'objets : toutes les clés connues sont
+        relevées dans la même passe (plugins, pistes, fréquence)
+        
+        Returns:
+            dict: Valeurs décodées
+        """
+        data = self._data
+        found = {'plugin_entries': [], 'track_names': [], 'fields': {}}
+        for chunk in self.archive_chunks:
+            end = chunk.offset + chunk.size
+            self.bytes_decoded += chunk.size
+            for match in ARCHIVE_KEYS.finditer(data, chunk.offset, end):
+                kind = match.lastgroup
+                if kind == 'plugin':
+                    entry = PLUGIN_ENTRY.match(data, match.start(), end)
+                    raw = entry.group() if entry else match.group()
+                    found['plugin_entries'].append((self._string_after(match.end(), end), raw))
+                elif kind == 'track':
+                    name = self._string_after(match.end(), end)
+                    if name:
+                        found['track_names'].append(name)
+                else:
+                    field, accept = NUMERIC_FIELDS[match.group(kind)]
+                    if field not in found['fields']:
+                        value = self._number_after(match.end(), end, accept)
+                        if value is not None:
+                            found['fields'][field] = value
+        return found
+    
+    @property
+    def plugin_entries(self):
+        """Entrées "Plugin Name" : tuples (nom décodé ou None, texte brut de l'entrée)"""
+        return self._archive['plugin_entries']
+    
+    @property
+    def plugin_names(self):
+        """Noms des plugins déclarés dans le projet, dans l'ordre du fichier"""
+        return [name for name, _ in self.plugin_entries if name]
+    
+    @property
+    def track_names(self):
+        """Noms des objets nommés (pistes notamment), dans l'ordre du fichier"""
+        return self._archive['track_names']
+    
+    @property
+    def sample_rate(self):
+        """Fréquence d'échantillonnage en Hz (None si introuvable)"""
+        value = self._archive['fields'].get('sample_rate')
+        return int(value) if value is not None else None
+    
+    @property
+    def features(self):
+        """
+        Caractéristiques musicales du projet
+        
+        Tempo, signature et nombre de pistes restent à None : leurs valeurs
+        ne sont pas encore décodées à leur position réelle (track_names
+        relève tout objet qui a une clé "Name", pas seulement les pistes),
+        et une valeur devinée serait gardée dans le cache des analyses.
+        
+        Returns:
+            dict: tempo, time_signature, track_count, sample_rate
+        """
+        return {
+            'tempo': None,
+            'time_signature': None,
+            'track_count': None,
+            'sample_rate': self.sample_rate
+        }
+    
+    def detection_text(self):
+        """
+        Texte soumis à la détection des VSTi : entrées de plugins et noms de pistes
+        
+        Une ligne par chaîne décodée ; une entrée "Plugin Name" dont la
+        valeur n'a pas pu être décodée est reprise telle que l'aurait vue
+        la recherche sur le fichier brut.
+        
+        Returns:
+            bytes: Lignes séparées par des retours à la ligne
+        """
+        lines = []
+        for name, raw in self.plugin_entries:
+            lines.append(b'Plugin Name ' + name.encode('utf-8') if name else raw)
+        lines.extend(name.encode('utf-8') for name in self.track_names)
+        return b'\n'.join(lines)
+    
+    def _string_after(self, pos, end):
+        """
+        Chaîne longueur + texte + zéro qui suit une clé
+        
+        La valeur suit la clé de quelques octets (type, drapeaux) : on
+        cherche dans VALUE_WINDOW octets une longueur plausible suivie d'un
+        texte sans zéro interne et terminé par un zéro.
+        
+        Args:
+            pos (int): Position juste après la clé
+            end (int): Fin de la section
+        
+        Returns:
+            str: Chaîne décodée, ou None
+        """
+        data = self._data
+        for start in range(pos, min(pos + VALUE_WINDOW, end - 4)):
+            length = int.from_bytes(data[start:start + 4], 'big')
+            text_end = start + 4 + length - 1
+            if not 1 < length <= MAX_STRING_LENGTH or text_end >= end:
+                continue
+            text = data[start + 4:text_end]
+            if data[text_end] == 0 and b'\x00' not in text:
+                return text.decode('utf-8', errors='ignore')
+        return None
+    
+    def _number_after(self, pos, end, accept):
+        """
+        Valeur numérique qui suit une clé (double ou entier 32 bits, big-endian)
+        
+        Comme pour les chaînes, la valeur est cherchée dans VALUE_WINDOW
+        octets ; la première valeur plausible est retenue.
+        
+        Args:
+            pos (int): Position juste après la clé
+            end (int): Fin de la section
+            accept (callable): Test de plausibilité de la valeur
+        
+        Returns:
+            float: Valeur trouvée, ou None
+        """
+        data = self._data
+        for start in range(pos, min(pos + VALUE_WINDOW, end - 4)):
+            if start + 8 <= end:
+                (value,) = struct.unpack('>d', data[start:start + 8])
+                if accept(value):
+                    return value
+            value = int.from_bytes(data[start:start + 4], 'big')
+            if accept(value):
+                return float(value)
+        return None
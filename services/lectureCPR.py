@@ -1,52 +1,77 @@
-import re
 import os
 from services.vsti_manager import load_vsti_list
+from services.vsti_detector import VstiDetector
+from services.vsti_cache import VstiCache, FEATURE_KEYS
+from services.cpr_document import CprDocument
 
-def trouve_vsti(fichier, progress_callback=None):
-    print(f"Analyse de : {os.path.basename(fichier)}")
+def analyse_cpr(fichier, vsti_connus, progress_callback=None, use_cache=True, structured=True, cancel_token=None):
+    """
+    Analyse d'un fichier CPR : VSTi et caractéristiques du projet (sans affichage console)
+    
+    Les VSTi sont recherchés dans tout le fichier, en une seule passe. Si
+    le fichier est reconnu comme conteneur RIFF Cubase, ses sections
+    d'objets (CprDocument) donnent en plus les caractéristiques du projet ;
+    sinon elles restent inconnues.
+    
+    La lecture par sections repose sur une structure du conteneur qui n'a
+    pas encore été comparée à des projets Cubase réels
+    (benchmarks/bench_cpr_document.py) : tant que ce n'est pas fait, elle
+    n'intervient pas dans la détection des VSTi.
+    
+    Args:
+        fichier (str): Chemin du fichier CPR
+        vsti_connus (list): Liste des VSTi connus
+        progress_callback (callable): Fonction appelée avec le pourcentage d'avancement
+        use_cache (bool): Utiliser le cache persistant des analyses
+        structured (bool): Lire les caractéristiques dans les sections d'objets quand c'est possible
+        cancel_token (CancellationToken): Jeton d'annulation, consulté entre deux blocs
+        
+    Returns:
+        dict: "vsti" (set) et caractéristiques (tempo, time_signature, track_count, sample_rate)
+    
+    Raises:
+        AnalysisCancelled: Si l'analyse a été annulée (rien n'est mis en cache)
+    """
+    # Résultat déjà connu si le fichier et la liste n'ont pas changé
+    cache = VstiCache.default() if use_cache else None
+    if cache is not None:
+        cle = cache.key_for(fichier, vsti_connus)
+        analyse = cache.get_analysis(cle)
+        if analyse is not None:
+            if progress_callback:
+                progress_callback(100)
+            return analyse
     
-    with open(fichier, "rb") as f:
-        data = f.read()
+    # Moteur compilé une seule fois pour la liste courante
+    detector = VstiDetector.for_list(vsti_connus)
+    with CprDocument(fichier) as document:
+        # Une passe sur tout le fichier projeté
+        trouvés = detector.detect(document.buffer, progress_callback, cancel_token)
+        if structured and document.is_structured:
+            analyse = dict(document.features)
+        else:
+            analyse = dict.fromkeys(FEATURE_KEYS)
+        analyse['vsti'] = trouvés
+    if cache is not None:
+        cache.put(cle, analyse['vsti'], analyse)
+    return analyse
+
+def detecte_vsti(fichier, vsti_connus, progress_callback=None, use_cache=True, structured=True, cancel_token=None):
+    """
+    Détection des VSTi d'un fichier CPR (voir analyse_cpr)
+    
+    Returns:
+        set: VSTi trouvés
+    """
+    return analyse_cpr(fichier, vsti_connus, progress_callback, use_cache, structured, cancel_token)['vsti']
+
+def trouve_vsti(fichier, progress_callback=None, use_cache=True, cancel_token=None):
+    print(f"Analyse de : {os.path.basename(fichier)}")
     
     # Charger la liste des VSTi dynamiquement
     vsti_connus = load_vsti_list()
     
-    trouvés = set()  # On utilise un set pour éviter les doublons
-    
-    total = len(vsti_connus) * 2  # Boucles numérotés + sans numéro
-    progress = 0
-    # Cherchons les VSTi numérotés (comme "Serum 01", "Kick 2 01", etc.)
-    for idx, vsti in enumerate(vsti_connus):
-        pattern = re.compile(f"{vsti}\\s+\\d{{2}}".encode('utf-8'))
-        matches = pattern.findall(data)
-        for match in matches:
-            trouvés.add(match.decode('utf-8', errors='ignore'))
-        progress += 1
-        if progress_callback:
-            percent = int(progress * 100 / total)
-            progress_callback(percent)
-    # Cherchons aussi les instances sans numéro
-    for idx, vsti in enumerate(vsti_connus):
-        # On évite les faux positifs en vérifiant que ce n'est pas au milieu d'un mot
-        pattern = re.compile(rb'(?<!\w)' + vsti.encode('utf-8') + rb'(?!\w)')
-        matches = pattern.findall(data)
-        if matches:
-            if not any(vsti in déjà_trouvé for déjà_trouvé in trouvés):
-                trouvés.add(vsti)
-        progress += 1
-        if progress_callback:
-            percent = int(progress * 100 / total)
-            progress_callback(percent)
-    # Cherchons aussi les entrées de type "Plugin Nam..."
-    plugin_pattern = re.compile(rb'Plugin\s+Nam[^\n\r]{2,40}')
-    plugin_matches = plugin_pattern.findall(data)
-    
-    for match in plugin_matches:
-        texte = match.decode('utf-8', errors='ignore')
-        # On extrait le nom du plugin si on le trouve
-        for vsti in vsti_connus:
-            if vsti in texte and vsti not in trouvés and not any(vsti in déjà_trouvé for déjà_trouvé in trouvés):
-                trouvés.add(vsti)
+    trouvés = detecte_vsti(fichier, vsti_connus, progress_callback, use_cache, cancel_token=cancel_token)
     
     print("\nListe des plugins :")
     for vsti in sorted(trouvés):
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache mémoire des fichiers metadata.json locaux (un par dossier de projet)
+"""
+
+import os
+import copy
+import json
+import time
+import threading
+from collections import OrderedDict
+
+from config.constants import DEFAULT_METADATA_FILE
+from services.scan_index import RACY_DELAY
+from services.metadata_writer import MetadataWriter
+
+# Nombre maximal de projets gardés en mémoire (les moins récemment lus sont évincés)
+MAX_ENTRIES = 10000
+
+class MetadataCache:
+    """
+    Contenu des metadata.json, clé = dossier du projet
+    
+    Chaque lecture vérifie la taille et la date de modification du fichier
+    (un seul stat) : tant qu'il n'a pas changé, le contenu est servi depuis
+    la mémoire sans ouvrir le fichier. Les écritures passent par put, qui
+    met le cache à jour tout de suite et confie l'écriture du fichier à
+    MetadataWriter (différée et atomique) ; un contenu pas encore écrit est
+    servi depuis la file d'écriture, y compris quand son écriture a échoué
+    et attend un nouvel essai.
+    
+    Les lectures n'écrivent jamais : un projet sans metadata.json renvoie
+    None. Le contenu est toujours renvoyé sous forme de copie, que
+    l'appelant peut modifier librement.
+    
+    Un fichier modifié il y a moins de RACY_DELAY secondes n'est pas gardé
+    en cache (une nouvelle écriture dans le même intervalle pourrait ne pas
+    changer sa date).
+    """
+    
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self, filename=DEFAULT_METADATA_FILE, max_entries=MAX_ENTRIES, writer=None):
+        """
+        Initialisation du cache
+        
+        Args:
+            filename (str): Nom du fichier de métadonnées dans chaque dossier
+            max_entries (int): Nombre maximal de projets en mémoire
+            writer (MetadataWriter): File d'écriture (défaut : MetadataWriter.default())
+        """
+        self.filename = filename
+        self.writer = writer or MetadataWriter.default()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+    
+    @classmethod
+    def default(cls):
+        """
+        Cache partagé de l'application (toutes les instances de MetadataService)
+        
+        Returns:
+            MetadataCache: Instance commune (créée à la demande)
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+    
+    @staticmethod
+    def _key(project_dir):
+        """Clé d'un dossier de projet (chemin absolu normalisé)"""
+        return os.path.normcase(os.path.abspath(project_dir))
+    
+    def path(self, project_dir):
+        """
+        Args:
+            project_dir (str): Dossier du projet
+        
+        Returns:
+            str: Chemin du fichier de métadonnées
+        """
+        return os.path.join(project_dir, self.filename)
+    
+    def get(self, project_dir):
+        """
+        Métadonnées d'un projet
+        
+        Args:
+            project_dir (str): Dossier du projet
+        
+        Returns:
+            dict: Copie des métadonnées, ou None si le fichier n'existe pas
+        
+        Raises:
+            ValueError: Si le fichier n'est pas un JSON valide
+        """
+        key = self._key(project_dir)
+        meta_path = self.path(project_dir)
+        pending = self.writer.pending(meta_path)
+        if pending is not None:
+            return copy.deepcopy(pending)
+        try:
+            stat = os.stat(meta_path)
+        except OSError:
+            self._discard(key)
+            return None
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(entry[2])
+        
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if time.time() - stat.st_mtime_ns / 1e9 >= RACY_DELAY:
+            self._store(key, stat, metadata)
+        else:
+            self._discard(key)
+        return copy.deepcopy(metadata)
+    
+    def put(self, project_dir, metadata):
+        """
+        Enregistrement des métadonnées d'un projet : cache mis à jour tout de
+        suite, fichier écrit par MetadataWriter
+        
+        Args:
+            project_dir (str): Dossier du projet
+            metadata (dict): Métadonnées (copiées, l'appelant peut continuer à les modifier)
+        """
+        key = self._key(project_dir)
+        snapshot = copy.deepcopy(metadata)
+        with self._lock:
+            # Date inconnue tant que le fichier n'est pas écrit
+            self._entries[key] = (None, None, snapshot)
+            self._entries.move_to_end(key)
+        self.writer.schedule(self.path(project_dir), snapshot,
+                             lambda stat: self._written(key, snapshot, stat))
+    
+    def _written(self, key, snapshot, stat):
+        """
+        Fin de l'écriture d'un contenu (thread de MetadataWriter)
+        
+        Args:
+            key (str): Clé du projet
+            snapshot (dict): Contenu écrit
+            stat (os.stat_result): État du fichier écrit, None si le contenu a été remplacé
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] is not snapshot or stat is None:
+                # Contenu plus récent en attente : sa propre écriture mettra l'entrée à jour
+                return
+            self._entries[key] = (stat.st_mtime_ns, stat.st_size, snapshot)
+    
+    def invalidate(self, project_dir=None):
+        """
+        Oubli d'un projet (ou de tous)
+        
+        Args:
+            project_dir (str): Dossier du projet (None : tout le cache)
+        """
+        if project_dir is None:
+            with self._lock:
+                self._entries.clear()
+        else:
+            self._discard(self._key(project_dir))
+    
+    def _store(self, key, stat, metadata):
+        """Mise en cache d'un contenu lu ou écrit"""
+        with self._lock:
+            self._entries[key] = (stat.st_mtime_ns, stat.st_size, metadata)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def _discard(self, key):
+        """Suppression d'une entrée"""
+        with self._lock:
+            self._entries.pop(key, None)
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index global des métadonnées locales (tags, notes, notation) de tous les projets
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from config.constants import DEFAULT_PREFS_DIR, DEFAULT_METADATA_INDEX_FILE
+from services.scan_index import RACY_DELAY
+from services.metadata_cache import MetadataCache
+
+@lru_cache(maxsize=1 << 17)
+def _project_key(project_dir):
+    """Clé d'un dossier de projet (chemin absolu normalisé, comme MetadataCache), mémorisée"""
+    return os.path.normcase(os.path.abspath(project_dir))
+
+class MetadataIndex:
+    """
+    Tags, notes et notation des metadata.json de tous les projets connus,
+    clé = dossier du projet
+    
+    L'index est alimenté par le scanner, qui voit passer chaque
+    metadata.json : un fichier dont la taille et la date n'ont pas changé
+    depuis le dernier scan n'est pas relu. Les enregistrements faits par
+    MetadataService le mettent à jour au fur et à mesure (update).
+    
+    L'index est gardé en mémoire (tag -> projets) et persisté en SQLite :
+    autocomplétion et comptage des tags ne parcourent ni les dossiers ni
+    les projets.
+    """
+    
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self, db_path=None, cache=None):
+        """
+        Initialisation de l'index
+        
+        Args:
+            db_path (str): Chemin de la base SQLite (défaut : ~/.trie_morceaux/metadata_index.sqlite)
+            cache (MetadataCache): Lecture des metadata.json (défaut : MetadataCache.default())
+        """
+        if db_path is None:
+            db_path = Path(os.path.expanduser(DEFAULT_PREFS_DIR)) / DEFAULT_METADATA_INDEX_FILE
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache = cache or MetadataCache.default()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        # Dossier -> (mtime, taille, note, notes, tags) ; mtime None : fichier à relire au prochain scan
+        self._entries = None
+        # Tag -> dossiers des projets qui le portent
+        self._tag_projects = {}
+        # Préfixes des racines synchronisées pendant cette session : un projet
+        # qui s'y trouve sans entrée n'a pas de metadata.json
+        self._synced_roots = set()
+        conn = self._connect()
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS projects (
+                    project_dir TEXT PRIMARY KEY,
+                    mtime REAL,
+                    size INTEGER,
+                    rating INTEGER NOT NULL,
+                    notes TEXT NOT NULL,
+                    tags TEXT NOT NULL
+                );
+            """)
+    
+    @classmethod
+    def default(cls):
+        """
+        Index partagé de l'application
+        
+        Returns:
+            MetadataIndex: Instance commune (créée à la demande)
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+    
+    def _connect(self):
+        """
+        Connexion SQLite du thread courant (créée à la demande)
+        
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _key(project_dir):
+        """Clé d'un dossier de projet (chemin absolu normalisé, comme MetadataCache)"""
+        return _project_key(project_dir)
+    
+    def _loaded(self):
+        """
+        Entrées en mémoire, chargées depuis la base au premier accès (appel sous verrou)
+        
+        Returns:
+            dict: Dossier -> entrée
+        """
+        if self._entries is None:
+            self._entries = {}
+            rows = self._connect().execute("SELECT project_dir, mtime, size, rating, notes, tags FROM projects")
+            for project_dir, mtime, size, rating, notes, tags in rows:
+                self._set(project_dir, (mtime, size, rating, notes, tuple(json.loads(tags))))
+        return self._entries
+    
+    def _set(self, key, entry):
+        """Remplacement de l'entrée d'un projet et des tags associés (appel sous verrou)"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            for tag in previous[4]:
+                projects = self._tag_projects[tag]
+                projects.discard(key)
+                if not projects:
+                    del self._tag_projects[tag]
+        if entry is not None:
+            self._entries[key] = entry
+            for tag in entry[4]:
+                self._tag_projects.setdefault(tag, set()).add(key)
+    
+    @staticmethod
+    def _entry(metadata, mtime=None, size=None):
+        """
+        Entrée d'index d'un contenu de metadata.json
+        
+        Args:
+            metadata (dict): Métadonnées du projet
+            mtime (float): Date de modification du fichier (secondes)
+            size (int): Taille du fichier
+        
+        Returns:
+            tuple: (mtime, taille, note, notes, tags)
+        """
+        tags = metadata.get('tags') or []
+        rating = metadata.get('rating') or 0
+        return (mtime, size, rating if isinstance(rating, int) else 0, str(metadata.get('notes') or ''),
+                tuple(dict.fromkeys(str(tag) for tag in tags)))
+    
+    def _persist(self, changes):
+        """
+        Écriture groupée d'entrées modifiées
+        
+        Args:
+            changes (list): Tuples (dossier, entrée ou None pour une suppression)
+        """
+        if not changes:
+            return
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.executemany("DELETE FROM projects WHERE project_dir = ?",
+                             [(key,) for key, entry in changes if entry is None])
+            conn.executemany(
+                "INSERT OR REPLACE INTO projects (project_dir, mtime, size, rating, notes, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, entry[0], entry[1], entry[2], entry[3], json.dumps(entry[4], ensure_ascii=False))
+                 for key, entry in changes if entry is not None])
+    
+    def update(self, project_dir, metadata):
+        """
+        Mise à jour d'un projet après enregistrement de ses métadonnées
+        
+        La date du fichier n'est pas encore connue (écriture différée) : le
+        fichier sera relu une fois au prochain scan.
+        
+        Args:
+            project_dir (str): Dossier du projet
+            metadata (dict): Métadonnées enregistrées
+        """
+        key = self._key(project_dir)
+        entry = self._entry(metadata)
+        with self._lock:
+            self._loaded()
+            self._set(key, entry)
+        self._persist([(key, entry)])
+    
+    def sync(self, root, found):
+        """
+        Synchronisation des projets d'une racine scannée
+        
+        Les metadata.json nouveaux ou modifiés sont relus, ceux qui ont
+        disparu de la racine sont retirés de l'index.
+        
+        Args:
+            root (str): Dossier racine scanné
+            found (dict): Dossier de projet -> (mtime en secondes, taille) de son metadata.json
+        """
+        wanted = {self._key(project_dir): (project_dir, mtime, size) for project_dir, (mtime, size) in found.items()}
+        with self._lock:
+            entries = self._loaded()
+            stale = [
+                (key, entries.get(key), project_dir, mtime, size)
+                for key, (project_dir, mtime, size) in wanted.items()
+                if key not in entries or entries[key][0] is None or entries[key][1] != size
+                or abs(entries[key][0] - mtime) >= 1e-6
+            ]
+            prefix = self._key(root).rstrip(os.sep) + os.sep
+            removed = [key for key in entries if key.startswith(prefix) and key not in wanted]
+        
+        # Lecture des fichiers hors verrou : les consultations ne sont pas bloquées
+        changes = [(key, None) for key in removed]
+        observed = {}
+        now = time.time()
+        for key, previous, project_dir, mtime, size in stale:
+            observed[key] = previous
+            try:
+                metadata = self.cache.get(project_dir) or {}
+            except Exception as e:
+                print(f"Erreur lors de l'indexation des métadonnées de {project_dir}: {e}")
+                metadata = {}
+            # Un fichier modifié à l'instant pourrait l'être encore sans changer de date
+            if now - mtime < RACY_DELAY:
+                mtime = size = None
+            changes.append((key, self._entry(metadata, mtime, size)))
+        
+        with self._lock:
+            # Un projet enregistré pendant la lecture garde sa version (plus récente)
+            changes = [(key, entry) for key, entry in changes
+                       if key not in observed or self._entries.get(key) is observed[key]]
+            for key, entry in changes:
+                self._set(key, entry)
+            self._synced_roots.add(prefix)
+        self._persist(changes)
+    
+    def all_tags(self):
+        """
+        Returns:
+            list: Tous les tags utilisés, triés
+        """
+        with self._lock:
+            self._loaded()
+            return sorted(self._tag_projects, key=str.lower)
+    
+    def tag_counts(self):
+        """
+        Returns:
+            dict: Tag -> nombre de projets qui le portent
+        """
+        with self._lock:
+            self._loaded()
+            return {tag: len(projects) for tag, projects in self._tag_projects.items()}
+    
+    def tag_count(self, tag):
+        """
+        Args:
+            tag (str): Tag
+        
+        Returns:
+            int: Nombre de projets qui portent ce tag
+        """
+        with self._lock:
+            self._loaded()
+            return len(self._tag_projects.get(tag, ()))
+    
+    def projects_with_tag(self, tag):
+        """
+        Args:
+            tag (str): Tag
+        
+        Returns:
+            set: Dossiers (normalisés) des projets qui portent ce tag
+        """
+        with self._lock:
+            self._loaded()
+            return set(self._tag_projects.get(tag, ()))
+    
+    def get(self, project_dir):
+        """
+        Métadonnées indexées d'un projet
+        
+        Args:
+            project_dir (str): Dossier du projet
+        
+        Returns:
+            dict: tags, rating, notes, ou None si le projet n'a pas de metadata.json connu
+        """
+        with self._lock:
+            entry = self._loaded().get(self._key(project_dir))
+        if entry is None:
+            return None
+        return {'tags': list(entry[4]), 'rating': entry[2], 'notes': entry[3]}
+    
+    def get_many(self, project_dirs):
+        """
+        Métadonnées indexées d'un ensemble de projets (lecture groupée)
+        
+        Args:
+            project_dirs (iterable): Dossiers des projets
+        
+        Returns:
+            dict: Dossier (tel que fourni) -> tags, rating, notes, pour les projets indexés
+        """
+        keys = [(project_dir, self._key(project_dir)) for project_dir in project_dirs
+                if isinstance(project_dir, str) and project_dir]
+        result = {}
+        with self._lock:
+            entries = self._loaded()
+            for project_dir, key in keys:
+                entry = entries.get(key)
+                if entry is not None:
+                    result[project_dir] = {'tags': list(entry[4]), 'rating': entry[2], 'notes': entry[3]}
+        return result
+    
+    def unknown(self, project_dirs):
+        """
+        Projets dont l'index ne peut rien dire : sans entrée et hors des
+        racines synchronisées pendant cette session (metadata.json pas
+        encore vu par un scan)
+        
+        Args:
+            project_dirs (iterable): Dossiers des projets
+        
+        Returns:
+            list: Dossiers (tels que fournis) à lire directement
+        """
+        with self._lock:
+            entries = self._loaded()
+            roots = tuple(self._synced_roots)
+            result = []
+            for project_dir in project_dirs:
+                if not isinstance(project_dir, str) or not project_dir:
+                    continue
+                key = self._key(project_dir)
+                if key not in entries and not key.startswith(roots):
+                    result.append(project_dir)
+        return result
+    
+    def clear(self):
+        """Vidage complet de l'index"""
+        with self._lock:
+            self._entries = {}
+            self._tag_projects = {}
+            self._synced_roots = set()
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM projects")
@@ -6,11 +6,15 @@ Service de gestion des métadonnées des projets (tags, notes, notation)
 """
 
 import os
+import copy
 import json
 from pathlib import Path
 from datetime import datetime
 
 from config.constants import DEFAULT_METADATA_FILE
+from services.metadata_cache import MetadataCache
+from services.metadata_writer import MetadataWriter
+from services.metadata_index import MetadataIndex
 
 class MetadataService:
     """
@@ -30,8 +34,14 @@ class MetadataService:
         self.metadata_dir = Path.home() / '.trie_morceaux' / 'metadata'
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
         self.metadata_file = self.metadata_dir / 'projects_metadata.json'
+        # Écritures différées et atomiques (partagées par toutes les instances)
+        self.writer = MetadataWriter.default()
         self.metadata = self._load_metadata() if self.mode == 'centralized' else None
         self.local_filename = DEFAULT_METADATA_FILE
+        # Cache partagé des metadata.json locaux (validé par la date du fichier)
+        self.local_cache = MetadataCache.default()
+        # Index global des tags, notes et notations des projets locaux
+        self.local_index = MetadataIndex.default()
     
     def _get_local_metadata_path(self, project_dir):
         """
@@ -49,38 +59,44 @@ class MetadataService:
         """
         Charge les métadonnées locales d'un projet (metadata.json)
         
+        Le fichier n'est relu que s'il a changé depuis la dernière lecture
+        (MetadataCache) ; un fichier absent n'est pas créé.
+        
         Args:
             project_dir (str): Chemin du dossier du projet
             
         Returns:
-            dict: Métadonnées du projet
+            dict: Métadonnées du projet (copie modifiable, vide si le fichier n'existe pas)
         """
-        meta_path = self._get_local_metadata_path(project_dir)
-        if meta_path.exists():
-            try:
-                with open(meta_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Erreur lors du chargement des métadonnées locales: {e}")
-                return {}
-        else:
+        try:
+            return self.local_cache.get(project_dir) or {}
+        except Exception as e:
+            print(f"Erreur lors du chargement des métadonnées locales: {e}")
             return {}
     
     def _save_local_metadata(self, project_dir, metadata):
         """
         Sauvegarde les métadonnées locales d'un projet (metadata.json)
         
+        Le cache et l'index global sont mis à jour tout de suite ; le
+        fichier est écrit en différé, de façon atomique (MetadataWriter).
+        Un dossier en lecture seule est refusé tout de suite ; les échecs
+        de l'écriture différée sont signalés aux fonctions enregistrées par
+        add_error_callback.
+        
         Args:
             project_dir (str): Chemin du dossier du projet
             metadata (dict): Métadonnées à sauvegarder
             
         Returns:
-            bool: Succès de l'opération
+            bool: Succès de l'opération (écriture acceptée)
         """
-        meta_path = self._get_local_metadata_path(project_dir)
+        if not os.access(project_dir, os.W_OK):
+            print(f"Erreur lors de la sauvegarde des métadonnées locales: dossier en lecture seule {project_dir}")
+            return False
         try:
-            with open(meta_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            self.local_cache.put(project_dir, metadata)
+            self.local_index.update(project_dir, metadata)
             return True
         except Exception as e:
             print(f"Erreur lors de la sauvegarde des métadonnées locales: {e}")
@@ -93,6 +109,10 @@ class MetadataService:
         Returns:
             dict: Métadonnées de tous les projets
         """
+        # Contenu enregistré par une autre instance mais pas encore écrit
+        pending = self.writer.pending(self.metadata_file)
+        if pending is not None:
+            return copy.deepcopy(pending)
         if self.metadata_file.exists():
             try:
                 with open(self.metadata_file, 'r', encoding='utf-8') as f:
@@ -107,17 +127,82 @@ class MetadataService:
         """
         Sauvegarde des métadonnées dans le fichier centralisé
         
+        L'écriture est différée et atomique (MetadataWriter) : plusieurs
+        modifications rapprochées ne réécrivent le fichier qu'une fois.
+        
         Returns:
             bool: Succès de l'opération
         """
         try:
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            # Copie de surface : les entrées sont remplacées, jamais modifiées sur place
+            self.writer.schedule(self.metadata_file, dict(self.metadata))
             return True
         except Exception as e:
             print(f"Erreur lors de la sauvegarde des métadonnées: {e}")
             return False
     
+    def flush(self):
+        """
+        Écriture immédiate des métadonnées en attente (fermeture de fenêtre)
+        
+        Returns:
+            bool: True si tout a été écrit
+        """
+        return self.writer.flush()
+    
+    def add_error_callback(self, callback):
+        """
+        Signalement des écritures différées qui échouent (le contenu est
+        gardé et l'écriture retentée)
+        
+        Args:
+            callback (callable): Fonction appelée, depuis le thread d'écriture, avec le
+                chemin du fichier et l'exception
+        """
+        self.writer.add_error_callback(callback)
+    
+    def remove_error_callback(self, callback):
+        """
+        Args:
+            callback (callable): Fonction enregistrée par add_error_callback
+        """
+        self.writer.remove_error_callback(callback)
+    
+    def _default_centralized_metadata(self):
+        """
+        Métadonnées d'un projet absent du fichier centralisé
+        
+        Returns:
+            dict: Valeurs par défaut
+        """
+        return {
+            'tags': [],
+            'rating': 0,
+            'notes': '',
+            'last_modified': datetime.now().isoformat()
+        }
+    
+    def _update_centralized(self, project_name, **fields):
+        """
+        Modification de champs d'un projet en mode centralisé
+        
+        L'entrée du projet est remplacée par une copie modifiée, jamais
+        modifiée sur place : l'instantané transmis à MetadataWriter (copie
+        de surface de self.metadata) reste cohérent pendant son écriture.
+        
+        Args:
+            project_name (str): Nom du projet
+            **fields: Champs à modifier
+            
+        Returns:
+            bool: Succès de l'opération
+        """
+        entry = copy.deepcopy(self.metadata.get(project_name)) or self._default_centralized_metadata()
+        entry.update(fields)
+        entry['last_modified'] = datetime.now().isoformat()
+        self.metadata[project_name] = entry
+        return self._save_metadata()
+    
     def get_project_metadata(self, project_name, project_dir=None):
         """
         Récupération des métadonnées d'un projet
@@ -131,14 +216,9 @@ class MetadataService:
         """
         if self.mode == 'centralized':
             if project_name not in self.metadata:
-                self.metadata[project_name] = {
-                    'tags': [],
-                    'rating': 0,
-                    'notes': '',
-                    'last_modified': datetime.now().isoformat()
-                }
-                self._save_metadata()
-            return self.metadata[project_name]
+                # Projet inconnu : valeurs par défaut, rien n'est enregistré
+                return self._default_centralized_metadata()
+            return copy.deepcopy(self.metadata[project_name])
         else:
             # En mode local, on a besoin du chemin du dossier
             if not project_dir:
@@ -171,6 +251,7 @@ class MetadataService:
             
             metadata = self._load_local_metadata(project_dir)
             if not metadata:
+                # Pas de metadata.json : valeurs par défaut, le fichier n'est créé qu'à la première modification
                 metadata = {
                     "name": project_name,
                     "styles": [],
@@ -181,7 +262,6 @@ class MetadataService:
                     "notes": "",
                     "last_modified": datetime.now().isoformat()
                 }
-                self._save_local_metadata(project_dir, metadata)
             return metadata
     
     def set_project_metadata(self, project_name, metadata, project_dir=None):
@@ -200,7 +280,7 @@ class MetadataService:
         metadata['last_modified'] = datetime.now().isoformat()
         
         if self.mode == 'centralized':
-            self.metadata[project_name] = metadata
+            self.metadata[project_name] = copy.deepcopy(metadata)
             return self._save_metadata()
         else:
             if not project_dir:
@@ -227,16 +307,7 @@ class MetadataService:
             bool: Succès de l'opération
         """
         if self.mode == 'centralized':
-            if project_name not in self.metadata:
-                self.metadata[project_name] = {
-                    'tags': [],
-                    'rating': 0,
-                    'notes': '',
-                    'last_modified': datetime.now().isoformat()
-                }
-            self.metadata[project_name]['tags'] = tags
-            self.metadata[project_name]['last_modified'] = datetime.now().isoformat()
-            return self._save_metadata()
+            return self._update_centralized(project_name, tags=list(tags))
         else:
             if not project_dir:
                 raise ValueError("project_dir est requis en mode local")
@@ -262,16 +333,7 @@ class MetadataService:
             return False
         
         if self.mode == 'centralized':
-            if project_name not in self.metadata:
-                self.metadata[project_name] = {
-                    'tags': [],
-                    'rating': 0,
-                    'notes': '',
-                    'last_modified': datetime.now().isoformat()
-                }
-            self.metadata[project_name]['rating'] = rating
-            self.metadata[project_name]['last_modified'] = datetime.now().isoformat()
-            return self._save_metadata()
+            return self._update_centralized(project_name, rating=rating)
         else:
             if not project_dir:
                 raise ValueError("project_dir est requis en mode local")
@@ -293,16 +355,7 @@ class MetadataService:
             bool: Succès de l'opération
         """
         if self.mode == 'centralized':
-            if project_name not in self.metadata:
-                self.metadata[project_name] = {
-                    'tags': [],
-                    'rating': 0,
-                    'notes': '',
-                    'last_modified': datetime.now().isoformat()
-                }
-            self.metadata[project_name]['notes'] = notes
-            self.metadata[project_name]['last_modified'] = datetime.now().isoformat()
-            return self._save_metadata()
+            return self._update_centralized(project_name, notes=notes)
         else:
             if not project_dir:
                 raise ValueError("project_dir est requis en mode local")
@@ -324,13 +377,26 @@ class MetadataService:
             for project_name, metadata in self.metadata.items():
                 all_tags.update(metadata.get('tags', []))
         else:
-            # En mode local, on ne peut pas facilement récupérer tous les tags
-            # sans parcourir tous les dossiers de projets
-            # Cette fonctionnalité pourrait être implémentée ultérieurement
-            pass
+            # Index global alimenté par les scans et les enregistrements
+            return self.local_index.all_tags()
         
         return sorted(list(all_tags))
     
+    def get_tag_counts(self):
+        """
+        Nombre de projets par tag
+        
+        Returns:
+            dict: Tag -> nombre de projets qui le portent
+        """
+        if self.mode == 'centralized':
+            counts = {}
+            for metadata in self.metadata.values():
+                for tag in metadata.get('tags', []):
+                    counts[tag] = counts.get(tag, 0) + 1
+            return counts
+        return self.local_index.tag_counts()
+    
     def add_tag_to_project(self, project_name, tag, project_dir=None):
         """
         Ajout d'un tag à un projet
@@ -344,11 +410,9 @@ class MetadataService:
             bool: Succès de l'opération
         """
         if self.mode == 'centralized':
-            metadata = self.get_project_metadata(project_name)
-            if tag not in metadata['tags']:
-                metadata['tags'].append(tag)
-                metadata['last_modified'] = datetime.now().isoformat()
-                return self._save_metadata()
+            tags = self.metadata.get(project_name, {}).get('tags', [])
+            if tag not in tags:
+                return self._update_centralized(project_name, tags=tags + [tag])
             return True
         else:
             if not project_dir:
@@ -373,11 +437,9 @@ class MetadataService:
             bool: Succès de l'opération
         """
         if self.mode == 'centralized':
-            metadata = self.get_project_metadata(project_name)
-            if tag in metadata['tags']:
-                metadata['tags'].remove(tag)
-                metadata['last_modified'] = datetime.now().isoformat()
-                return self._save_metadata()
+            tags = self.metadata.get(project_name, {}).get('tags', [])
+            if tag in tags:
+                return self._update_centralized(project_name, tags=[t for t in tags if t != tag])
             return True
         else:
             if not project_dir:
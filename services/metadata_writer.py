@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Écriture différée et atomique des fichiers de métadonnées
+"""
+
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+
+# Délai de regroupement des modifications d'un même fichier (secondes)
+WRITE_DELAY = 0.5
+
+# Délai avant de retenter une écriture qui a échoué, doublé à chaque échec (secondes)
+RETRY_DELAY = 5.0
+MAX_RETRY_DELAY = 60.0
+
+# Droits d'un fichier de métadonnées créé
+NEW_FILE_MODE = 0o644
+
+def atomic_write_json(path, data):
+    """
+    Écriture atomique d'un fichier JSON : fichier temporaire dans le même
+    dossier, puis remplacement (os.replace)
+    
+    Un lecteur voit toujours l'ancien ou le nouveau contenu complet, jamais
+    un fichier tronqué, même si l'application s'arrête pendant l'écriture.
+    
+    Args:
+        path (str): Chemin du fichier
+        data (dict): Contenu
+    
+    Returns:
+        os.stat_result: État du fichier écrit
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = NEW_FILE_MODE
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return os.stat(path)
+
+class MetadataWriter:
+    """
+    File d'écriture des fichiers de métadonnées (metadata.json locaux et
+    fichier centralisé)
+    
+    Les modifications d'un même fichier faites pendant WRITE_DELAY
+    secondes sont regroupées : seul le dernier contenu est écrit, par un
+    thread d'arrière-plan, avec atomic_write_json. flush() écrit tout de
+    suite ce qui reste en attente (fermeture d'une fenêtre, fin du
+    programme).
+    
+    Une écriture qui échoue n'est pas perdue : le contenu reste en file
+    (pending le renvoie toujours) et l'écriture est retentée après
+    RETRY_DELAY secondes, délai doublé à chaque échec, jusqu'à ce qu'elle
+    réussisse ou qu'un contenu plus récent la remplace. Chaque échec est
+    signalé aux fonctions enregistrées par add_error_callback.
+    
+    Le contenu transmis à schedule appartient ensuite à l'écrivain :
+    l'appelant ne doit plus le modifier (il transmet une copie).
+    """
+    
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self, delay=WRITE_DELAY):
+        """
+        Initialisation de l'écrivain
+        
+        Args:
+            delay (float): Délai de regroupement en secondes
+        """
+        self.delay = delay
+        self._condition = threading.Condition()
+        # Chemin -> [échéance, contenu, fonctions de rappel, nombre d'échecs]
+        self._pending = {}
+        # Chemin -> contenu en cours d'écriture
+        self._writing = {}
+        self._io_lock = threading.Lock()
+        self._thread = None
+        self._error_callbacks = []
+    
+    @classmethod
+    def default(cls):
+        """
+        Écrivain partagé de l'application, vidé à la fin du programme
+        
+        Returns:
+            MetadataWriter: Instance commune (créée à la demande)
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.flush)
+            return cls._default
+    
+    def schedule(self, path, data, callback=None):
+        """
+        Écriture différée d'un fichier
+        
+        Args:
+            path (str): Chemin du fichier
+            data (dict): Contenu complet (remplace un contenu encore en attente)
+            callback (callable): Fonction appelée après l'écriture avec l'état du
+                fichier (os.stat_result), ou None si le contenu a été remplacé par
+                un plus récent avant d'avoir pu être écrit
+        """
+        path = str(path)
+        with self._condition:
+            entry = self._pending.get(path)
+            if entry is None:
+                entry = self._pending[path] = [time.monotonic() + self.delay, data, [], 0]
+            else:
+                entry[1] = data
+                entry[3] = 0
+            if callback:
+                entry[2].append(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metadata-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+    
+    def pending(self, path):
+        """
+        Contenu pas encore écrit sur le disque pour un fichier
+        
+        Args:
+            path (str): Chemin du fichier
+        
+        Returns:
+            dict: Dernier contenu en attente ou en cours d'écriture, ou None
+        """
+        path = str(path)
+        with self._condition:
+            if path in self._pending:
+                return self._pending[path][1]
+            return self._writing.get(path)
+    
+    def add_error_callback(self, callback):
+        """
+        Signalement des écritures qui échouent
+        
+        Args:
+            callback (callable): Fonction appelée (thread d'écriture, ou appelant de
+                flush) avec le chemin du fichier et l'exception
+        """
+        with self._condition:
+            self._error_callbacks.append(callback)
+    
+    def remove_error_callback(self, callback):
+        """
+        Retrait d'une fonction enregistrée par add_error_callback
+        
+        Args:
+            callback (callable): Fonction à retirer
+        """
+        with self._condition:
+            if callback in self._error_callbacks:
+                self._error_callbacks.remove(callback)
+    
+    def flush(self):
+        """
+        Écriture immédiate de toutes les modifications en attente (bloquant)
+        
+        Returns:
+            bool: True si tout a été écrit ; False si une écriture a échoué
+                (le contenu reste en file, voir add_error_callback)
+        """
+        return not self._write_due(None)
+    
+    def _run(self):
+        """Boucle du thread d'écriture : attente de la prochaine échéance"""
+        while True:
+            with self._condition:
+                while True:
+                    if not self._pending:
+                        self._condition.wait()
+                        continue
+                    delay = min(entry[0] for entry in self._pending.values()) - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+            self._write_due(time.monotonic())
+    
+    def _write_due(self, now):
+        """
+        Écriture des fichiers arrivés à échéance
+        
+        Le verrou d'écriture est pris avant de retirer les fichiers de la
+        file : une version plus ancienne ne peut pas être écrite après une
+        plus récente (flush pendant une écriture d'arrière-plan).
+        
+        Un fichier dont l'écriture échoue est remis en file (sauf si un
+        contenu plus récent l'y attend déjà) et sera retenté plus tard.
+        
+        Args:
+            now (float): Instant de référence (time.monotonic), None pour tout écrire
+        
+        Returns:
+            list: Chemins des fichiers dont l'écriture a échoué
+        """
+        failed = []
+        with self._io_lock:
+            with self._condition:
+                due = [path for path, entry in self._pending.items() if now is None or entry[0] <= now]
+                items = [(path, self._pending.pop(path)) for path in due]
+                for path, entry in items:
+                    self._writing[path] = entry[1]
+            for path, entry in items:
+                _, data, callbacks, failures = entry
+                try:
+                    stat = atomic_write_json(path, data)
+                    error = None
+                except Exception as e:
+                    print(f"Erreur lors de l'écriture des métadonnées {path}: {e}")
+                    stat, error = None, e
+                    failed.append(path)
+                with self._condition:
+                    del self._writing[path]
+                    superseded = path in self._pending
+                    if error is not None and not superseded:
+                        # Contenu gardé en file : nouvel essai, avec les mêmes fonctions de rappel
+                        retry = min(RETRY_DELAY * 2 ** failures, MAX_RETRY_DELAY)
+                        self._pending[path] = [time.monotonic() + retry, data, callbacks, failures + 1]
+                        self._condition.notify()
+                    error_callbacks = list(self._error_callbacks) if error is not None else []
+                for callback in error_callbacks:
+                    callback(path, error)
+                if error is None or superseded:
+                    for callback in callbacks:
+                        callback(stat)
+        return failed
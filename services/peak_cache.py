@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fichiers de crêtes des formes d'onde : enveloppes min/max/RMS des fichiers
+audio à plusieurs résolutions, gardées sur disque
+"""
+
+import os
+import json
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from config.constants import DEFAULT_PREFS_DIR, DEFAULT_PEAKS_DIR
+from services.scan_index import RACY_DELAY
+from services.wav_reader import WavReader
+
+# Version du format des fichiers de crêtes : à incrémenter quand le calcul change
+PEAK_VERSION = 1
+
+# Échantillons (par canal) résumés par une crête au niveau le plus fin
+PEAK_BASE = 256
+
+# Rapport entre deux niveaux successifs
+PEAK_FACTOR = 4
+
+# Les niveaux plus grossiers s'arrêtent dès qu'un niveau a au plus ce nombre de crêtes
+MIN_LEVEL_PEAKS = 2048
+
+# Intervalle minimal entre deux transmissions de crêtes partielles pendant un calcul (secondes)
+PARTIAL_INTERVAL = 0.1
+
+# Taille maximale du dossier des fichiers de crêtes (les moins récemment utilisés sont supprimés)
+MAX_BYTES = 1024 * 1024 * 1024
+
+# En-tête d'un fichier de crêtes : signature puis longueur de l'en-tête JSON
+MAGIC = b"TMPK"
+HEADER = struct.Struct("<4sI")
+
+# Alignement du début des données après l'en-tête JSON
+ALIGN = 16
+
+def _data_start(header_len):
+    """Position des niveaux dans un fichier de crêtes (après l'en-tête, alignée)"""
+    return -(-(HEADER.size + header_len) // ALIGN) * ALIGN
+
+def _to_float(samples):
+    """
+    Conversion d'échantillons entiers ou flottants en float32 dans [-1, 1]
+    
+    Args:
+        samples (ndarray): Échantillons (images x canaux)
+    
+    Returns:
+        ndarray: Échantillons float32
+    """
+    if samples.dtype == np.uint8:
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    if np.issubdtype(samples.dtype, np.integer):
+        return samples.astype(np.float32) / float(2 ** (8 * samples.dtype.itemsize - 1))
+    return samples.astype(np.float32, copy=False)
+
+def _reduce(level, factor):
+    """
+    Niveau plus grossier : regroupement de factor crêtes consécutives
+    
+    Args:
+        level (ndarray): Crêtes (n x 3 : min, max, rms)
+        factor (int): Crêtes regroupées
+    
+    Returns:
+        ndarray: Crêtes du niveau suivant
+    """
+    starts = np.arange(0, len(level), factor)
+    counts = np.diff(np.append(starts, len(level)))
+    result = np.empty((len(starts), 3), dtype=np.float32)
+    result[:, 0] = np.minimum.reduceat(level[:, 0], starts)
+    result[:, 1] = np.maximum.reduceat(level[:, 1], starts)
+    result[:, 2] = np.sqrt(np.add.reduceat(level[:, 2] ** 2, starts) / counts)
+    return result
+
+class PeakBuilder:
+    """
+    Calcul incrémental des crêtes d'un fichier audio, bloc par bloc
+    
+    Chaque bloc d'échantillons est résumé au niveau le plus fin (une crête
+    = min, max et RMS de PEAK_BASE images, tous canaux confondus) puis
+    libéré : la mémoire utilisée ne dépend que de la taille d'un bloc et
+    du nombre de crêtes. Les niveaux plus grossiers sont déduits du niveau
+    le plus fin à la fin (peaks).
+    """
+    
+    def __init__(self, sample_rate, channels, frames=0):
+        """
+        Args:
+            sample_rate (int): Fréquence d'échantillonnage
+            channels (int): Nombre de canaux
+            frames (int): Nombre d'images attendu (réserve les crêtes à l'avance)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self._count = 0
+        self._level = np.empty((max(1, -(-frames // PEAK_BASE)), 3), dtype=np.float32)
+    
+    def add(self, samples):
+        """
+        Ajout d'un bloc d'échantillons
+        
+        Tous les blocs sauf le dernier doivent avoir un nombre d'images
+        multiple de PEAK_BASE.
+        
+        Args:
+            samples (ndarray): Échantillons (images x canaux, ou images pour un fichier mono)
+        """
+        if not len(samples):
+            return
+        samples = _to_float(samples.reshape(len(samples), -1))
+        self.frames += len(samples)
+        full = len(samples) // PEAK_BASE * PEAK_BASE
+        for part in (samples[:full], samples[full:]):
+            if not len(part):
+                continue
+            rows = part.reshape(-1, min(len(part), PEAK_BASE) * self.channels)
+            end = self._count + len(rows)
+            if end > len(self._level):
+                self._level = np.resize(self._level, (max(end, 2 * len(self._level)), 3))
+            peaks = self._level[self._count:end]
+            rows.min(axis=1, out=peaks[:, 0])
+            rows.max(axis=1, out=peaks[:, 1])
+            peaks[:, 2] = np.sqrt(np.einsum('ij,ij->i', rows, rows) / rows.shape[1])
+            self._count = end
+    
+    def partial(self):
+        """
+        Crêtes des blocs déjà ajoutés, au niveau le plus fin seulement
+        (affichage progressif ; les crêtes déjà calculées ne changent plus)
+        
+        Returns:
+            Peaks: Crêtes partielles
+        """
+        return Peaks(self.sample_rate, self.frames, self.channels, [(PEAK_BASE, self._level[:self._count])])
+    
+    def peaks(self):
+        """
+        Returns:
+            Peaks: Crêtes de tous les blocs ajoutés, à toutes les résolutions
+        """
+        level = self._level[:self._count].copy()
+        levels = [(PEAK_BASE, level)]
+        while len(level) > MIN_LEVEL_PEAKS:
+            level = _reduce(level, PEAK_FACTOR)
+            levels.append((levels[-1][0] * PEAK_FACTOR, level))
+        return Peaks(self.sample_rate, self.frames, self.channels, levels)
+
+class Peaks:
+    """
+    Enveloppes d'un fichier audio à plusieurs résolutions
+    
+    Chaque niveau est un tableau n x 3 (min, max, RMS) dont une crête
+    résume samples_per_peak images ; le premier niveau est le plus fin.
+    """
+    
+    def __init__(self, sample_rate, frames, channels, levels):
+        """
+        Args:
+            sample_rate (int): Fréquence d'échantillonnage
+            frames (int): Nombre d'images (échantillons par canal)
+            channels (int): Nombre de canaux
+            levels (list): Tuples (images par crête, tableau n x 3), du plus fin au plus grossier
+        """
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.channels = channels
+        self.levels = levels
+    
+    @property
+    def duration(self):
+        """Durée en secondes"""
+        return self.frames / self.sample_rate if self.sample_rate else 0
+    
+    def amplitude(self):
+        """
+        Returns:
+            float: Amplitude crête du fichier (niveau le plus grossier), 0 pour un fichier vide ou muet
+        """
+        level = self.levels[-1][1]
+        if not len(level):
+            return 0.0
+        return float(max(-level[:, 0].min(), level[:, 1].max(), 0.0))
+    
+    def window(self, start, end, n_points):
+        """
+        Enveloppe d'un intervalle d'images, au niveau adapté au nombre de points
+        
+        Le niveau le plus grossier dont une crête ne dépasse pas la largeur
+        d'un point est lu, sur l'intervalle seulement ; ses crêtes sont
+        regroupées par point (min des min, max des max, RMS quadratique).
+        
+        Args:
+            start (int): Première image
+            end (int): Image de fin (exclue)
+            n_points (int): Nombre de points voulus
+        
+        Returns:
+            tuple: Tableaux (min, max, rms) de n_points valeurs, vides si l'intervalle est vide
+        """
+        start, end = max(0, int(start)), min(self.frames, int(end))
+        if end <= start or n_points <= 0 or not len(self.levels[0][1]):
+            empty = np.zeros(0, dtype=np.float32)
+            return empty, empty, empty
+        frames_per_point = (end - start) / n_points
+        samples_per_peak, level = self.levels[0]
+        for candidate in self.levels[1:]:
+            if candidate[0] > frames_per_point:
+                break
+            samples_per_peak, level = candidate
+        
+        first = start // samples_per_peak
+        stop = min(len(level), -(-end // samples_per_peak))
+        edges = np.linspace(start / samples_per_peak, end / samples_per_peak, n_points + 1)
+        starts = np.clip(edges[:-1].astype(np.int64), first, stop - 1) - first
+        part = level[first:stop]
+        # Points plus fins qu'une crête : reduceat renvoie la crête qui contient le point
+        counts = np.maximum(np.diff(np.append(starts, len(part))), 1)
+        mins = np.minimum.reduceat(part[:, 0], starts)
+        maxs = np.maximum.reduceat(part[:, 1], starts)
+        rms = np.sqrt(np.add.reduceat(part[:, 2] ** 2, starts) / counts)
+        return mins, maxs, rms.astype(np.float32)
+
+def _bin_frames(samples, start, end, n_points):
+    """
+    Enveloppe d'échantillons lus directement, regroupés par point
+    
+    Args:
+        samples (ndarray): Échantillons float32 (images x canaux) de l'intervalle
+        start (int): Première image de l'intervalle
+        end (int): Image de fin (exclue)
+        n_points (int): Nombre de points voulus
+    
+    Returns:
+        tuple: Tableaux (min, max, rms) de n_points valeurs
+    """
+    # Tous canaux confondus, comme les crêtes (canal par canal : peu de canaux, beaucoup d'images)
+    lows = samples[:, 0].copy()
+    highs = samples[:, 0].copy()
+    for channel in range(1, samples.shape[1]):
+        np.minimum(lows, samples[:, channel], out=lows)
+        np.maximum(highs, samples[:, channel], out=highs)
+    squares = np.einsum('ij,ij->i', samples, samples) / samples.shape[1]
+    edges = np.linspace(0, end - start, n_points + 1)[:-1]
+    starts = np.clip(edges.astype(np.int64), 0, len(samples) - 1)
+    # Points plus fins qu'une image : reduceat renvoie l'image qui contient le point
+    counts = np.maximum(np.diff(np.append(starts, len(samples))), 1)
+    return (np.minimum.reduceat(lows, starts), np.maximum.reduceat(highs, starts),
+            np.sqrt(np.add.reduceat(squares, starts) / counts).astype(np.float32))
+
+class EnvelopeStore:
+    """
+    Enveloppe d'un fichier audio à tous les niveaux de zoom
+    
+    Tant qu'un point couvre au moins une crête du niveau le plus fin,
+    l'enveloppe vient des crêtes (fichier de crêtes, sans lire l'audio).
+    Aux zooms plus forts, les quelques échantillons visibles sont lus
+    directement dans le fichier WAV (au plus PEAK_BASE images par point).
+    """
+    
+    def __init__(self, path, peaks):
+        """
+        Args:
+            path (str): Chemin du fichier WAV
+            peaks (Peaks): Crêtes complètes du fichier
+        """
+        self.path = path
+        self.peaks = peaks
+        self.frames = peaks.frames
+        self.sample_rate = peaks.sample_rate
+        self._reader = None
+    
+    def amplitude(self):
+        """
+        Returns:
+            float: Amplitude crête du fichier
+        """
+        return self.peaks.amplitude()
+    
+    def window(self, start, end, n_points):
+        """
+        Enveloppe d'un intervalle d'images (voir Peaks.window)
+        
+        Args:
+            start (int): Première image
+            end (int): Image de fin (exclue)
+            n_points (int): Nombre de points voulus
+        
+        Returns:
+            tuple: Tableaux (min, max, rms) de n_points valeurs
+        """
+        start, end = max(0, int(start)), min(self.frames, int(end))
+        if end <= start or n_points <= 0 or (end - start) / n_points >= PEAK_BASE:
+            return self.peaks.window(start, end, n_points)
+        try:
+            if self._reader is None:
+                self._reader = WavReader(self.path)
+            samples = _to_float(self._reader.read(start, end - start))
+        except (OSError, ValueError) as e:
+            print(f"Erreur lors de la lecture des échantillons de {self.path}: {e}")
+            samples = None
+        if samples is None or not len(samples):
+            # Fichier modifié ou disparu depuis le calcul des crêtes : crêtes seules
+            return self.peaks.window(start, end, n_points)
+        return _bin_frames(samples, start, start + len(samples), n_points)
+    
+    def close(self):
+        """Fermeture du fichier audio (rouvert à la demande)"""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+class PeakComputation:
+    """
+    Calcul des crêtes d'un fichier WAV pas à pas, un bloc lu par étape
+    
+    Le fichier est lu par blocs de taille fixe (WavReader) : la mémoire
+    utilisée est bornée par la taille d'un bloc, quelle que soit la durée
+    du fichier. Entre deux étapes, partial() donne les crêtes déjà
+    calculées (affichage progressif).
+    """
+    
+    def __init__(self, path, block_frames=None):
+        """
+        Ouverture du fichier
+        
+        Args:
+            path (str): Chemin du fichier WAV
+            block_frames (int): Images lues par étape (défaut : wav_reader.BLOCK_BYTES octets)
+        
+        Raises:
+            OSError, ValueError: Si le fichier n'est pas un WAV lisible
+        """
+        self.path = path
+        self.stat = os.stat(path)
+        self._reader = WavReader(path)
+        self.frames = self._reader.frames
+        self.sample_rate = self._reader.sample_rate
+        self._builder = PeakBuilder(self.sample_rate, self._reader.channels, self.frames)
+        self._blocks = self._reader.blocks(block_frames, PEAK_BASE)
+        self.done = False
+    
+    @property
+    def duration(self):
+        """Durée du fichier en secondes"""
+        return self._reader.duration
+    
+    @property
+    def progress(self):
+        """Part du fichier déjà lue (0 à 1)"""
+        return self._builder.frames / self.frames if self.frames else 1.0
+    
+    def step(self):
+        """
+        Lecture et résumé du bloc suivant
+        
+        Returns:
+            bool: True s'il reste des blocs à lire
+        """
+        if self.done:
+            return False
+        block = next(self._blocks, None)
+        if block is None or not len(block):
+            self.close()
+            return False
+        self._builder.add(block)
+        return True
+    
+    def partial(self):
+        """
+        Returns:
+            Peaks: Crêtes des blocs déjà lus (niveau le plus fin)
+        """
+        return self._builder.partial()
+    
+    def result(self):
+        """
+        Returns:
+            Peaks: Crêtes complètes, à toutes les résolutions (après la dernière étape)
+        """
+        return self._builder.peaks()
+    
+    def close(self):
+        """Fin du calcul (fermeture du fichier)"""
+        self.done = True
+        self._reader.close()
+
+def compute_peaks(path, block_frames=None):
+    """
+    Calcul des crêtes d'un fichier WAV en un seul passage, par blocs
+    
+    Args:
+        path (str): Chemin du fichier WAV
+        block_frames (int): Images lues à la fois
+    
+    Returns:
+        Peaks: Crêtes du fichier
+    
+    Raises:
+        OSError, ValueError: Si le fichier n'est pas un WAV lisible
+    """
+    computation = PeakComputation(path, block_frames)
+    try:
+        while computation.step():
+            pass
+    finally:
+        computation.close()
+    return computation.result()
+
+class PeakCache:
+    """
+    Fichiers de crêtes, clé = (chemin du fichier audio, taille, mtime)
+    
+    Un fichier audio non modifié depuis le calcul de ses crêtes est
+    affiché depuis son fichier de crêtes, sans relire l'audio. Les
+    fichiers de crêtes sont rangés dans ~/.trie_morceaux/peaks, à côté des
+    index ; au-delà de max_bytes, les moins récemment utilisés sont
+    supprimés.
+    
+    Format d'un fichier : signature, longueur et en-tête JSON (fichier
+    source, taille, mtime, fréquence, niveaux et leur position après
+    l'en-tête), puis les niveaux en float32, du plus fin au plus grossier.
+    """
+    
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self, cache_dir=None, max_bytes=MAX_BYTES):
+        """
+        Initialisation du cache
+        
+        Args:
+            cache_dir (str): Dossier des fichiers de crêtes (défaut : ~/.trie_morceaux/peaks)
+            max_bytes (int): Taille maximale du dossier
+        """
+        if cache_dir is None:
+            cache_dir = Path(os.path.expanduser(DEFAULT_PREFS_DIR)) / DEFAULT_PEAKS_DIR
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._prune_lock = threading.Lock()
+    
+    @classmethod
+    def default(cls):
+        """
+        Cache partagé de l'application
+        
+        Returns:
+            PeakCache: Instance commune (créée à la demande)
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+    
+    def peak_path(self, path):
+        """
+        Args:
+            path (str): Chemin du fichier audio
+        
+        Returns:
+            Path: Chemin de son fichier de crêtes
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        return self.cache_dir / (hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest() + ".peaks")
+    
+    def get(self, path):
+        """
+        Crêtes d'un fichier audio, si son fichier de crêtes est à jour
+        
+        Args:
+            path (str): Chemin du fichier audio
+        
+        Returns:
+            Peaks: Crêtes, ou None si elles sont absentes ou périmées
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        peak_path = self.peak_path(path)
+        try:
+            with open(peak_path, 'rb') as f:
+                magic, header_len = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC:
+                    return None
+                header = json.loads(f.read(header_len).decode('utf-8'))
+                start = _data_start(header_len)
+                if (header.get('version') != PEAK_VERSION or header.get('size') != stat.st_size
+                        or header.get('mtime_ns') != stat.st_mtime_ns):
+                    return None
+                levels = []
+                for samples_per_peak, count, offset in header['levels']:
+                    f.seek(start + offset)
+                    level = np.fromfile(f, dtype='<f4', count=count * 3)
+                    if len(level) != count * 3:
+                        return None
+                    levels.append((samples_per_peak, level.reshape(count, 3)))
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        # Date d'utilisation : les fichiers de crêtes les plus anciens sont supprimés en premier
+        try:
+            os.utime(peak_path)
+        except OSError:
+            pass
+        return Peaks(header['sample_rate'], header['frames'], header['channels'], levels)
+    
+    def load(self, path, cancel_token=None, partial_callback=None):
+        """
+        Crêtes d'un fichier audio : fichier de crêtes s'il est à jour, sinon
+        calcul puis enregistrement
+        
+        Args:
+            path (str): Chemin du fichier audio
+            cancel_token (CancellationToken): Jeton consulté entre deux blocs
+            partial_callback (callable): Fonction appelée pendant le calcul, au plus toutes
+                les PARTIAL_INTERVAL secondes, avec (crêtes partielles, nombre d'images du fichier)
+        
+        Returns:
+            Peaks: Crêtes du fichier
+        
+        Raises:
+            OSError, ValueError: Si le fichier audio ne peut pas être lu
+            AnalysisCancelled: Si le calcul a été annulé
+        """
+        peaks = self.get(path)
+        if peaks is not None:
+            return peaks
+        computation = PeakComputation(path)
+        try:
+            if partial_callback:
+                partial_callback(computation.partial(), computation.frames)
+            last_partial = time.monotonic()
+            while computation.step():
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                if partial_callback and time.monotonic() - last_partial >= PARTIAL_INTERVAL:
+                    partial_callback(computation.partial(), computation.frames)
+                    last_partial = time.monotonic()
+        finally:
+            computation.close()
+        peaks = computation.result()
+        self.store(path, computation.stat, peaks)
+        return peaks
+    
+    def store(self, path, stat, peaks):
+        """
+        Enregistrement des crêtes d'un fichier audio (écriture atomique)
+        
+        Rien n'est enregistré si le fichier a changé pendant le calcul ou
+        vient d'être modifié (il pourrait l'être encore sans changer de date).
+        
+        Args:
+            path (str): Chemin du fichier audio
+            stat (os.stat_result): État du fichier avant le calcul
+            peaks (Peaks): Crêtes calculées
+        """
+        try:
+            after = os.stat(path)
+        except OSError:
+            return
+        if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return
+        if time.time() - stat.st_mtime_ns / 1e9 < RACY_DELAY:
+            return
+        
+        levels = []
+        offset = 0
+        for samples_per_peak, level in peaks.levels:
+            levels.append([samples_per_peak, len(level), offset])
+            offset += level.nbytes
+        header = {
+            'version': PEAK_VERSION,
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sample_rate': peaks.sample_rate,
+            'frames': peaks.frames,
+            'channels': peaks.channels,
+            'levels': levels
+        }
+        encoded = json.dumps(header).encode('utf-8')
+        start = _data_start(len(encoded))
+        peak_path = self.peak_path(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, len(encoded)))
+                f.write(encoded)
+                f.write(b"\0" * (start - HEADER.size - len(encoded)))
+                for _, level in peaks.levels:
+                    f.write(np.ascontiguousarray(level, dtype='<f4').tobytes())
+            os.replace(tmp_path, peak_path)
+        except OSError as e:
+            print(f"Erreur lors de l'enregistrement des crêtes de {path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            return
+        self._prune()
+    
+    def _prune(self):
+        """Suppression des fichiers de crêtes les moins récemment utilisés au-delà de max_bytes"""
+        with self._prune_lock:
+            files = []
+            total = 0
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".peaks"):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+                        total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, file_path in sorted(files):
+                try:
+                    os.unlink(file_path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+    
+    def clear(self):
+        """Suppression de tous les fichiers de crêtes"""
+        with self._prune_lock:
+            for file_path in self.cache_dir.glob("*.peaks"):
+                try:
+                    file_path.unlink()
+                except OSError:
+                    pass
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inventaire des plugins de toute une archive (analyse VSTi en parallèle)
+"""
+
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from services.lectureCPR import detecte_vsti
+from services.vsti_manager import load_vsti_list
+
+# Liste des VSTi connus dans chaque processus d'analyse
+_worker_vsti_list = None
+
+def _init_worker(vsti_list):
+    """
+    Initialisation d'un processus d'analyse
+    
+    Args:
+        vsti_list (list): Liste des VSTi connus (transmise une fois par processus)
+    """
+    global _worker_vsti_list
+    _worker_vsti_list = vsti_list
+
+def _analyse_project(task):
+    """
+    Analyse du CPR d'un projet dans un processus de travail
+    
+    Args:
+        task (tuple): (nom du projet, chemin du CPR)
+    
+    Returns:
+        tuple: (nom du projet, VSTi trouvés, message d'erreur ou "")
+    """
+    project_name, cpr_path = task
+    try:
+        return project_name, detecte_vsti(cpr_path, _worker_vsti_list), ""
+    except Exception as e:
+        return project_name, set(), str(e)
+
+class PluginInventory:
+    """
+    Inventaire des plugins utilisés par les projets d'une archive
+    
+    Le CPR le plus récent de chaque projet (colonne latest_cpr de
+    CubaseScanner.df_projects) est analysé dans un ProcessPoolExecutor,
+    avec la même détection que trouve_vsti (et son cache persistant : une
+    archive déjà inventoriée n'est relue que pour les CPR modifiés).
+    
+    Le résultat est une matrice projet -> plugins (DataFrame booléen) et un
+    index inverse plugin -> projets.
+    """
+    
+    def __init__(self, max_workers=None, chunksize=8):
+        """
+        Initialisation de l'inventaire
+        
+        Args:
+            max_workers (int): Nombre de processus (None ou 0 : un par cœur)
+            chunksize (int): Nombre de projets envoyés à la fois à un processus
+        """
+        self.max_workers = max_workers or None
+        self.chunksize = max(int(chunksize), 1)
+        self.plugins_by_project = {}
+        self.projects_by_plugin = {}
+        self.errors = {}
+        self.matrix = pd.DataFrame(dtype=bool)
+    
+    def run(self, df_projects, progress_callback=None):
+        """
+        Analyse de tous les projets de la table de synthèse
+        
+        Args:
+            df_projects (DataFrame): Table de CubaseScanner (project_name, latest_cpr)
+            progress_callback (callable): Fonction appelée avec (projets analysés, total)
+        
+        Returns:
+            DataFrame: Matrice projet -> plugins
+        """
+        tasks = [
+            (name, path)
+            for name, path in zip(df_projects['project_name'], df_projects['latest_cpr'])
+            if isinstance(path, str) and path
+        ]
+        vsti_list = load_vsti_list()
+        
+        self.plugins_by_project = {}
+        self.errors = {}
+        if tasks:
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(vsti_list,)) as executor:
+                for done, (name, found, error) in enumerate(
+                        executor.map(_analyse_project, tasks, chunksize=self.chunksize), 1):
+                    self.plugins_by_project[name] = found
+                    if error:
+                        self.errors[name] = error
+                        print(f"Erreur lors de l'analyse de {name} : {error}")
+                    if progress_callback:
+                        progress_callback(done, len(tasks))
+        
+        self._build_indexes()
+        return self.matrix
+    
+    def _build_indexes(self):
+        """Construction de la matrice et de l'index inverse à partir des résultats"""
+        projects_by_plugin = {}
+        for name, plugins in self.plugins_by_project.items():
+            for plugin in plugins:
+                projects_by_plugin.setdefault(plugin, []).append(name)
+        self.projects_by_plugin = {plugin: sorted(names) for plugin, names in sorted(projects_by_plugin.items())}
+        
+        projects = list(self.plugins_by_project)
+        plugins = list(self.projects_by_plugin)
+        self.matrix = pd.DataFrame(False, index=pd.Index(projects, name='project_name'), columns=plugins)
+        for plugin, names in self.projects_by_plugin.items():
+            self.matrix.loc[names, plugin] = True
+    
+    def projects_using(self, plugin):
+        """
+        Projets utilisant un plugin, sous son nom seul ou numéroté ("Kontakt 5 01")
+        
+        Args:
+            plugin (str): Nom du plugin
+        
+        Returns:
+            list: Noms des projets triés
+        """
+        numbered = re.compile(re.escape(plugin) + r'\s+\d{2}')
+        names = set()
+        for found, projects in self.projects_by_plugin.items():
+            if found == plugin or numbered.fullmatch(found):
+                names.update(projects)
+        return sorted(names)
+
+if __name__ == "__main__":
+    # Usage : python -m services.plugin_inventory <dossier> [plugin]
+    from services.scanner import CubaseScanner
+    from config.settings import settings
+    
+    scanner = CubaseScanner()
+    scanner.scan_directory(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
+    inventory = PluginInventory(settings.inventory_workers, settings.inventory_chunksize)
+    inventory.run(scanner.df_projects, lambda done, total: print(f"\r{done}/{total} projets analysés", end=""))
+    print()
+    if len(sys.argv) > 2:
+        for project_name in inventory.projects_using(sys.argv[2]):
+            print(f"→ {project_name}")
+    else:
+        for plugin, projects in inventory.projects_by_plugin.items():
+            print(f"{plugin} : {len(projects)} projets")
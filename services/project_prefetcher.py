@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Préchargement des projets voisins de la sélection (navigation au clavier)
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from services.analysis_scheduler import PRIORITY_PREFETCH
+from services.metadata_cache import MetadataCache
+from services.lectureCPR import detecte_vsti
+from services.vsti_manager import load_vsti_list
+
+def find_project_cpr(project_dir, names):
+    """
+    Fichier CPR analysé pour un projet : le premier du dossier
+    
+    Args:
+        project_dir (str): Dossier du projet
+        names (list): Noms des fichiers du dossier (ordre de os.listdir)
+    
+    Returns:
+        str: Chemin du CPR, ou None
+    """
+    for name in names:
+        if name.lower().endswith('.cpr'):
+            return os.path.join(project_dir, name)
+    return None
+
+class ProjectPrefetcher:
+    """
+    Préchargement en arrière-plan des projets voisins de la sélection
+    
+    Pour chaque voisin (lignes suivantes et précédentes dans l'ordre
+    affiché), une tâche de l'ordonnanceur lit le contenu du dossier et le
+    metadata.json (dans MetadataCache, partagé avec MetadataService), puis
+    lance l'analyse VSTi du CPR (qui remplit le cache persistant). Les
+    tâches sont soumises avec PRIORITY_PREFETCH + distance : le projet
+    sélectionné passe toujours devant, et les plus proches voisins avant
+    les plus lointains. Les clés sont celles utilisées par la fenêtre
+    ("vsti", chemin du CPR) : sélectionner un voisin en cours d'analyse
+    reprend la même tâche.
+    
+    Quand la sélection saute ailleurs, les tâches des anciens voisins sont
+    annulées. Le contenu des dossiers (listes de noms de fichiers) est
+    gardé dans un cache LRU en mémoire, validé par la date de
+    modification du dossier ; seules ces listes sont comptées dans
+    memory_budget. Les analyses VSTi ne sont pas gardées ici : elles vont
+    dans le cache persistant (VstiCache), et les metadata.json dans
+    MetadataCache, qui a sa propre limite.
+    """
+    
+    def __init__(self, scheduler, memory_budget=8 * 1024 * 1024):
+        """
+        Initialisation du préchargement
+        
+        Args:
+            scheduler (AnalysisScheduler): Ordonnanceur des analyses
+            memory_budget (int): Taille maximale estimée des listes de fichiers gardées en mémoire (octets)
+        """
+        self.scheduler = scheduler
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._used = 0
+        self._keys = set()
+        self._dirs = set()
+    
+    def prefetch(self, projects):
+        """
+        Préchargement d'un nouveau voisinage, annulation de l'ancien
+        
+        Args:
+            projects (list): Projets voisins (dict avec project_dir), du plus proche au plus lointain
+        """
+        with self._lock:
+            keys = set()
+            dirs = set()
+            for distance, project in enumerate(projects):
+                project_dir = project.get('project_dir')
+                if not project_dir or project_dir in dirs:
+                    continue
+                dirs.add(project_dir)
+                priority = PRIORITY_PREFETCH + distance
+                entry = self._entries.get(project_dir)
+                if entry is not None and entry['dir_mtime'] == self._dir_mtime(project_dir):
+                    # Dossier déjà lu : seule l'analyse VSTi reste éventuellement à faire
+                    if entry['cpr_path']:
+                        keys.add(self._submit_vsti(entry['cpr_path'], priority))
+                    continue
+                key = ('prefetch', project_dir)
+                self.scheduler.submit(key, lambda token, _, d=project_dir, p=priority: self._load(d, p, token), priority)
+                keys.add(key)
+            
+            for key in self._keys - keys:
+                self.scheduler.cancel(key, min_priority=PRIORITY_PREFETCH)
+            self._keys = keys
+            self._dirs = dirs
+    
+    def adopt(self, key):
+        """
+        Rattachement d'une tâche existante au voisinage courant (annulée avec lui)
+        
+        Args:
+            key (tuple): Clé de la tâche (projet qui vient de quitter la sélection)
+        """
+        with self._lock:
+            self._keys.add(key)
+    
+    def covers(self, project_dir):
+        """
+        Args:
+            project_dir (str): Dossier d'un projet
+        
+        Returns:
+            bool: True si le projet fait partie du voisinage préchargé
+        """
+        with self._lock:
+            return project_dir in self._dirs
+    
+    def get(self, project_dir):
+        """
+        Données préchargées d'un projet, si le dossier n'a pas changé
+        
+        Args:
+            project_dir (str): Dossier du projet
+        
+        Returns:
+            dict: files (noms), cpr_path, ou None
+        """
+        mtime = self._dir_mtime(project_dir)
+        with self._lock:
+            entry = self._entries.get(project_dir)
+            if entry is None or mtime is None or entry['dir_mtime'] != mtime:
+                return None
+            self._entries.move_to_end(project_dir)
+            return {'files': list(entry['files']), 'cpr_path': entry['cpr_path']}
+    
+    def clear(self):
+        """Annulation des tâches en cours et vidage du cache"""
+        self.prefetch([])
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+    
+    @staticmethod
+    def _dir_mtime(project_dir):
+        """Date de modification d'un dossier en ns (None s'il n'existe plus)"""
+        try:
+            return os.stat(project_dir).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _submit_vsti(self, cpr_path, priority):
+        """
+        Soumission de l'analyse VSTi d'un voisin (appel sous verrou)
+        
+        Returns:
+            tuple: Clé de la tâche
+        """
+        key = ('vsti', cpr_path)
+        self.scheduler.submit(key, lambda token, _: detecte_vsti(cpr_path, load_vsti_list(), cancel_token=token),
+                              priority)
+        return key
+    
+    def _load(self, project_dir, priority, token):
+        """
+        Lecture d'un projet voisin (thread de l'ordonnanceur)
+        
+        Args:
+            project_dir (str): Dossier du projet
+            priority (int): Priorité de la tâche
+            token (CancellationToken): Jeton d'annulation
+        """
+        dir_mtime = os.stat(project_dir).st_mtime_ns
+        files = os.listdir(project_dir)
+        cpr_path = find_project_cpr(project_dir, files)
+        token.raise_if_cancelled()
+        
+        # Lecture du metadata.json dans le cache partagé de MetadataService
+        try:
+            MetadataCache.default().get(project_dir)
+        except Exception as e:
+            print(f"Erreur lors du préchargement des métadonnées de {project_dir}: {e}")
+        
+        size = sys.getsizeof(files) + sum(sys.getsizeof(name) for name in files)
+        entry = {
+            'dir_mtime': dir_mtime,
+            'files': files,
+            'cpr_path': cpr_path,
+            'size': size
+        }
+        with self._lock:
+            self._store(project_dir, entry)
+            # Analyse VSTi enchaînée, sauf si le voisinage a changé entre-temps
+            if cpr_path and not token.cancelled:
+                self._keys.add(self._submit_vsti(cpr_path, priority))
+    
+    def _store(self, project_dir, entry):
+        """Ajout d'une entrée et éviction LRU au-delà du budget mémoire (appel sous verrou)"""
+        previous = self._entries.pop(project_dir, None)
+        if previous is not None:
+            self._used -= previous['size']
+        self._entries[project_dir] = entry
+        self._used += entry['size']
+        while self._used > self.memory_budget and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._used -= evicted['size']
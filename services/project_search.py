@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recherche dans les projets : index inversé sur le nom, les notes, les tags,
+les plugins détectés et les noms de fichiers
+"""
+
+import re
+import bisect
+import unicodedata
+
+from services.metadata_index import MetadataIndex
+from services.vsti_cache import VstiCache
+from services.vsti_manager import load_vsti_list
+
+# Champs indexés (mots)
+TEXT_FIELDS = ('name', 'tag', 'plugin', 'notes', 'file')
+
+# Champs numériques comparables (rating>=4, bpm<100)
+NUMERIC_FIELDS = ('rating', 'bpm')
+
+# Autres noms acceptés dans les requêtes
+FIELD_ALIASES = {
+    'tags': 'tag',
+    'vsti': 'plugin',
+    'plugins': 'plugin',
+    'note': 'notes',
+    'files': 'file',
+    'fichier': 'file',
+    'nom': 'name',
+    'tempo': 'bpm'
+}
+
+# Terme de requête : [-]champ(opérateur)valeur ou texte libre, valeurs entre guillemets possibles
+TERM_PATTERN = re.compile(r'(-?)(?:(\w+)(:|>=|<=|>|<|=))?("[^"]*"?|\S+)')
+
+# Mots : lettres et chiffres (le tiret bas sépare les mots, comme dans bass_take1)
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+# Longueur des n-grammes des noms (recherche de sous-chaînes du nom)
+NGRAM = 3
+
+def normalize(text):
+    """
+    Forme de recherche d'un texte : minuscules, sans accents
+    
+    Args:
+        text (str): Texte
+    
+    Returns:
+        str: Texte normalisé
+    """
+    text = str(text).lower()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+def tokenize(text):
+    """
+    Mots d'un texte (forme de recherche)
+    
+    Args:
+        text (str): Texte
+    
+    Returns:
+        list: Mots
+    """
+    return WORD_PATTERN.findall(normalize(text))
+
+class SearchTerm:
+    """
+    Terme d'une requête
+    
+    field vaut None pour un texte libre (cherché dans tous les champs),
+    op vaut ":" pour une recherche de mots, sinon un opérateur de
+    comparaison pour un champ numérique.
+    """
+    
+    __slots__ = ('field', 'op', 'value', 'negated')
+    
+    def __init__(self, field, op, value, negated=False):
+        """
+        Args:
+            field (str): Champ (TEXT_FIELDS, NUMERIC_FIELDS) ou None
+            op (str): ":" ou opérateur de comparaison ("=", ">=", "<=", ">", "<")
+            value (str|float): Texte cherché ou nombre comparé
+            negated (bool): Terme d'exclusion
+        """
+        self.field = field
+        self.op = op
+        self.value = value
+        self.negated = negated
+    
+    def __repr__(self):
+        return f"SearchTerm({self.field!r}, {self.op!r}, {self.value!r}, negated={self.negated})"
+
+def parse_query(text):
+    """
+    Analyse d'une requête de recherche
+    
+    Les termes sont combinés par ET. Syntaxe :
+    - mot : nom, notes, tags, plugins ou fichiers commençant par ce mot
+      (sous-chaîne quelconque du nom)
+    - tag:techno, plugin:serum, notes:"voix lead", name:, file: : un seul champ
+    - rating>=4, rating:5, bpm<100 : comparaison numérique
+    - -terme : exclusion
+    
+    Args:
+        text (str): Requête saisie
+    
+    Returns:
+        list: Termes (SearchTerm), vide si la requête est vide
+    """
+    terms = []
+    for negated, field, op, value in TERM_PATTERN.findall(text or ''):
+        value = value.strip('"')
+        if field:
+            name = FIELD_ALIASES.get(field.lower(), field.lower())
+            numeric = name in NUMERIC_FIELDS
+            if (name in TEXT_FIELDS and op == ':') or numeric:
+                if numeric:
+                    try:
+                        number = float(value.replace(',', '.'))
+                    except ValueError:
+                        # Valeur incomplète pendant la saisie (rating>=) : terme ignoré
+                        continue
+                    terms.append(SearchTerm(name, '=' if op == ':' else op, number, bool(negated)))
+                elif value:
+                    terms.append(SearchTerm(name, ':', value, bool(negated)))
+                continue
+            # Champ inconnu : le terme est cherché tel quel
+            value = field + op + value
+        if value:
+            terms.append(SearchTerm(None, ':', value, bool(negated)))
+    return terms
+
+def name_matches(name, terms):
+    """
+    Correspondance d'un nom de projet avec des termes, sans index
+    
+    Mêmes règles que ProjectSearchIndex pour le nom : un texte libre est
+    une sous-chaîne du nom, name: demande que chaque mot commence un mot
+    du nom. Les autres champs ne sont pas consultés.
+    
+    Args:
+        name (str): Nom du projet
+        terms (list): Termes (SearchTerm) de champ None ou "name"
+    
+    Returns:
+        bool: True si le nom satisfait tous les termes
+    """
+    normalized = normalize(name)
+    words = None
+    for term in terms:
+        if term.field is None:
+            found = normalize(term.value) in normalized
+        else:
+            if words is None:
+                words = tokenize(name)
+            found = all(any(word.startswith(prefix) for word in words) for prefix in tokenize(term.value))
+        if found == term.negated:
+            return False
+    return True
+
+class ProjectSearchIndex:
+    """
+    Index inversé des projets, clé = nom du projet (comme la table des projets)
+    
+    Chaque champ texte associe ses mots à l'ensemble des projets qui les
+    contiennent ; la liste triée des mots permet de trouver par dichotomie
+    tous ceux qui commencent par un préfixe (saisie en cours). Un terme ne
+    parcourt donc que les mots qui correspondent, jamais tous les projets.
+    Les sous-chaînes du nom (texte libre) passent par un index des
+    trigrammes des noms : seuls les projets qui ont tous les trigrammes du
+    texte sont vérifiés. Un texte libre de moins de NGRAM caractères
+    parcourt encore tous les noms.
+    
+    L'index est construit à partir des caches existants, sans ouvrir de
+    fichier de projet : synthèse et fichiers du scan, MetadataIndex (tags,
+    notes, notation), VstiCache (plugins des CPR déjà analysés). Les
+    projets modifiés ensuite sont mis à jour un par un (update_metadata,
+    update_plugins).
+    """
+    
+    def __init__(self):
+        """Initialisation d'un index vide"""
+        self._ids = {}
+        self._names = []
+        self._normalized_names = []
+        # Trigramme -> identifiants des projets dont le nom le contient
+        self._name_ngrams = {}
+        self._all_docs = set()
+        # Champ -> mot -> identifiants des projets
+        self._postings = {field: {} for field in TEXT_FIELDS}
+        # Champ -> identifiant -> mots du projet (pour les mises à jour)
+        self._doc_words = {field: {} for field in TEXT_FIELDS}
+        # Champ -> mots triés (recalculés à la demande après une modification)
+        self._sorted_words = {}
+        self._numbers = {field: {} for field in NUMERIC_FIELDS}
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def __contains__(self, project_name):
+        return project_name in self._ids
+    
+    def clear(self):
+        """Vidage de l'index"""
+        self.__init__()
+    
+    def build(self, df_projects, projects=None):
+        """
+        Construction de l'index
+        
+        Args:
+            df_projects (DataFrame): Synthèse des projets (project_name, project_dir, latest_cpr...,
+                rating et bpm si présents)
+            projects (dict): Projets détaillés du scanner, pour les noms de fichiers (facultatif)
+        """
+        self.clear()
+        if df_projects is None or df_projects.empty:
+            return
+        columns = df_projects.columns
+        names = df_projects['project_name'].tolist()
+        dirs = df_projects['project_dir'].tolist() if 'project_dir' in columns else [None] * len(names)
+        
+        try:
+            metadata = MetadataIndex.default().get_many(dirs)
+        except Exception as e:
+            print(f"Erreur lors de la lecture de l'index des métadonnées : {e}")
+            metadata = {}
+        
+        plugins = {}
+        keys = ('latest_cpr', 'latest_cpr_size', 'latest_cpr_mtime')
+        if all(key in columns for key in keys):
+            try:
+                plugins = VstiCache.default().vsti_for(zip(*(df_projects[key] for key in keys)), load_vsti_list())
+            except Exception as e:
+                print(f"Erreur lors de la lecture du cache des analyses : {e}")
+        cprs = df_projects['latest_cpr'].tolist() if 'latest_cpr' in columns else [None] * len(names)
+        bpms = df_projects['bpm'].tolist() if 'bpm' in columns else [None] * len(names)
+        ratings = df_projects['rating'].tolist() if 'rating' in columns else [None] * len(names)
+        
+        for name, project_dir, cpr, bpm, rating in zip(names, dirs, cprs, bpms, ratings):
+            doc = self._add_document(name)
+            self._set_words('name', doc, tokenize(name))
+            meta = metadata.get(project_dir)
+            if meta is not None:
+                self._set_metadata(doc, meta)
+            elif rating is not None:
+                self._set_number('rating', doc, rating)
+            if cpr in plugins:
+                self._set_words('plugin', doc, self._words(plugins[cpr]))
+            self._set_number('bpm', doc, bpm)
+            if projects is not None and name in projects:
+                self._set_words('file', doc, self._file_words(projects[name]))
+    
+    def _add_document(self, project_name):
+        """Identifiant d'un projet (créé s'il est nouveau)"""
+        doc = self._ids.get(project_name)
+        if doc is None:
+            doc = self._ids[project_name] = len(self._names)
+            self._names.append(project_name)
+            normalized = normalize(project_name)
+            self._normalized_names.append(normalized)
+            for ngram in {normalized[i:i + NGRAM] for i in range(len(normalized) - NGRAM + 1)}:
+                docs = self._name_ngrams.get(ngram)
+                if docs is None:
+                    self._name_ngrams[ngram] = {doc}
+                else:
+                    docs.add(doc)
+            self._all_docs.add(doc)
+        return doc
+    
+    @staticmethod
+    def _words(texts):
+        """Mots distincts d'une liste de textes"""
+        words = set()
+        for text in texts:
+            words.update(tokenize(text))
+        return words
+    
+    @staticmethod
+    def _file_words(project_data):
+        """Mots des noms de fichiers d'un projet (une seule analyse pour tous les noms)"""
+        names = [record.name for key in ('cpr_files', 'bak_files', 'wav_files', 'other_files')
+                 for record in project_data.get(key, ())]
+        return set(tokenize(' '.join(names)))
+    
+    def _set_words(self, field, doc, words):
+        """Remplacement des mots d'un champ pour un projet"""
+        postings = self._postings[field]
+        words = set(words)
+        previous = self._doc_words[field].get(doc)
+        added = words
+        if previous:
+            added = words - previous
+            for word in previous - words:
+                docs = postings[word]
+                docs.discard(doc)
+                if not docs:
+                    del postings[word]
+                    self._sorted_words.pop(field, None)
+        for word in added:
+            docs = postings.get(word)
+            if docs is None:
+                postings[word] = {doc}
+                self._sorted_words.pop(field, None)
+            else:
+                docs.add(doc)
+        self._doc_words[field][doc] = words
+    
+    def _set_number(self, field, doc, value):
+        """Valeur numérique d'un projet (None ou NaN : absente)"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or value != value:
+            self._numbers[field].pop(doc, None)
+        else:
+            self._numbers[field][doc] = value
+    
+    def _set_metadata(self, doc, metadata):
+        """Tags, notes et notation d'un projet"""
+        self._set_words('tag', doc, self._words(metadata.get('tags') or []))
+        self._set_words('notes', doc, tokenize(metadata.get('notes') or ''))
+        self._set_number('rating', doc, metadata.get('rating') or 0)
+    
+    def update_metadata(self, project_name, metadata):
+        """
+        Mise à jour des tags, notes et notation d'un projet (après enregistrement)
+        
+        Args:
+            project_name (str): Nom du projet
+            metadata (dict): Métadonnées enregistrées
+        """
+        self._set_metadata(self._add_document(project_name), metadata)
+    
+    def update_plugins(self, project_name, plugins):
+        """
+        Mise à jour des plugins d'un projet (après analyse de son CPR)
+        
+        Args:
+            project_name (str): Nom du projet
+            plugins (iterable): Plugins détectés
+        """
+        self._set_words('plugin', self._add_document(project_name), self._words(plugins))
+    
+    def _prefix_docs(self, field, prefix):
+        """
+        Projets dont un mot du champ commence par le préfixe
+        
+        Args:
+            field (str): Champ texte
+            prefix (str): Préfixe normalisé
+        
+        Returns:
+            set: Identifiants des projets
+        """
+        words = self._sorted_words.get(field)
+        if words is None:
+            words = self._sorted_words[field] = sorted(self._postings[field])
+        postings = self._postings[field]
+        start = bisect.bisect_left(words, prefix)
+        end = bisect.bisect_left(words, prefix + '\uffff')
+        if end - start == 1:
+            return postings[words[start]]
+        return set().union(*(postings[word] for word in words[start:end]))
+    
+    def _field_docs(self, field, value):
+        """Projets dont le champ contient tous les mots de la valeur (préfixes)"""
+        result = None
+        for word in tokenize(value):
+            docs = self._prefix_docs(field, word)
+            result = set(docs) if result is None else result & docs
+            if not result:
+                return set()
+        return result if result is not None else set(self._all_docs)
+    
+    def _name_docs(self, needle):
+        """
+        Projets dont le nom contient une sous-chaîne
+        
+        Args:
+            needle (str): Texte normalisé
+        
+        Returns:
+            set: Identifiants des projets
+        """
+        names = self._normalized_names
+        if len(needle) < NGRAM:
+            return {doc for doc, name in enumerate(names) if needle in name}
+        postings = []
+        for ngram in {needle[i:i + NGRAM] for i in range(len(needle) - NGRAM + 1)}:
+            docs = self._name_ngrams.get(ngram)
+            if not docs:
+                return set()
+            postings.append(docs)
+        # Intersection en partant du plus petit ensemble, puis vérification des candidats
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if len(postings) == 1 and len(needle) == NGRAM:
+            return set(candidates)
+        return {doc for doc in candidates if needle in names[doc]}
+    
+    def _free_text_docs(self, value):
+        """Texte libre : sous-chaîne du nom, ou mots de n'importe quel champ"""
+        result = self._name_docs(normalize(value))
+        words = tokenize(value)
+        if words:
+            docs = None
+            for word in words:
+                matches = set()
+                for field in ('tag', 'plugin', 'notes', 'file'):
+                    matches |= self._prefix_docs(field, word)
+                docs = matches if docs is None else docs & matches
+            result |= docs
+        return result
+    
+    def _numeric_docs(self, field, op, value):
+        """Projets dont la valeur numérique satisfait la comparaison"""
+        compare = {
+            '=': value.__eq__,
+            '>=': value.__le__,
+            '<=': value.__ge__,
+            '>': value.__lt__,
+            '<': value.__gt__
+        }[op]
+        docs = {doc for doc, number in self._numbers[field].items() if compare(number)}
+        if field == 'rating' and compare(0.0):
+            # Projet sans note : 0 étoile
+            docs |= self._all_docs - self._numbers[field].keys()
+        return docs
+    
+    def search(self, query):
+        """
+        Projets correspondant à une requête
+        
+        Args:
+            query (str|list): Requête saisie ou termes déjà analysés (parse_query)
+        
+        Returns:
+            set: Noms des projets, ou None si la requête est vide (aucun filtre)
+        """
+        terms = parse_query(query) if isinstance(query, str) else query
+        if not terms:
+            return None
+        # Les termes positifs d'abord : les exclusions partent d'un ensemble réduit
+        result = None
+        for term in sorted(terms, key=lambda t: t.negated):
+            if term.op != ':':
+                docs = self._numeric_docs(term.field, term.op, term.value)
+            elif term.field is None:
+                docs = self._free_text_docs(term.value)
+            else:
+                docs = self._field_docs(term.field, term.value)
+            if term.negated:
+                result = (set(self._all_docs) if result is None else result) - docs
+            else:
+                result = set(docs) if result is None else result & docs
+            if not result:
+                return set()
+        return {self._names[doc] for doc in result}
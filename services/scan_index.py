@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index persistant des scans de dossiers (SQLite)
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from config.constants import DEFAULT_PREFS_DIR, DEFAULT_SCAN_INDEX_FILE
+
+# Un dossier modifié il y a moins de RACY_DELAY secondes n'est pas mis en
+# cache : une écriture dans la même seconde ne changerait pas son mtime
+RACY_DELAY = 2.0
+
+# Nombre de dossiers accumulés par thread avant écriture groupée
+FLUSH_INTERVAL = 200
+
+class ScanIndex:
+    """
+    Index des dossiers scannés, clé = chemin du dossier + mtime
+    
+    Pour chaque dossier on mémorise son mtime et la liste de ses entrées
+    (nom, type, taille, dates). Tant que le mtime du dossier ne change pas,
+    ses entrées sont relues depuis l'index sans appel à scandir ni stat.
+    
+    Le mtime d'un dossier change à chaque création, suppression ou
+    renommage d'une entrée, ce qui couvre les sauvegardes Cubase (nouveau
+    .cpr + .bak) et les enregistrements audio. Un fichier réécrit sur
+    place ne modifie pas son dossier : sa taille en cache peut alors être
+    périmée jusqu'au prochain changement du dossier ou à clear().
+    """
+    
+    def __init__(self, db_path=None):
+        """
+        Initialisation de l'index
+        
+        Args:
+            db_path (str): Chemin de la base SQLite (défaut : ~/.trie_morceaux/scan_index.sqlite)
+        """
+        if db_path is None:
+            db_path = Path(os.path.expanduser(DEFAULT_PREFS_DIR)) / DEFAULT_SCAN_INDEX_FILE
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Une connexion par thread (sqlite3 interdit le partage entre threads)
+        self._local = threading.local()
+        # Les écritures sont groupées par thread puis sérialisées : plusieurs
+        # scans parallèles ne se disputent pas le verrou d'écriture SQLite
+        self._write_lock = threading.Lock()
+        self.reused = 0
+        self.rescanned = 0
+    
+    def _connect(self):
+        """
+        Connexion SQLite du thread courant (créée à la demande)
+        
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS entries (
+                    dir_path TEXT NOT NULL,
+                    pos INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    is_dir INTEGER NOT NULL,
+                    is_symlink INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    ctime REAL NOT NULL,
+                    PRIMARY KEY (dir_path, pos)
+                );
+            """)
+            self._local.conn = conn
+        return conn
+    
+    def get_entries(self, dir_path, mtime_ns):
+        """
+        Entrées en cache d'un dossier si son mtime n'a pas changé
+        
+        Args:
+            dir_path (str): Chemin du dossier
+            mtime_ns (int): mtime actuel du dossier (nanosecondes)
+            
+        Returns:
+            list: Tuples (nom, is_dir, is_symlink, taille, mtime, ctime) ou None
+        """
+        conn = self._connect()
+        row = conn.execute("SELECT mtime_ns FROM directories WHERE path = ?", (dir_path,)).fetchone()
+        if row is None or row[0] != mtime_ns:
+            self.rescanned += 1
+            return None
+        self.reused += 1
+        return [
+            (name, bool(is_dir), bool(is_symlink), size, mtime, ctime)
+            for name, is_dir, is_symlink, size, mtime, ctime in conn.execute(
+                "SELECT name, is_dir, is_symlink, size, mtime, ctime FROM entries "
+                "WHERE dir_path = ? ORDER BY pos", (dir_path,))
+        ]
+    
+    def store_entries(self, dir_path, mtime_ns, entries):
+        """
+        Enregistrement des entrées d'un dossier (écriture différée)
+        
+        Args:
+            dir_path (str): Chemin du dossier
+            mtime_ns (int): mtime du dossier au moment de la lecture
+            entries (list): Tuples (nom, is_dir, is_symlink, taille, mtime, ctime)
+        """
+        if time.time() - mtime_ns / 1e9 < RACY_DELAY:
+            return
+        pending = self._pending()
+        pending.append((dir_path, mtime_ns, entries))
+        if len(pending) >= FLUSH_INTERVAL:
+            self.commit()
+    
+    def _pending(self):
+        """
+        Dossiers en attente d'écriture pour le thread courant
+        
+        Returns:
+            list: Tuples (chemin, mtime_ns, entrées)
+        """
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            pending = self._local.pending = []
+        return pending
+    
+    def prune(self, root, visited):
+        """
+        Suppression des dossiers disparus sous une racine
+        
+        Args:
+            root (str): Dossier racine scanné
+            visited (set): Dossiers rencontrés pendant le scan
+        """
+        conn = self._connect()
+        prefix = root.rstrip(os.sep) + os.sep
+        # Bornes de plage plutôt que LIKE (pas d'échappement de % et _)
+        stale = [
+            (path,) for (path,) in conn.execute(
+                "SELECT path FROM directories WHERE path >= ? AND path < ?",
+                (prefix, prefix[:-1] + chr(ord(os.sep) + 1)))
+            if path not in visited
+        ]
+        if not stale:
+            return
+        with self._write_lock, conn:
+            conn.executemany("DELETE FROM entries WHERE dir_path = ?", stale)
+            conn.executemany("DELETE FROM directories WHERE path = ?", stale)
+    
+    def file_count(self, root):
+        """
+        Nombre de fichiers connus sous une racine (lors des scans précédents)
+        
+        Sert d'estimation du total à parcourir pour la progression du scan.
+        
+        Args:
+            root (str): Dossier racine
+            
+        Returns:
+            int: Nombre de fichiers (0 si la racine n'a jamais été scannée)
+        """
+        conn = self._connect()
+        root = root.rstrip(os.sep)
+        prefix = root + os.sep
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE is_dir = 0 AND (dir_path = ? OR (dir_path >= ? AND dir_path < ?))",
+            (root, prefix, root + chr(ord(os.sep) + 1))).fetchone()
+        return count
+    
+    def commit(self):
+        """Écriture des dossiers en attente du thread courant"""
+        pending = self._pending()
+        if not pending:
+            return
+        conn = self._connect()
+        with self._write_lock, conn:
+            for dir_path, mtime_ns, entries in pending:
+                conn.execute("DELETE FROM entries WHERE dir_path = ?", (dir_path,))
+                conn.executemany(
+                    "INSERT INTO entries (dir_path, pos, name, is_dir, is_symlink, size, mtime, ctime) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(dir_path, pos) + tuple(entry) for pos, entry in enumerate(entries)]
+                )
+                conn.execute("INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)", (dir_path, mtime_ns))
+        pending.clear()
+    
+    def clear(self):
+        """Vidage complet de l'index"""
+        self._pending().clear()
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute("DELETE FROM entries")
+            conn.execute("DELETE FROM directories")
+    
+    def close(self):
+        """Écriture des données en attente et fermeture de la connexion du thread courant"""
+        self.commit()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -7,16 +7,78 @@ Service de scan et d'analyse des projets Cubase
 
 import os
 from pathlib import Path
-from datetime import datetime
 import shutil
+import time
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+from config.constants import DEFAULT_METADATA_FILE
+from models.file_record import FileRecord
+
+# Catégorie de rangement des fichiers selon leur extension
+FILE_CATEGORIES = {
+    '.cpr': 'cpr_files',
+    '.bak': 'bak_files',
+    '.wav': 'wav_files'
+}
+
+# Listes de fichiers d'un projet
+FILE_KEYS = ('cpr_files', 'bak_files', 'wav_files', 'other_files')
+
+# Colonnes de la synthèse des projets (df_projects)
+PROJECT_SUMMARY_COLUMNS = [
+    'project_name',
+    'source',
+    'project_dir',
+    'latest_cpr',
+    'latest_cpr_date',
+    'latest_cpr_size',
+    'latest_cpr_mtime',
+    'cpr_count',
+    'bak_count',
+    'wav_count',
+    'other_count',
+    'total_size',
+    'total_size_mb'
+]
+
+# Nombre de fichiers entre deux notifications de progression
+PROGRESS_INTERVAL = 500
+
+# Délai minimal (secondes) entre deux lots de projets transmis pendant le scan
+BATCH_INTERVAL = 0.5
 
 class CubaseScanner:
     """Service pour scanner et analyser les projets Cubase"""
     
-    def __init__(self):
-        """Initialisation du scanner"""
-        self.projects = defaultdict(lambda: {
+    def __init__(self, index=None, metadata_index=None):
+        """
+        Initialisation du scanner
+        
+        Args:
+            index (ScanIndex): Index persistant pour les rescans incrémentaux (facultatif)
+            metadata_index (MetadataIndex): Index des tags et notes, mis à jour avec les
+                metadata.json rencontrés (facultatif)
+        """
+        self.projects = defaultdict(self._new_project)
+        self.df_projects = self.empty_dataframe()
+        self.index = index
+        self.metadata_index = metadata_index
+    
+    @staticmethod
+    def _new_project():
+        """
+        Structure vide d'un projet
+        
+        Returns:
+            dict: Entrée de projet sans fichiers
+        """
+        return {
             'cpr_files': [],
             'bak_files': [],
             'wav_files': [],
@@ -24,8 +86,7 @@ class CubaseScanner:
             'directories': [],
             'source': '',
             'project_dir': ''  # Ajout du chemin complet du dossier du projet
-        })
-        self.df_projects = []
+        }
     
     def scan_directory(self, root_dir):
         """
@@ -34,6 +95,29 @@ class CubaseScanner:
         Args:
             root_dir (str): Chemin du dossier racine à scanner
         
+        Returns:
+            dict: Dictionnaire des projets trouvés
+        """
+        return self.scan_tree(root_dir)
+    
+    def scan_tree(self, root_dir, progress_callback=None, batch_callback=None, should_stop=None):
+        """
+        Parcours unique d'une arborescence avec suivi de progression
+        
+        Contrairement à un appel de scan_directory par sous-dossier, chaque
+        entrée n'est visitée qu'une fois : le coût est linéaire en taille
+        de l'arborescence.
+        
+        Args:
+            root_dir (str): Chemin du dossier racine à scanner
+            progress_callback (callable): Appelé avec (nb_fichiers, nb_octets)
+                au fur et à mesure de la découverte des fichiers
+            batch_callback (callable): Appelé avec une liste de lignes de
+                synthèse (voir _summarize_project) des projets mis à jour
+                depuis le lot précédent
+            should_stop (callable): Consulté avant chaque dossier, arrête le
+                parcours quand il renvoie True
+        
         Returns:
             dict: Dictionnaire des projets trouvés
         """
@@ -43,137 +127,431 @@ class CubaseScanner:
             print(f"Le dossier {root_path} n'existe pas!")
             return self.projects
         
-        # Parcours récursif du dossier
+        self._scan_tree(str(root_path), self.projects, progress_callback, batch_callback, should_stop)
+        
+        # Conversion en DataFrame pour faciliter l'analyse
+        self._create_dataframe()
+        
+        return self.projects
+    
+    def _scan_tree(self, root, projects, progress_callback=None, batch_callback=None, should_stop=None):
+        """
+        Parcours d'une arborescence avec os.scandir
+        
+        Le type des entrées est lu depuis le cache de DirEntry et chaque
+        fichier ne fait l'objet que d'un seul appel à stat(). L'ordre de
+        parcours (préfixe, entrées dans l'ordre de scandir) est celui de
+        Path.rglob. Si un index de scan est configuré, les dossiers dont le
+        mtime n'a pas changé sont relus depuis l'index. Si un index de
+        métadonnées est configuré, il est synchronisé avec les metadata.json
+        rencontrés.
+        
+        Un parcours interrompu par should_stop ne met à jour ni l'index de
+        métadonnées ni les dossiers disparus de l'index de scan : les
+        dossiers non visités y restent.
+        
+        Args:
+            root (str): Chemin du dossier racine (sert aussi de source)
+            projects (dict): Dictionnaire des projets à compléter
+            progress_callback (callable): Appelé avec (nb_fichiers, nb_octets)
+                tous les PROGRESS_INTERVAL fichiers puis en fin de parcours
+            batch_callback (callable): Appelé au plus toutes les BATCH_INTERVAL
+                secondes avec les synthèses des projets mis à jour
+            should_stop (callable): Consulté avant chaque dossier, arrête le
+                parcours quand il renvoie True
+            
+        Returns:
+            int: Nombre de fichiers trouvés
+        """
         file_count = 0
-        for path in root_path.rglob('*'):
-            if path.is_file():
-                file_count += 1
-                # Récupération de l'extension et du nom du dossier parent
-                ext = path.suffix.lower()
-                parent_dir = path.parent.name
-                project_dir = path.parent
+        total_bytes = 0
+        visited = set()
+        # Dossier -> (mtime, taille) des metadata.json rencontrés
+        metadata_files = {}
+        # Projets modifiés depuis le dernier lot (dict utilisé comme ensemble ordonné)
+        updated = {}
+        last_batch = time.monotonic()
+        
+        def flush_batch():
+            batch_callback([self._summarize_project(name, projects[name]) for name in updated])
+            updated.clear()
+        
+        stopped = False
+        stack = [root]
+        while stack:
+            if should_stop is not None and should_stop():
+                stopped = True
+                break
+            current = stack.pop()
+            visited.add(current)
+            # Le nom du projet est celui du dossier parent des entrées
+            project_name = os.path.basename(current)
+            try:
+                entries = self._read_directory(current)
+            except OSError as e:
+                print(f"Impossible de lire le dossier {current}: {e}")
+                continue
+            
+            subdirs = []
+            for name, is_dir, is_symlink, size, mtime, ctime in entries:
+                path = os.path.join(current, name)
+                if is_dir:
+                    projects[project_name]['directories'].append({
+                        'path': path,
+                        'name': name,
+                        'source': root
+                    })
+                    # Comme rglob, on ne suit pas les liens symboliques de dossiers
+                    if not is_symlink:
+                        subdirs.append(path)
+                    continue
                 
-                # Détermination du nom du projet (nom du dossier parent)
-                project_name = project_dir.name
+                file_count += 1
+                total_bytes += size
+                if progress_callback and file_count % PROGRESS_INTERVAL == 0:
+                    progress_callback(file_count, total_bytes)
+                project = projects[project_name]
                 
                 # Initialisation du chemin du dossier du projet s'il n'existe pas encore
-                if 'project_dir' not in self.projects[project_name] or not self.projects[project_name]['project_dir']:
-                    self.projects[project_name]['project_dir'] = str(project_dir)
+                if not project.get('project_dir'):
+                    project['project_dir'] = current
                 
                 # Si le projet n'a pas encore de source, on l'initialise
-                if 'source' not in self.projects[project_name]:
-                    self.projects[project_name]['source'] = str(root_path)
+                if not project.get('source'):
+                    project['source'] = root
                 # Si le projet existe déjà mais vient d'une autre source, on le marque comme multi-source
-                elif self.projects[project_name]['source'] != str(root_path):
-                    self.projects[project_name]['source'] = "Plusieurs sources"
+                elif project['source'] != root:
+                    project['source'] = "Plusieurs sources"
+                
+                if name == DEFAULT_METADATA_FILE:
+                    metadata_files[current] = (mtime, size)
                 
                 # Ajout du fichier à la catégorie correspondante
-                if ext == '.cpr':
-                    self.projects[project_name]['cpr_files'].append({
-                        'path': str(path),
-                        'size': path.stat().st_size,
-                        'modified': datetime.fromtimestamp(path.stat().st_mtime),
-                        'created': datetime.fromtimestamp(path.stat().st_ctime),
-                        'source': str(root_path)
-                    })
-                elif ext == '.bak':
-                    self.projects[project_name]['bak_files'].append({
-                        'path': str(path),
-                        'size': path.stat().st_size,
-                        'modified': datetime.fromtimestamp(path.stat().st_mtime),
-                        'created': datetime.fromtimestamp(path.stat().st_ctime),
-                        'source': str(root_path)
-                    })
-                elif ext == '.wav':
-                    self.projects[project_name]['wav_files'].append({
-                        'path': str(path),
-                        'size': path.stat().st_size,
-                        'modified': datetime.fromtimestamp(path.stat().st_mtime),
-                        'created': datetime.fromtimestamp(path.stat().st_ctime),
-                        'source': str(root_path)
-                    })
-                else:
-                    self.projects[project_name]['other_files'].append({
-                        'path': str(path),
-                        'size': path.stat().st_size,
-                        'modified': datetime.fromtimestamp(path.stat().st_mtime),
-                        'created': datetime.fromtimestamp(path.stat().st_ctime),
-                        'source': str(root_path)
-                    })
-            elif path.is_dir() and path.name not in ['.', '..']:
-                project_name = path.parent.name
-                self.projects[project_name]['directories'].append({
-                    'path': str(path),
-                    'name': path.name,
-                    'source': str(root_path)
-                })
+                category = FILE_CATEGORIES.get(os.path.splitext(name)[1].lower(), 'other_files')
+                project[category].append(FileRecord(current, name, size, mtime, ctime, root))
+            
+            # Pile LIFO : on empile à l'envers pour conserver l'ordre de scandir
+            stack.extend(reversed(subdirs))
+            
+            # Les entrées du dossier sont toutes traitées : son projet peut être affiché
+            if batch_callback and entries:
+                updated[project_name] = None
+                if time.monotonic() - last_batch >= BATCH_INTERVAL:
+                    flush_batch()
+                    last_batch = time.monotonic()
         
-        # Conversion en DataFrame pour faciliter l'analyse
-        self._create_dataframe()
+        if batch_callback and updated:
+            flush_batch()
         
-        return self.projects
+        if self.index is not None:
+            if not stopped:
+                self.index.prune(root, visited)
+            self.index.commit()
+        
+        if self.metadata_index is not None and not stopped:
+            self.metadata_index.sync(root, metadata_files)
+        
+        if progress_callback:
+            progress_callback(file_count, total_bytes)
+        
+        return file_count
     
-    def scan_multiple_directories(self, dir_list):
+    def _read_directory(self, path):
+        """
+        Lecture des entrées d'un dossier (depuis l'index si inchangé)
+        
+        Args:
+            path (str): Chemin du dossier
+            
+        Returns:
+            list: Tuples (nom, is_dir, is_symlink, taille, mtime, ctime)
+        """
+        mtime_ns = None
+        if self.index is not None:
+            mtime_ns = os.stat(path).st_mtime_ns
+            cached = self.index.get_entries(path, mtime_ns)
+            if cached is not None:
+                return cached
+        
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        entries.append((entry.name, False, False, stat.st_size, stat.st_mtime, stat.st_ctime))
+                    elif entry.is_dir():
+                        entries.append((entry.name, True, entry.is_symlink(), 0, 0.0, 0.0))
+                except OSError as e:
+                    print(f"Impossible de lire {entry.path}: {e}")
+        
+        if self.index is not None:
+            self.index.store_entries(path, mtime_ns, entries)
+        return entries
+    
+    def scan_multiple_directories(self, dir_list, parallel=False, max_workers=None, progress_callback=None,
+                                  batch_callback=None, should_stop=None):
         """
         Scan de plusieurs dossiers racines
         
+        En mode parallèle, chaque racine est parcourue par son propre thread
+        (les sources sont souvent sur des disques différents) puis les
+        résultats sont fusionnés dans l'ordre de dir_list : le contenu de
+        self.projects est identique à celui d'un scan séquentiel.
+        
         Args:
             dir_list (list): Liste des chemins des dossiers à scanner
+            parallel (bool): Scanner les racines simultanément
+            max_workers (int): Nombre maximal de threads (défaut : une par racine)
+            progress_callback (callable): Appelé avec (nb_racines_terminées,
+                nb_fichiers, nb_octets), cumulés sur toutes les racines
+            batch_callback (callable): Appelé avec les synthèses des projets
+                mis à jour (en mode parallèle, synthèses partielles par racine
+                jusqu'à la fusion)
+            should_stop (callable): Consulté avant chaque dossier par chaque
+                parcours (y compris en parallèle), arrête le scan quand il
+                renvoie True
             
         Returns:
             dict: Dictionnaire des projets trouvés
         """
+        if not parallel:
+            # Totaux des racines déjà parcourues et de la racine en cours
+            files = size = 0
+            current = [0, 0]
+            
+            def on_progress(file_count, total_bytes):
+                current[:] = file_count, total_bytes
+                if progress_callback:
+                    progress_callback(i, files + file_count, size + total_bytes)
+            
+            for i, directory in enumerate(dir_list):
+                if should_stop is not None and should_stop():
+                    break
+                current[:] = 0, 0
+                self.scan_tree(directory, on_progress, batch_callback, should_stop)
+                files += current[0]
+                size += current[1]
+                if progress_callback:
+                    progress_callback(i + 1, files, size)
+            return self.projects
+        
+        roots = []
         for directory in dir_list:
-            self.scan_directory(directory)
+            root_path = Path(directory)
+            if root_path.exists():
+                roots.append(str(root_path))
+            else:
+                print(f"Le dossier {root_path} n'existe pas!")
+        
+        # Progression de chaque racine, agrégée sous verrou
+        lock = threading.Lock()
+        per_root = [(0, 0)] * len(roots)
+        done = [0]
+        
+        def notify():
+            files = sum(count for count, _ in per_root)
+            size = sum(total for _, total in per_root)
+            progress_callback(done[0], files, size)
+        
+        def scan_root(i):
+            def on_progress(file_count, total_bytes):
+                with lock:
+                    per_root[i] = (file_count, total_bytes)
+                    if progress_callback:
+                        notify()
+            
+            projects = defaultdict(self._new_project)
+            try:
+                self._scan_tree(roots[i], projects, on_progress, batch_callback, should_stop)
+            finally:
+                if self.index is not None:
+                    self.index.close()
+                with lock:
+                    done[0] += 1
+                    if progress_callback:
+                        notify()
+            return projects
+        
+        with ThreadPoolExecutor(max_workers=max_workers or max(1, len(roots))) as executor:
+            results = list(executor.map(scan_root, range(len(roots))))
+        
+        # Fusion déterministe, dans l'ordre des racines
+        for projects in results:
+            self._merge_projects(projects)
+        
+        self._create_dataframe()
         
         return self.projects
     
-    def _create_dataframe(self):
+    def _merge_projects(self, projects):
         """
-        Création d'une liste de dictionnaires à partir des projets trouvés
+        Fusion des projets d'une racine dans self.projects
+        
+        Args:
+            projects (dict): Projets trouvés dans une seule racine
         """
-        data = []
-        
-        for project_name, project_data in self.projects.items():
-            # Trouver le fichier CPR le plus récent
-            latest_cpr = None
-            if project_data['cpr_files']:
-                latest_cpr = max(project_data['cpr_files'], 
-                                key=lambda x: x['modified'])
+        for project_name, data in projects.items():
+            project = self.projects[project_name]
+            for key in FILE_KEYS + ('directories',):
+                project[key].extend(data[key])
             
-            # Calculer les statistiques
-            total_size = sum(f['size'] for files in [
-                project_data['cpr_files'], 
-                project_data['bak_files'],
-                project_data['wav_files'],
-                project_data['other_files']
-            ] for f in files)
+            if not project.get('project_dir'):
+                project['project_dir'] = data['project_dir']
             
-            # Correction : si project_dir est vide, on le déduit du chemin du dernier fichier trouvé
-            project_dir = project_data.get('project_dir', '')
-            if not project_dir:
-                # Cherche le chemin du dossier du dernier fichier CPR/Bak/Wav/Other trouvé
-                for key in ['cpr_files', 'bak_files', 'wav_files', 'other_files']:
-                    if project_data[key]:
-                        project_dir = str(Path(project_data[key][-1]['path']).parent)
-                        break
-            data.append({
-                'project_name': project_name,
-                'source': project_data.get('source', ''),
-                'project_dir': project_dir,
-                'latest_cpr': latest_cpr['path'] if latest_cpr else None,
-                'latest_cpr_date': latest_cpr['modified'] if latest_cpr else None,
-                'cpr_count': len(project_data['cpr_files']),
-                'bak_count': len(project_data['bak_files']),
-                'wav_count': len(project_data['wav_files']),
-                'other_count': len(project_data['other_files']),
-                'total_size': total_size,
-                'total_size_mb': round(total_size / (1024 * 1024), 2)
-            })
-        
-        self.df_projects = data
+            # Même règle que pendant le parcours : une seconde source rend le projet multi-source
+            if data['source']:
+                if not project.get('source'):
+                    project['source'] = data['source']
+                elif project['source'] != data['source']:
+                    project['source'] = "Plusieurs sources"
+    
+    def _create_dataframe(self):
+        """
+        Création du DataFrame de synthèse des projets
+        
+        Les tailles et dates des fichiers de tous les projets sont aplaties
+        en tableaux numpy : totaux et CPR le plus récent de chaque projet
+        sont calculés par opérations vectorisées (bincount, lexsort).
+        
+        Returns:
+            DataFrame: Une ligne par projet (colonnes PROJECT_SUMMARY_COLUMNS)
+        """
+        names = list(self.projects.keys())
+        n = len(names)
+        if not n:
+            self.df_projects = self.empty_dataframe()
+            return self.df_projects
+        
+        counts = {key: np.zeros(n, dtype=np.int64) for key in FILE_KEYS}
+        sources = []
+        project_dirs = []
+        sizes = []
+        cpr_records = []
+        cpr_mtimes = []
+        get_size = attrgetter('size')
+        get_mtime = attrgetter('mtime')
+        for i, name in enumerate(names):
+            project_data = self.projects[name]
+            for key in FILE_KEYS:
+                files = project_data[key]
+                counts[key][i] = len(files)
+                sizes.extend(map(get_size, files))
+            cpr_records.extend(project_data['cpr_files'])
+            cpr_mtimes.extend(map(get_mtime, project_data['cpr_files']))
+            sources.append(project_data.get('source', ''))
+            project_dirs.append(self._project_dir(project_data))
+        
+        # Taille totale par projet : les fichiers sont rangés projet par projet
+        files_per_project = sum(counts.values())
+        owners = np.repeat(np.arange(n), files_per_project)
+        total_size = np.bincount(owners, weights=np.asarray(sizes, dtype=np.float64), minlength=n).astype(np.int64)
+        
+        # CPR le plus récent : tri par (projet, mtime, -position), dernier de chaque groupe.
+        # À mtime égal, c'est le premier fichier rencontré qui l'emporte (comme max()).
+        latest_cpr = np.full(n, None, dtype=object)
+        latest_cpr_date = np.full(n, None, dtype=object)
+        latest_cpr_size = np.full(n, np.nan)
+        latest_cpr_mtime = np.full(n, np.nan)
+        if cpr_records:
+            cpr_owners = np.repeat(np.arange(n), counts['cpr_files'])
+            mtimes = np.asarray(cpr_mtimes, dtype=np.float64)
+            order = np.lexsort((-np.arange(len(cpr_records)), mtimes, cpr_owners))
+            owners_sorted = cpr_owners[order]
+            last = np.r_[owners_sorted[1:] != owners_sorted[:-1], True]
+            winners = order[last]
+            latest_cpr[cpr_owners[winners]] = [cpr_records[j].path for j in winners]
+            latest_cpr_date[cpr_owners[winners]] = [cpr_records[j].modified for j in winners]
+            latest_cpr_size[cpr_owners[winners]] = [cpr_records[j].size for j in winners]
+            latest_cpr_mtime[cpr_owners[winners]] = mtimes[winners]
+        
+        self.df_projects = pd.DataFrame({
+            'project_name': names,
+            'source': sources,
+            'project_dir': project_dirs,
+            'latest_cpr': latest_cpr,
+            'latest_cpr_date': pd.to_datetime(latest_cpr_date),
+            'latest_cpr_size': latest_cpr_size,
+            'latest_cpr_mtime': latest_cpr_mtime,
+            'cpr_count': counts['cpr_files'],
+            'bak_count': counts['bak_files'],
+            'wav_count': counts['wav_files'],
+            'other_count': counts['other_files'],
+            'total_size': total_size,
+            'total_size_mb': np.round(total_size / (1024 * 1024), 2)
+        }, columns=PROJECT_SUMMARY_COLUMNS)
         return self.df_projects
     
+    @staticmethod
+    def empty_dataframe():
+        """
+        DataFrame de synthèse vide (colonnes en place)
+        
+        Returns:
+            DataFrame: Table des projets sans lignes
+        """
+        return pd.DataFrame({
+            column: pd.Series(dtype='datetime64[ns]' if column == 'latest_cpr_date' else object)
+            for column in PROJECT_SUMMARY_COLUMNS
+        })
+    
+    @staticmethod
+    def _project_dir(project_data):
+        """
+        Dossier d'un projet
+        
+        Args:
+            project_data (dict): Fichiers et dossiers du projet
+            
+        Returns:
+            str: Dossier du projet, déduit des fichiers si absent
+        """
+        # Correction : si project_dir est vide, on le déduit du chemin du dernier fichier trouvé
+        project_dir = project_data.get('project_dir', '')
+        if not project_dir:
+            # Cherche le chemin du dossier du dernier fichier CPR/Bak/Wav/Other trouvé
+            for key in FILE_KEYS:
+                if project_data[key]:
+                    return project_data[key][-1].parent
+        return project_dir
+    
+    @staticmethod
+    def _summarize_project(project_name, project_data):
+        """
+        Ligne de synthèse d'un projet pour la table des projets
+        
+        Args:
+            project_name (str): Nom du projet
+            project_data (dict): Fichiers et dossiers du projet
+            
+        Returns:
+            dict: Statistiques du projet
+        """
+        # Trouver le fichier CPR le plus récent
+        latest_cpr = None
+        if project_data['cpr_files']:
+            latest_cpr = max(project_data['cpr_files'], key=lambda x: x.mtime)
+        
+        # Calculer les statistiques
+        total_size = sum(f.size for key in FILE_KEYS for f in project_data[key])
+        
+        project_dir = CubaseScanner._project_dir(project_data)
+        return {
+            'project_name': project_name,
+            'source': project_data.get('source', ''),
+            'project_dir': project_dir,
+            'latest_cpr': latest_cpr.path if latest_cpr else None,
+            'latest_cpr_date': latest_cpr.modified if latest_cpr else None,
+            'latest_cpr_size': latest_cpr.size if latest_cpr else None,
+            'latest_cpr_mtime': latest_cpr.mtime if latest_cpr else None,
+            'cpr_count': len(project_data['cpr_files']),
+            'bak_count': len(project_data['bak_files']),
+            'wav_count': len(project_data['wav_files']),
+            'other_count': len(project_data['other_files']),
+            'total_size': total_size,
+            'total_size_mb': round(total_size / (1024 * 1024), 2)
+        }
+    
     def get_project_details(self, project_name):
         """
         Récupération des détails d'un projet spécifique
@@ -218,7 +596,7 @@ class CubaseScanner:
         
         # Copie des fichiers CPR
         for file_info in project['cpr_files']:
-            src_path = Path(file_info['path'])
+            src_path = Path(file_info.path)
             dest_path = dest_project_dir / src_path.name
             
             try:
@@ -230,7 +608,7 @@ class CubaseScanner:
         # Copie des fichiers BAK si demandé
         if keep_bak:
             for file_info in project['bak_files']:
-                src_path = Path(file_info['path'])
+                src_path = Path(file_info.path)
                 dest_path = dest_project_dir / src_path.name
                 
                 try:
@@ -241,7 +619,7 @@ class CubaseScanner:
         
         # Copie des fichiers WAV
         for file_info in project['wav_files']:
-            src_path = Path(file_info['path'])
+            src_path = Path(file_info.path)
             
             # Vérification si le fichier doit être ignoré
             if remove_dotunderscore and src_path.name.startswith('._'):
@@ -258,7 +636,7 @@ class CubaseScanner:
         
         # Copie des autres fichiers
         for file_info in project['other_files']:
-            src_path = Path(file_info['path'])
+            src_path = Path(file_info.path)
             
             # Vérification si le fichier doit être ignoré
             if remove_dotunderscore and src_path.name.startswith('._'):
@@ -289,12 +667,5 @@ class CubaseScanner:
         """
         Réinitialisation du scanner
         """
-        self.projects = defaultdict(lambda: {
-            'cpr_files': [],
-            'bak_files': [],
-            'wav_files': [],
-            'other_files': [],
-            'directories': [],
-            'source': ''
-        })
-        self.df_projects = []
+        self.projects = defaultdict(self._new_project)
+        self.df_projects = self.empty_dataframe()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache persistant des analyses de fichiers CPR : VSTi détectés et
+caractéristiques du projet (SQLite)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from config.constants import DEFAULT_PREFS_DIR, DEFAULT_VSTI_CACHE_FILE
+from services.scan_index import RACY_DELAY
+from services.vsti_manager import vsti_list_hash
+
+# Version de l'analyse : à incrémenter quand ses résultats peuvent changer
+DETECTION_VERSION = 6
+
+# Caractéristiques extraites avec les VSTi (voir CprDocument.features)
+FEATURE_KEYS = ('tempo', 'time_signature', 'track_count', 'sample_rate')
+
+# Nombre de chemins par requête lors des lectures groupées
+LOOKUP_BATCH = 500
+
+# Nombre maximal de CPR gardés en cache (les moins récemment consultés sont évincés)
+MAX_ENTRIES = 5000
+
+# Précision de la date de dernière consultation (secondes) : une consultation ne
+# réécrit la date que si elle est plus ancienne, la plupart des lectures n'écrivent rien
+LAST_USED_RESOLUTION = 3600.0
+
+class VstiCache:
+    """
+    Résultats de l'analyse VSTi, clé = (chemin, taille, mtime, empreinte de la liste)
+    
+    Un CPR non modifié depuis sa dernière analyse, avec la même liste de
+    VSTi connus, est servi depuis le cache sans relire le fichier. Toute
+    modification du fichier (taille ou mtime) ou de vsti_list.json change
+    la clé. save_vsti_list marque en plus comme périmés les VSTi obtenus
+    avec une autre liste.
+    
+    Les caractéristiques du projet (tempo, signature, nombre de pistes,
+    fréquence) ne dépendent pas de la liste : elles restent lisibles
+    (features_for) tant que le fichier n'a pas changé.
+    """
+    
+    _default = None
+    _default_lock = threading.Lock()
+    
+    def __init__(self, db_path=None, max_entries=MAX_ENTRIES):
+        """
+        Initialisation du cache
+        
+        Args:
+            db_path (str): Chemin de la base SQLite (défaut : ~/.trie_morceaux/vsti_cache.sqlite)
+            max_entries (int): Nombre maximal de fichiers en cache
+        """
+        if db_path is None:
+            db_path = Path(os.path.expanduser(DEFAULT_PREFS_DIR)) / DEFAULT_VSTI_CACHE_FILE
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vsti_results (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    list_hash TEXT NOT NULL,
+                    vsti TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    features TEXT
+                )
+            """)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(vsti_results)")]
+            if 'features' not in columns:
+                conn.execute("ALTER TABLE vsti_results ADD COLUMN features TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS vsti_results_last_used ON vsti_results (last_used)")
+    
+    @classmethod
+    def default(cls):
+        """
+        Cache partagé de l'application
+        
+        Returns:
+            VstiCache: Instance commune (créée à la demande)
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+    
+    def _connect(self):
+        """
+        Connexion SQLite du thread courant (créée à la demande)
+        
+        Les threads d'analyse et de l'interface gardent chacun leur
+        connexion : pas d'ouverture ni de point de contrôle du journal WAL à
+        chaque consultation. Un processus créé par fork (inventaire des
+        plugins) ouvre la sienne au lieu de réutiliser celle du parent.
+        
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    @staticmethod
+    def list_key(vsti_list):
+        """
+        Empreinte d'une liste de VSTi pour la version courante de la détection
+        
+        Args:
+            vsti_list (list): Liste des VSTi connus
+            
+        Returns:
+            str: Empreinte
+        """
+        return f"{vsti_list_hash(vsti_list)}:{DETECTION_VERSION}"
+    
+    @classmethod
+    def key_for(cls, fichier, vsti_list=None, list_key=None):
+        """
+        Clé de cache d'un fichier CPR dans son état actuel
+        
+        Args:
+            fichier (str): Chemin du fichier CPR
+            vsti_list (list): Liste des VSTi connus
+            list_key (str): Empreinte de la liste déjà calculée (list_key), à la place de vsti_list
+            
+        Returns:
+            tuple: (chemin, taille, mtime_ns, empreinte de la liste)
+        """
+        stat = os.stat(fichier)
+        path = os.path.normcase(os.path.abspath(fichier))
+        if list_key is None:
+            list_key = cls.list_key(vsti_list)
+        return path, stat.st_size, stat.st_mtime_ns, list_key
+    
+    def get(self, key):
+        """
+        VSTi en cache pour une clé
+        
+        Args:
+            key (tuple): Clé renvoyée par key_for
+            
+        Returns:
+            set: VSTi trouvés, ou None si absent ou périmé
+        """
+        analysis = self.get_analysis(key)
+        return analysis['vsti'] if analysis is not None else None
+    
+    def get_analysis(self, key):
+        """
+        Analyse complète en cache pour une clé
+        
+        La date de dernière consultation (éviction LRU) n'est réécrite que
+        si elle date de plus de LAST_USED_RESOLUTION secondes : une lecture
+        répétée (sélection dans la table) ne fait pas d'écriture.
+        
+        Args:
+            key (tuple): Clé renvoyée par key_for
+            
+        Returns:
+            dict: "vsti" (set) et caractéristiques (FEATURE_KEYS), ou None si absent ou périmé
+        """
+        path, size, mtime_ns, list_hash = key
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT vsti, features, last_used FROM vsti_results "
+            "WHERE path = ? AND size = ? AND mtime_ns = ? AND list_hash = ?",
+            (path, size, mtime_ns, list_hash)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] >= LAST_USED_RESOLUTION:
+            with self._write_lock, conn:
+                conn.execute("UPDATE vsti_results SET last_used = ? WHERE path = ?", (now, path))
+        analysis = dict.fromkeys(FEATURE_KEYS)
+        analysis.update(json.loads(row[1]) if row[1] else {})
+        analysis['vsti'] = set(json.loads(row[0]))
+        return analysis
+    
+    def put(self, key, vsti_set, features=None):
+        """
+        Enregistrement du résultat d'une analyse
+        
+        Args:
+            key (tuple): Clé calculée avant l'analyse (key_for)
+            vsti_set (set): VSTi trouvés
+            features (dict): Caractéristiques du projet (FEATURE_KEYS)
+        """
+        path, size, mtime_ns, list_hash = key
+        # Un fichier modifié à l'instant pourrait l'être encore sans changer de mtime
+        if time.time() - mtime_ns / 1e9 < RACY_DELAY:
+            return
+        features = {name: (features or {}).get(name) for name in FEATURE_KEYS}
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO vsti_results (path, size, mtime_ns, list_hash, vsti, last_used, features) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, list_hash, json.dumps(sorted(vsti_set), ensure_ascii=False), time.time(),
+                 json.dumps(features)))
+            # Éviction LRU au-delà de max_entries
+            conn.execute(
+                "DELETE FROM vsti_results WHERE path IN "
+                "(SELECT path FROM vsti_results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+    
+    def _lookup(self, files):
+        """
+        Lignes en cache d'un ensemble de CPR dont la taille et la date sont à jour
+        
+        Args:
+            files (iterable): Tuples (chemin, taille, mtime en secondes)
+            
+        Yields:
+            tuple: (chemin tel que fourni, empreinte de la liste, VSTi, caractéristiques)
+        """
+        wanted = {}
+        for fichier, size, mtime in files:
+            if isinstance(fichier, str) and fichier:
+                wanted[os.path.normcase(os.path.abspath(fichier))] = (fichier, size, mtime)
+        paths = list(wanted)
+        conn = self._connect()
+        for start in range(0, len(paths), LOOKUP_BATCH):
+            batch = paths[start:start + LOOKUP_BATCH]
+            rows = conn.execute(
+                "SELECT path, size, mtime_ns, list_hash, vsti, features FROM vsti_results "
+                f"WHERE path IN ({','.join('?' * len(batch))})", batch).fetchall()
+            for path, size, mtime_ns, list_hash, vsti, features in rows:
+                fichier, known_size, known_mtime = wanted[path]
+                if size == known_size and abs(mtime_ns / 1e9 - known_mtime) < 1e-6:
+                    yield fichier, list_hash, vsti, features
+    
+    def features_for(self, files):
+        """
+        Caractéristiques en cache d'un ensemble de CPR, sans ouvrir les fichiers
+        
+        La validité est vérifiée avec la taille et la date connues du scan.
+        
+        Args:
+            files (iterable): Tuples (chemin, taille, mtime en secondes)
+            
+        Returns:
+            dict: Chemin (tel que fourni) -> caractéristiques, pour les CPR en cache et à jour
+        """
+        version = f":{DETECTION_VERSION}"
+        return {
+            fichier: json.loads(features)
+            for fichier, list_hash, _, features in self._lookup(files)
+            if features and list_hash.endswith(version)
+        }
+    
+    def vsti_for(self, files, vsti_list):
+        """
+        VSTi en cache d'un ensemble de CPR, sans ouvrir les fichiers
+        
+        Args:
+            files (iterable): Tuples (chemin, taille, mtime en secondes)
+            vsti_list (list): Liste des VSTi connus
+            
+        Returns:
+            dict: Chemin (tel que fourni) -> VSTi, pour les CPR analysés avec cette liste et inchangés
+        """
+        list_key = self.list_key(vsti_list)
+        return {
+            fichier: set(json.loads(vsti))
+            for fichier, list_hash, vsti, _ in self._lookup(files)
+            if list_hash == list_key
+        }
+    
+    def invalidate(self, list_hash=None):
+        """
+        Péremption des VSTi obtenus avec une autre liste
+        
+        Les lignes sont conservées avec une empreinte "périmée" : leurs
+        VSTi ne seront plus servis, mais leurs caractéristiques restent
+        lisibles jusqu'à la prochaine analyse du fichier.
+        
+        Args:
+            list_hash (str): Empreinte à conserver, voir list_key (None : tout supprimer)
+        """
+        conn = self._connect()
+        with self._write_lock, conn:
+            if list_hash is None:
+                conn.execute("DELETE FROM vsti_results")
+            else:
+                conn.execute(
+                    "UPDATE vsti_results SET list_hash = 'périmée' || substr(list_hash, instr(list_hash, ':')) "
+                    "WHERE list_hash != ?", (list_hash,))
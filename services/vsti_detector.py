@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Détection des VSTi connus dans un fichier CPR en une seule passe
+"""
+
+import re
+import threading
+
+# Nom numéroté : "Serum 01", "Kick 2   07"...
+NUMBER_SUFFIX = re.compile(rb'\s+\d{2}')
+
+# Entrées de type "Plugin Name ..."
+PLUGIN_ENTRY = rb'Plugin\s+Nam[^\n\r]{2,40}'
+
+# Octets de mot (équivalent de \w sur des bytes)
+WORD_BYTES = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')
+
+# Nombre d'appels de progression sur une analyse
+PROGRESS_STEPS = 100
+
+# Recherche par fenêtres (point de contrôle de l'annulation entre deux fenêtres)
+SEARCH_WINDOW = 128 * 1024
+WINDOW_OVERLAP = 4096
+
+def _trie_pattern(names):
+    """
+    Expression régulière factorisée (trie) reconnaissant l'un des noms
+    
+    Les préfixes communs sont partagés ("Kontakt(?:\\ 7|\\ 8)?") et les
+    continuations sont essayées avant la fin de mot : à une position
+    donnée, c'est le nom le plus long qui est reconnu.
+    
+    Args:
+        names (iterable): Noms (bytes ou str, tous du même type)
+    
+    Returns:
+        bytes|str: Motif non compilé
+    """
+    trie = {}
+    for name in names:
+        node = trie
+        for char in (name[i:i + 1] for i in range(len(name))):
+            node = node.setdefault(char, {})
+        node[None] = True
+    
+    def build(node):
+        terminal = None in node
+        chars = sorted(char for char in node if char is not None)
+        branches = [re.escape(char) + build(node[char]) for char in chars]
+        if not branches:
+            return empty
+        body = branches[0] if len(branches) == 1 else open_group + bar.join(branches) + close_group
+        if terminal:
+            if len(branches) > 1:
+                return body + optional
+            return open_group + body + close_group + optional
+        return body
+    
+    sample = next(iter(names))
+    if isinstance(sample, bytes):
+        empty, open_group, close_group, bar, optional = b'', b'(?:', b')', b'|', b'?'
+    else:
+        empty, open_group, close_group, bar, optional = '', '(?:', ')', '|', '?'
+    return build(trie)
+
+class VstiDetector:
+    """
+    Moteur de détection des VSTi pour une liste de noms donnée
+    
+    Tous les noms de la liste sont réunis dans une seule expression
+    régulière factorisée, compilée une fois. Une passe unique sur le
+    contenu du CPR relève toutes les occurrences (y compris imbriquées,
+    "Kontakt" dans "Kontakt 7") ainsi que les entrées "Plugin Name".
+    Les règles de l'ancienne analyse en trois phases (noms numérotés,
+    noms isolés non contenus dans un nom déjà trouvé, noms cités dans une
+    entrée "Plugin Name") sont ensuite appliquées sur ces occurrences,
+    dans l'ordre de la liste, pour un résultat identique.
+    
+    Les noms sont recherchés littéralement.
+    """
+    
+    _cache_lock = threading.Lock()
+    _cached = None
+    
+    def __init__(self, vsti_list):
+        """
+        Compilation du moteur
+        
+        Args:
+            vsti_list (list): Noms des VSTi connus (ordre de vsti_list.json)
+        """
+        self.vsti_list = list(vsti_list)
+        self.key = tuple(self.vsti_list)
+        # Premier indice de chaque nom (ordre d'application des règles)
+        self._order = {}
+        for idx, name in enumerate(self.vsti_list):
+            self._order.setdefault(name, idx)
+        names = [name for name in self._order if name]
+        
+        self._encoded = {name: name.encode('utf-8') for name in names}
+        by_bytes = {encoded: name for name, encoded in self._encoded.items()}
+        # Noms de la liste qui sont préfixes d'un autre nom : reconnus à la même position
+        self._prefixes = {
+            encoded: [other for other in by_bytes if encoded.startswith(other)]
+            for encoded in by_bytes
+        }
+        self._by_bytes = by_bytes
+        self._text_prefixes = {
+            name: [other for other in names if name.startswith(other)]
+            for name in names
+        }
+        
+        if names:
+            trie = _trie_pattern(list(by_bytes))
+            self._names_regex = re.compile(trie)
+            self._scan_regex = re.compile(b'(?P<plugin>' + PLUGIN_ENTRY + b')|' + trie)
+            self._text_regex = re.compile(_trie_pattern(names))
+        else:
+            self._names_regex = self._text_regex = None
+            self._scan_regex = re.compile(PLUGIN_ENTRY)
+    
+    @classmethod
+    def for_list(cls, vsti_list):
+        """
+        Moteur compilé pour une liste, réutilisé tant que la liste ne change pas
+        
+        Args:
+            vsti_list (list): Noms des VSTi connus
+        
+        Returns:
+            VstiDetector: Moteur (en cache)
+        """
+        key = tuple(vsti_list)
+        with cls._cache_lock:
+            if cls._cached is None or cls._cached.key != key:
+                cls._cached = cls(vsti_list)
+            return cls._cached
+    
+    def detect(self, data, progress_callback=None, cancel_token=None):
+        """
+        Recherche des VSTi dans le contenu d'un fichier CPR
+        
+        Le contenu est parcouru par fenêtres de SEARCH_WINDOW octets (qui se
+        recouvrent de WINDOW_OVERLAP octets, pour ne pas couper une
+        occurrence) ; le jeton d'annulation est consulté entre deux fenêtres.
+        
+        Args:
+            data (bytes|mmap): Contenu du fichier (parcouru sans copie)
+            progress_callback (callable): Fonction appelée avec le pourcentage d'avancement
+            cancel_token (CancellationToken): Jeton d'annulation de l'analyse
+        
+        Returns:
+            set: VSTi trouvés (noms ou noms numérotés)
+        
+        Raises:
+            AnalysisCancelled: Si l'analyse a été annulée
+        """
+        numbered = set()
+        isolated = set()
+        plugin_texts = []
+        last_numbered_end = {}
+        last_plugin_end = 0
+        
+        length = len(data)
+        size = length or 1
+        step = max(size // PROGRESS_STEPS, 1)
+        next_progress = step
+        next_check = 0
+        
+        search = self._scan_regex.search
+        pos = 0
+        while True:
+            if pos >= next_check:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                next_check = pos + SEARCH_WINDOW // 2
+            if progress_callback and pos >= next_progress:
+                progress_callback(min(int(pos * 100 / size), 99))
+                next_progress = pos + step
+            
+            limit = min(pos + SEARCH_WINDOW, length)
+            match = search(data, pos, limit)
+            if match is None:
+                if limit >= length:
+                    break
+                # Fenêtre suivante, en reprenant les derniers octets
+                pos = max(limit - WINDOW_OVERLAP, pos + 1)
+                continue
+            start = match.start()
+            if limit < length and match.end() + WINDOW_OVERLAP > limit:
+                # Occurrence proche de la fin de fenêtre : peut-être tronquée
+                match = self._scan_regex.match(data, start)
+            
+            if self._names_regex is None:
+                longest = None
+            elif match.lastgroup == 'plugin':
+                # Une entrée "Plugin Name" ne masque pas un nom commençant au même endroit
+                name_match = self._names_regex.match(data, start)
+                longest = name_match.group() if name_match else None
+            else:
+                longest = match.group()
+            
+            if match.lastgroup == 'plugin' and start >= last_plugin_end:
+                plugin_texts.append(match.group().decode('utf-8', errors='ignore'))
+                last_plugin_end = match.end()
+            
+            if longest is not None:
+                before_ok = start == 0 or data[start - 1] not in WORD_BYTES
+                for encoded in self._prefixes[longest]:
+                    end = start + len(encoded)
+                    # Nom numéroté (occurrences sans chevauchement, comme findall)
+                    if start >= last_numbered_end.get(encoded, 0):
+                        suffix = NUMBER_SUFFIX.match(data, end)
+                        if suffix:
+                            numbered.add(data[start:suffix.end()].decode('utf-8', errors='ignore'))
+                            last_numbered_end[encoded] = suffix.end()
+                    # Nom isolé (pas au milieu d'un mot)
+                    if before_ok and (end == len(data) or data[end] not in WORD_BYTES):
+                        isolated.add(self._by_bytes[encoded])
+            pos = start + 1
+        
+        trouvés = set(numbered)
+        
+        # Noms isolés, dans l'ordre de la liste, s'ils ne sont pas déjà contenus dans un résultat
+        for vsti in sorted(isolated, key=self._order.__getitem__):
+            if not any(vsti in déjà_trouvé for déjà_trouvé in trouvés):
+                trouvés.add(vsti)
+        
+        # Noms cités dans les entrées "Plugin Name"
+        for texte in plugin_texts:
+            for vsti in self._names_in_text(texte):
+                if vsti not in trouvés and not any(vsti in déjà_trouvé for déjà_trouvé in trouvés):
+                    trouvés.add(vsti)
+        
+        if progress_callback:
+            progress_callback(100)
+        return trouvés
+    
+    def _names_in_text(self, texte):
+        """
+        Noms de la liste contenus dans un texte, dans l'ordre de la liste
+        
+        Args:
+            texte (str): Texte d'une entrée "Plugin Name"
+        
+        Returns:
+            list: Noms contenus
+        """
+        if self._text_regex is None:
+            return []
+        found = set()
+        pos = 0
+        while True:
+            match = self._text_regex.search(texte, pos)
+            if match is None:
+                break
+            found.update(self._text_prefixes[match.group()])
+            pos = match.start() + 1
+        return sorted(found, key=self._order.__getitem__)
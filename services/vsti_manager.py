@@ -1,5 +1,6 @@
 import json
 import os
+import hashlib
 
 VSTI_LIST_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'vsti_list.json')
 VSTI_LIST_PATH = os.path.abspath(VSTI_LIST_PATH)
@@ -10,9 +11,19 @@ def load_vsti_list():
     with open(VSTI_LIST_PATH, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def vsti_list_hash(vsti_list):
+    # Empreinte de la liste (l'ordre compte : il influe sur les résultats de détection)
+    return hashlib.sha1(json.dumps(list(vsti_list), ensure_ascii=False).encode('utf-8')).hexdigest()
+
 def save_vsti_list(vsti_list):
     with open(VSTI_LIST_PATH, 'w', encoding='utf-8') as f:
         json.dump(vsti_list, f, ensure_ascii=False, indent=2)
+    # Les analyses faites avec l'ancienne liste ne sont plus valables
+    try:
+        from services.vsti_cache import VstiCache
+        VstiCache.default().invalidate(VstiCache.list_key(vsti_list))
+    except Exception as e:
+        print(f"Erreur lors de l'invalidation du cache VSTi : {e}")
 
 def add_vsti(name):
     vsti_list = load_vsti_list()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lecture par blocs des fichiers WAV, sans charger le fichier entier
+"""
+
+import struct
+
+import numpy as np
+
+# Codes de format du bloc "fmt "
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Taille maximale d'un bloc lu à la fois (octets)
+BLOCK_BYTES = 4 * 1024 * 1024
+
+class WavReader:
+    """
+    Fichier WAV lu par blocs d'images (un échantillon par canal)
+    
+    Formats pris en charge : PCM 8, 16, 24 et 32 bits, flottant 32 et 64
+    bits, en-tête WAVE_FORMAT_EXTENSIBLE et fichiers RF64 (plus de 4 Go).
+    Les échantillons 24 bits sont rendus en int32 (valeur décalée de 8
+    bits : même pleine échelle que le 32 bits).
+    
+    S'utilise comme gestionnaire de contexte (fermeture du fichier).
+    """
+    
+    def __init__(self, path):
+        """
+        Ouverture du fichier et lecture de l'en-tête
+        
+        Args:
+            path (str): Chemin du fichier WAV
+        
+        Raises:
+            OSError: Si le fichier ne peut pas être ouvert
+            ValueError: Si le fichier n'est pas un WAV pris en charge
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._parse_header()
+        except BaseException:
+            self._file.close()
+            raise
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Fermeture du fichier"""
+        self._file.close()
+    
+    def _parse_header(self):
+        """Lecture des blocs RIFF jusqu'aux données (format, taille, position)"""
+        f = self._file
+        header = f.read(12)
+        if len(header) < 12:
+            raise ValueError(f"Fichier WAV invalide : {self.path}")
+        riff, _, wave = struct.unpack('<4sI4s', header)
+        if riff not in (b'RIFF', b'RF64') or wave != b'WAVE':
+            raise ValueError(f"Fichier WAV invalide : {self.path}")
+        data_size_64 = None
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"Données audio introuvables : {self.path}")
+            chunk_id, size = struct.unpack('<4sI', chunk)
+            if chunk_id == b'ds64':
+                body = f.read(size)
+                data_size_64 = struct.unpack('<Q', body[8:16])[0]
+            elif chunk_id == b'fmt ':
+                fmt = f.read(size)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"Bloc de format absent : {self.path}")
+                if size == 0xFFFFFFFF and data_size_64 is not None:
+                    size = data_size_64
+                self.data_offset = f.tell()
+                self.data_size = size
+                break
+            else:
+                f.seek(size, 1)
+            # Les blocs sont alignés sur 2 octets
+            if size % 2:
+                f.seek(1, 1)
+        
+        format_tag, channels, sample_rate, _, block_align, bits = struct.unpack('<HHIIHH', fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            format_tag = struct.unpack('<H', fmt[24:26])[0]
+        if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) or channels < 1:
+            raise ValueError(f"Format WAV non pris en charge ({format_tag:#x}) : {self.path}")
+        sample_bytes = block_align // channels
+        if format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            dtypes = {4: '<f4', 8: '<f8'}
+        else:
+            dtypes = {1: 'u1', 2: '<i2', 3: None, 4: '<i4'}
+        if sample_bytes not in dtypes:
+            raise ValueError(f"Échantillons de {bits} bits non pris en charge : {self.path}")
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits = bits
+        self.block_align = block_align
+        self.sample_bytes = sample_bytes
+        self._dtype = dtypes[sample_bytes]
+        # Un fichier tronqué (enregistrement interrompu) est lu jusqu'où il va
+        self._file.seek(0, 2)
+        available = max(0, self._file.tell() - self.data_offset)
+        self.frames = min(self.data_size, available) // block_align
+    
+    @property
+    def duration(self):
+        """Durée en secondes"""
+        return self.frames / self.sample_rate if self.sample_rate else 0
+    
+    def _decode(self, raw):
+        """
+        Conversion d'octets lus en échantillons (images x canaux)
+        
+        Args:
+            raw (bytes): Images complètes
+        
+        Returns:
+            ndarray: Échantillons (uint8, int16, int32, float32 ou float64)
+        """
+        if self._dtype is not None:
+            samples = np.frombuffer(raw, dtype=self._dtype)
+        else:
+            # 24 bits : chaque échantillon devient l'octet de poids fort d'un int32
+            packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+            widened = np.zeros((len(packed), 4), dtype=np.uint8)
+            widened[:, 1:] = packed
+            samples = widened.view('<i4').reshape(-1)
+        return samples.reshape(-1, self.channels)
+    
+    def read(self, start, count):
+        """
+        Lecture d'un intervalle d'images
+        
+        Args:
+            start (int): Première image
+            count (int): Nombre d'images
+        
+        Returns:
+            ndarray: Échantillons (images x canaux), éventuellement moins que demandé en fin de fichier
+        """
+        start = max(0, min(int(start), self.frames))
+        count = max(0, min(int(count), self.frames - start))
+        self._file.seek(self.data_offset + start * self.block_align)
+        raw = self._file.read(count * self.block_align)
+        if len(raw) % self.block_align:
+            raw = raw[:len(raw) // self.block_align * self.block_align]
+        return self._decode(raw)
+    
+    def blocks(self, block_frames=None, multiple=1):
+        """
+        Lecture séquentielle du fichier par blocs
+        
+        Args:
+            block_frames (int): Images par bloc (défaut : BLOCK_BYTES octets)
+            multiple (int): Les blocs (sauf le dernier) ont un nombre d'images multiple de cette valeur
+        
+        Yields:
+            ndarray: Échantillons d'un bloc (images x canaux)
+        """
+        if block_frames is None:
+            block_frames = BLOCK_BYTES // self.block_align
+        block_frames = max(multiple, block_frames // multiple * multiple)
+        for start in range(0, self.frames, block_frames):
+            yield self.read(start, block_frames)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules de l'application importables depuis les tests (services, models...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
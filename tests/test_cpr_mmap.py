@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+L'analyse VSTi d'un CPR ne copie jamais le fichier entier en mémoire :
+pas de f.read() complet, contenu parcouru sur la projection mmap
+"""
+
+import mmap
+
+import pytest
+
+import services.cpr_document as cpr_document
+from benchmarks.bench_cpr_document import write_synthetic_cpr
+from services.cpr_document import CprDocument
+from services.lectureCPR import detecte_vsti, trouve_vsti
+from services.vsti_detector import VstiDetector
+
+VSTI_LIST = ["Serum", "Kontakt 7", "Diva", "Pigments", "Omnisphere"]
+
+
+class SpyFile:
+    """Fichier ouvert dont les lectures sont relevées (taille demandée et lue)"""
+    
+    def __init__(self, file, reads):
+        self._file = file
+        self._reads = reads
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self._file.close()
+    
+    def read(self, size=-1):
+        data = self._file.read(size)
+        self._reads.append(len(data))
+        return data
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Tailles des lectures faites par cpr_document sur les fichiers ouverts"""
+    recorded = []
+    monkeypatch.setattr(cpr_document, "open", lambda *args, **kwargs: SpyFile(open(*args, **kwargs), recorded),
+                        raising=False)
+    return recorded
+
+
+@pytest.fixture
+def detected(monkeypatch):
+    """Contenus transmis au moteur de détection (type, taille)"""
+    recorded = []
+    detect = VstiDetector.detect
+    
+    def spy(self, data, *args, **kwargs):
+        recorded.append((type(data), len(data)))
+        return detect(self, data, *args, **kwargs)
+    
+    monkeypatch.setattr(VstiDetector, "detect", spy)
+    return recorded
+
+
+@pytest.fixture
+def structured_cpr(tmp_path):
+    """CPR synthétique : sections d'objets + 2 MB de données embarquées"""
+    path = tmp_path / "structure.cpr"
+    write_synthetic_cpr(str(path), embedded_mb=2)
+    return str(path)
+
+
+@pytest.fixture
+def raw_cpr(tmp_path):
+    """Fichier sans conteneur reconnu (recherche dans tout le fichier)"""
+    path = tmp_path / "brut.cpr"
+    path.write_bytes(b"\x01" * (1024 * 1024) + b"\x00Serum 01\x00" + b"\x02" * (1024 * 1024))
+    return str(path)
+
+
+def assert_no_copy(path, reads, detected):
+    size = len(open(path, "rb").read())
+    assert all(length < size for length in reads), "lecture complète du fichier"
+    assert detected, "moteur de détection non appelé"
+    for data_type, length in detected:
+        if length >= size:
+            assert data_type is mmap.mmap, f"copie complète transmise à la détection ({data_type.__name__})"
+
+
+@pytest.mark.parametrize("cpr", ["structured_cpr", "raw_cpr"])
+def test_detecte_vsti_uses_mapping(cpr, request, reads, detected):
+    path = request.getfixturevalue(cpr)
+    found = detecte_vsti(path, VSTI_LIST, use_cache=False)
+    assert "Serum 01" in found
+    assert_no_copy(path, reads, detected)
+
+
+def test_trouve_vsti_uses_mapping(structured_cpr, reads, detected, monkeypatch):
+    monkeypatch.setattr("services.lectureCPR.load_vsti_list", lambda: VSTI_LIST)
+    found = trouve_vsti(structured_cpr, use_cache=False)
+    assert {"Serum 01", "Kontakt 7 01", "Diva", "Pigments"} <= found
+    assert_no_copy(structured_cpr, reads, detected)
+
+
+def test_document_buffer_is_mapping(structured_cpr, reads):
+    with CprDocument(structured_cpr) as document:
+        assert isinstance(document.buffer, mmap.mmap)
+        assert isinstance(document.section(document.archive_chunks[0]), memoryview)
+        assert document.features["sample_rate"] == 48000
+    assert reads == []